@@ -197,6 +197,16 @@ _ai_timeout = get_env_or_config('AI_REVIEW_TIMEOUT', 'AI_REVIEW', 'TIMEOUT')
 AI_REVIEW_TIMEOUT = int(_ai_timeout) if _ai_timeout else get_config_int('AI_REVIEW', 'TIMEOUT', 30)
 _ai_retries = get_env_or_config('AI_REVIEW_MAX_RETRIES', 'AI_REVIEW', 'MAX_RETRIES')
 AI_REVIEW_MAX_RETRIES = int(_ai_retries) if _ai_retries else get_config_int('AI_REVIEW', 'MAX_RETRIES', 2)
+# 对冲请求延迟（秒）：请求超过该时间未返回时并发发起第二个相同请求，取先返回者；0 表示关闭
+_ai_hedge_delay = get_env_or_config('AI_REVIEW_HEDGE_DELAY', 'AI_REVIEW', 'HEDGE_DELAY')
+AI_REVIEW_HEDGE_DELAY = float(_ai_hedge_delay) if _ai_hedge_delay else 0.0
+# 调用限额：最大并发请求数，以及每分钟请求数 / token 数（0 表示不限制）
+_ai_max_concurrency = get_env_or_config('AI_REVIEW_MAX_CONCURRENCY', 'AI_REVIEW', 'MAX_CONCURRENCY')
+AI_REVIEW_MAX_CONCURRENCY = int(_ai_max_concurrency) if _ai_max_concurrency else get_config_int('AI_REVIEW', 'MAX_CONCURRENCY', 8)
+_ai_rpm = get_env_or_config('AI_REVIEW_RPM', 'AI_REVIEW', 'RPM')
+AI_REVIEW_RPM = int(_ai_rpm) if _ai_rpm else get_config_int('AI_REVIEW', 'RPM', 0)
+_ai_tpm = get_env_or_config('AI_REVIEW_TPM', 'AI_REVIEW', 'TPM')
+AI_REVIEW_TPM = int(_ai_tpm) if _ai_tpm else get_config_int('AI_REVIEW', 'TPM', 0)
 
 # 审核主题配置
 AI_REVIEW_CHANNEL_TOPIC = get_env_or_config('AI_REVIEW_CHANNEL_TOPIC', 'AI_REVIEW', 'CHANNEL_TOPIC', fallback='接码服务')
@@ -1,15 +1,29 @@
 """
 数据库管理模块
 """
+import asyncio
 import logging
+import sqlite3
 from datetime import datetime
 from contextlib import asynccontextmanager
+from typing import Optional
 import aiosqlite
 
 from config.settings import DB_PATH, TIMEOUT, DB_CACHE_KB, SLOT_AD_MAX_ROWS
+from utils.feature_extractor import SIMHASH_BANDS, simhash_bands
 
 logger = logging.getLogger(__name__)
 
+# rating_subjects.avg_score 生成列表达式
+_RATING_AVG_EXPR = "CASE WHEN vote_count > 0 THEN CAST(score_sum AS REAL) / vote_count ELSE 0.0 END"
+
+# 生成列需要 SQLite >= 3.31；更早的版本保留 avg_score 普通列，由评分触发器一并维护
+_SUPPORTS_GENERATED_COLUMNS = sqlite3.sqlite_version_info >= (3, 31, 0)
+
+# journal_mode=WAL 持久化在数据库文件中，每个数据库文件在进程内设置一次即可；
+# 其余 PRAGMA 为连接级设置，需在每个连接上执行
+_wal_enabled_paths = set()
+
 @asynccontextmanager
 async def get_db():
     """
@@ -23,7 +37,9 @@ async def get_db():
     conn.row_factory = aiosqlite.Row
     # 优化 SQLite 运行参数，降低 I/O 延迟
     try:
-        await conn.execute("PRAGMA journal_mode=WAL;")
+        if DB_PATH not in _wal_enabled_paths:
+            await conn.execute("PRAGMA journal_mode=WAL;")
+            _wal_enabled_paths.add(DB_PATH)
         await conn.execute("PRAGMA synchronous=NORMAL;")
         await conn.execute("PRAGMA temp_store=MEMORY;")
         # 通过负值设置 KB 为单位的 page cache 大小（默认为 4MB，可通过 DB_CACHE_KB 配置）
@@ -41,6 +57,38 @@ async def get_db():
     finally:
         await conn.close()
 
+# 进程内写事务锁：SQLite 同一时刻只允许一个写者，先在应用层排队，
+# 避免多个连接同时阻塞在 busy_timeout 上占用 aiosqlite 线程
+_write_lock: Optional[asyncio.Lock] = None
+_write_lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _get_write_lock() -> asyncio.Lock:
+    """获取当前事件循环的写事务锁（事件循环变化时重新创建）"""
+    global _write_lock, _write_lock_loop
+    loop = asyncio.get_running_loop()
+    if _write_lock is None or _write_lock_loop is not loop:
+        _write_lock = asyncio.Lock()
+        _write_lock_loop = loop
+    return _write_lock
+
+@asynccontextmanager
+async def get_db_tx():
+    """
+    写事务上下文管理器：进入时执行 BEGIN IMMEDIATE，正常退出提交、异常回滚
+
+    适用于“读-写-读”的短事务，开始即持有写锁，避免并发时延迟事务在升级写锁阶段
+    直接返回 database is locked（busy_timeout 对锁升级无效）。
+    同一进程内的写事务经由 _write_lock 串行执行；事务内不要再嵌套 get_db_tx()。
+
+    Yields:
+        aiosqlite.Connection: 已开启事务的数据库连接对象
+    """
+    async with _get_write_lock():
+        async with get_db() as conn:
+            await conn.execute("BEGIN IMMEDIATE")
+            yield conn
+
 async def init_db():
     """
     初始化数据库
@@ -146,19 +194,42 @@ async def init_db():
             # ============================================
             # 评分实体表
             # ============================================
-            await conn.execute('''
-                CREATE TABLE IF NOT EXISTS rating_subjects (
+            if _SUPPORTS_GENERATED_COLUMNS:
+                avg_column = f"avg_score REAL GENERATED ALWAYS AS ({_RATING_AVG_EXPR}) VIRTUAL"
+            else:
+                avg_column = "avg_score REAL DEFAULT 0.0"
+            rating_subjects_columns = f'''
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     subject_type TEXT NOT NULL,
                     subject_key TEXT NOT NULL,
                     display_name TEXT,
                     score_sum INTEGER DEFAULT 0,
                     vote_count INTEGER DEFAULT 0,
-                    avg_score REAL DEFAULT 0.0,
+                    {avg_column},
                     created_at REAL DEFAULT (strftime('%s', 'now')),
                     updated_at REAL DEFAULT (strftime('%s', 'now'))
-                )
-            ''')
+            '''
+            await conn.execute(f'CREATE TABLE IF NOT EXISTS rating_subjects ({rating_subjects_columns})')
+
+            # 旧库中 avg_score 为普通列：支持生成列时重建表，改为由 score_sum / vote_count 计算的虚拟生成列。
+            # 用 CREATE / INSERT ... SELECT / RENAME 重建而非 DROP COLUMN（后者需要 SQLite >= 3.35）；
+            # 引用该表的旧触发器需先删除（下方会按新定义重建），否则 RENAME 时校验触发器会失败。
+            async with conn.execute("PRAGMA table_xinfo(rating_subjects)") as cursor:
+                avg_col = next((row for row in await cursor.fetchall() if row['name'] == 'avg_score'), None)
+            if _SUPPORTS_GENERATED_COLUMNS and avg_col is not None and avg_col['hidden'] == 0:
+                await conn.execute('DROP TRIGGER IF EXISTS trg_rating_votes_ai')
+                await conn.execute('DROP TRIGGER IF EXISTS trg_rating_votes_au')
+                await conn.execute('DROP TABLE IF EXISTS rating_subjects_new')
+                await conn.execute(f'CREATE TABLE rating_subjects_new ({rating_subjects_columns})')
+                await conn.execute('''
+                    INSERT INTO rating_subjects_new
+                        (id, subject_type, subject_key, display_name, score_sum, vote_count, created_at, updated_at)
+                    SELECT id, subject_type, subject_key, display_name, score_sum, vote_count, created_at, updated_at
+                    FROM rating_subjects
+                ''')
+                await conn.execute('DROP TABLE rating_subjects')
+                await conn.execute('ALTER TABLE rating_subjects_new RENAME TO rating_subjects')
+                logger.info("已将 rating_subjects.avg_score 改为生成列")
 
             await conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_rating_subject_unique ON rating_subjects(subject_type, subject_key)')
 
@@ -195,7 +266,42 @@ async def init_db():
             ''')
 
             await conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_rating_vote_unique ON rating_votes(subject_id, user_id)')
-            await conn.execute('CREATE INDEX IF NOT EXISTS idx_rating_vote_subject ON rating_votes(subject_id)')
+            # (subject_id, user_id) 唯一索引已覆盖按 subject_id 的查询，单列索引只会增加每次投票的写入成本
+            await conn.execute('DROP INDEX IF EXISTS idx_rating_vote_subject')
+
+            # 由触发器维护 rating_subjects 聚合（score_sum / vote_count；avg_score 为生成列，
+            # 不支持生成列时由触发器一并更新），评分回调只需写 rating_votes 一条语句
+            insert_avg = update_avg = ""
+            if not _SUPPORTS_GENERATED_COLUMNS:
+                insert_avg = "avg_score = CAST(score_sum + NEW.score AS REAL) / (vote_count + 1),"
+                update_avg = (
+                    "avg_score = CASE WHEN vote_count > 0 "
+                    "THEN CAST(score_sum + NEW.score - OLD.score AS REAL) / vote_count ELSE 0.0 END,"
+                )
+            await conn.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_rating_votes_ai
+                AFTER INSERT ON rating_votes
+                BEGIN
+                    UPDATE rating_subjects
+                    SET score_sum = score_sum + NEW.score,
+                        vote_count = vote_count + 1,
+                        {insert_avg}
+                        updated_at = strftime('%s', 'now')
+                    WHERE id = NEW.subject_id;
+                END
+            ''')
+            await conn.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_rating_votes_au
+                AFTER UPDATE OF score ON rating_votes
+                WHEN NEW.score != OLD.score
+                BEGIN
+                    UPDATE rating_subjects
+                    SET score_sum = score_sum + NEW.score - OLD.score,
+                        {update_avg}
+                        updated_at = strftime('%s', 'now')
+                    WHERE id = NEW.subject_id;
+                END
+            ''')
 
             # ============================================
             # 投稿指纹表（用于重复检测）
@@ -217,15 +323,40 @@ async def init_db():
                     submission_id INTEGER,
                     status TEXT DEFAULT 'pending',
                     fingerprint_version INTEGER DEFAULT 1,
-                    created_at REAL DEFAULT (strftime('%s', 'now'))
+                    created_at REAL DEFAULT (strftime('%s', 'now')),
+                    ch_b0 INTEGER,
+                    ch_b1 INTEGER,
+                    ch_b2 INTEGER,
+                    ch_b3 INTEGER
                 )
             ''')
 
+            # 兼容迁移：为旧库补齐 SimHash 分段字段，并为已有指纹回填分段值
+            added_bands = False
+            for band in range(SIMHASH_BANDS):
+                try:
+                    await conn.execute(f'ALTER TABLE submission_fingerprints ADD COLUMN ch_b{band} INTEGER')
+                    added_bands = True
+                except Exception:
+                    pass
+            if added_bands:
+                async with conn.execute(
+                    'SELECT id, content_hash FROM submission_fingerprints WHERE content_hash IS NOT NULL'
+                ) as cursor:
+                    rows = [(*simhash_bands(row['content_hash']), row['id']) for row in await cursor.fetchall()]
+                await conn.executemany(
+                    'UPDATE submission_fingerprints SET ch_b0 = ?, ch_b1 = ?, ch_b2 = ?, ch_b3 = ? WHERE id = ?',
+                    rows,
+                )
+                logger.info(f"已添加 SimHash 分段字段到 submission_fingerprints 表（回填 {len(rows)} 条）")
+
             # 指纹表索引
             await conn.execute('CREATE INDEX IF NOT EXISTS idx_fp_user_id ON submission_fingerprints(user_id)')
             await conn.execute('CREATE INDEX IF NOT EXISTS idx_fp_submit_time ON submission_fingerprints(submit_time)')
             await conn.execute('CREATE INDEX IF NOT EXISTS idx_fp_content_hash ON submission_fingerprints(content_hash)')
             await conn.execute('CREATE INDEX IF NOT EXISTS idx_fp_status ON submission_fingerprints(status)')
+            for band in range(SIMHASH_BANDS):
+                await conn.execute(f'CREATE INDEX IF NOT EXISTS idx_fp_ch_b{band} ON submission_fingerprints(ch_b{band})')
 
             # ============================================
             # 特征索引表（用于快速查找重复特征）
@@ -241,7 +372,10 @@ async def init_db():
                 )
             ''')
 
-            await conn.execute('CREATE INDEX IF NOT EXISTS idx_ff_type_value ON fingerprint_features(feature_type, feature_value)')
+            # (feature_type, feature_value, fingerprint_id) 覆盖索引：重复检测按特征查找时
+            # 只读索引即可拿到 fingerprint_id，再按主键关联 submission_fingerprints，不回表读特征行
+            await conn.execute('DROP INDEX IF EXISTS idx_ff_type_value')
+            await conn.execute('CREATE INDEX IF NOT EXISTS idx_ff_type_value_fp ON fingerprint_features(feature_type, feature_value, fingerprint_id)')
             await conn.execute('CREATE INDEX IF NOT EXISTS idx_ff_fingerprint ON fingerprint_features(fingerprint_id)')
 
             # ============================================
@@ -261,7 +395,9 @@ async def init_db():
                 )
             ''')
 
-            await conn.execute('CREATE INDEX IF NOT EXISTS idx_arc_content_hash ON ai_review_cache(content_hash)')
+            # content_hash 的 UNIQUE 约束自带索引，按哈希查询（至多一行）直接走该索引；
+            # 重复的单列索引只会增加每次写入缓存的成本
+            await conn.execute('DROP INDEX IF EXISTS idx_arc_content_hash')
             await conn.execute('CREATE INDEX IF NOT EXISTS idx_arc_expires ON ai_review_cache(expires_at)')
 
             # ============================================
@@ -282,7 +418,9 @@ async def init_db():
                 )
             ''')
 
-            await conn.execute('CREATE INDEX IF NOT EXISTS idx_pr_status ON pending_reviews(status)')
+            # 只有待审核记录需要按状态查找，使用部分索引代替整列 status 索引
+            await conn.execute('DROP INDEX IF EXISTS idx_pr_status')
+            await conn.execute("CREATE INDEX IF NOT EXISTS idx_pr_pending ON pending_reviews(created_at) WHERE status = 'pending'")
             await conn.execute('CREATE INDEX IF NOT EXISTS idx_pr_user_id ON pending_reviews(user_id)')
 
             # ============================================
@@ -190,7 +190,7 @@ async def handle_submit_addtag(update: Update, context: CallbackContext):
         reply_markup=None
     )
     
-    return STATE.get('TAG', 4)
+    return STATE.TAG
 
 
 async def handle_submit_media(update: Update, context: CallbackContext):
@@ -202,7 +202,7 @@ async def handle_submit_media(update: Update, context: CallbackContext):
         reply_markup=None
     )
     
-    return STATE.get('MEDIA', 2)
+    return STATE.MEDIA
 
 
 async def handle_submit_cancel(update: Update, context: CallbackContext):
@@ -14,6 +14,7 @@ from telegram.ext import CallbackContext
 
 from config.settings import CHANNEL_ID
 from database.db_manager import get_db
+from utils.helper_functions import make_media_item
 from utils.search_engine import get_search_engine, PostDocument
 
 logger = logging.getLogger(__name__)
@@ -421,7 +422,7 @@ async def extract_message_info(message):
                 photo = message.photo[-1]
                 file_id = getattr(photo, 'file_id', None)
                 if file_id:
-                    info['media_list'].append(f"photo:{file_id}")
+                    info['media_list'].append(make_media_item("photo", file_id))
                     info['content_type'] = 'media'
         except Exception as e:
             logger.warning(f"提取照片信息失败: {e}")
@@ -430,7 +431,7 @@ async def extract_message_info(message):
             if hasattr(message, 'video') and message.video:
                 file_id = getattr(message.video, 'file_id', None)
                 if file_id:
-                    info['media_list'].append(f"video:{file_id}")
+                    info['media_list'].append(make_media_item("video", file_id))
                     info['content_type'] = 'media'
                 file_name = getattr(message.video, 'file_name', None)
                 if file_name:
@@ -442,7 +443,7 @@ async def extract_message_info(message):
             if hasattr(message, 'animation') and message.animation:
                 file_id = getattr(message.animation, 'file_id', None)
                 if file_id:
-                    info['media_list'].append(f"animation:{file_id}")
+                    info['media_list'].append(make_media_item("animation", file_id))
                     info['content_type'] = 'media'
         except Exception as e:
             logger.warning(f"提取动画信息失败: {e}")
@@ -451,7 +452,7 @@ async def extract_message_info(message):
             if hasattr(message, 'audio') and message.audio:
                 file_id = getattr(message.audio, 'file_id', None)
                 if file_id:
-                    info['media_list'].append(f"audio:{file_id}")
+                    info['media_list'].append(make_media_item("audio", file_id))
                     info['content_type'] = 'media'
                 file_name = getattr(message.audio, 'file_name', None)
                 if file_name:
@@ -471,7 +472,7 @@ async def extract_message_info(message):
                 file_id = getattr(message.document, 'file_id', None)
                 file_name = getattr(message.document, 'file_name', None) or '未知文件'
                 if file_id:
-                    info['doc_list'].append(f"document:{file_id}:{file_name}")
+                    info['doc_list'].append(make_media_item("document", file_id, file_name))
                     info['content_type'] = 'document'
                     filename_candidates.append(file_name)
         except Exception as e:
@@ -20,14 +20,15 @@ from utils.helper_functions import (
     process_tags, 
     build_caption, 
     validate_state, 
-    safe_send
+    safe_send,
+    make_media_item
 )
 from utils.submit_settings import get_snapshot
 from handlers.publish import publish_submission
 
 logger = logging.getLogger(__name__)
 
-@validate_state(STATE['MEDIA'])
+@validate_state(STATE.MEDIA)
 async def handle_media(update: Update, context: CallbackContext) -> int:
     """
     处理媒体文件上传
@@ -45,30 +46,30 @@ async def handle_media(update: Update, context: CallbackContext) -> int:
 
     if update.message.photo:
         file_id = update.message.photo[-1].file_id
-        new_media = f"photo:{file_id}"
+        new_media = make_media_item("photo", file_id)
     elif update.message.video:
         file_id = update.message.video.file_id
-        new_media = f"video:{file_id}"
+        new_media = make_media_item("video", file_id)
     elif update.message.animation:
         file_id = update.message.animation.file_id
-        new_media = f"animation:{file_id}"
+        new_media = make_media_item("animation", file_id)
     elif update.message.audio:
         file_id = update.message.audio.file_id
-        new_media = f"audio:{file_id}"
+        new_media = make_media_item("audio", file_id)
     elif update.message.document:
         mime = update.message.document.mime_type
         if mime == "image/gif":
             file_id = update.message.document.file_id
-            new_media = f"animation:{file_id}"
+            new_media = make_media_item("animation", file_id)
         elif mime.startswith("audio/"):
             file_id = update.message.document.file_id
-            new_media = f"audio:{file_id}"
+            new_media = make_media_item("audio", file_id)
         else:
             await update.message.reply_text("⚠️ 不支持的文件类型，请发送支持的媒体")
-            return STATE['MEDIA']
+            return STATE.MEDIA
     else:
         await update.message.reply_text("⚠️ 请发送支持的媒体文件")
-        return STATE['MEDIA']
+        return STATE.MEDIA
 
     try:
         async with get_db() as conn:
@@ -85,9 +86,9 @@ async def handle_media(update: Update, context: CallbackContext) -> int:
         logger.error(f"媒体保存错误: {e}")
         await update.message.reply_text("❌ 媒体保存失败，请稍后再试")
         return ConversationHandler.END
-    return STATE['MEDIA']
+    return STATE.MEDIA
 
-@validate_state(STATE['MEDIA'])
+@validate_state(STATE.MEDIA)
 async def done_media(update: Update, context: CallbackContext) -> int:
     """
     完成媒体上传，进入下一阶段
@@ -108,7 +109,7 @@ async def done_media(update: Update, context: CallbackContext) -> int:
             row = await c.fetchone()
             if not row or not row["image_id"]:
                 await update.message.reply_text("⚠️ 请至少发送一个媒体文件")
-                return STATE['MEDIA']
+                return STATE.MEDIA
     except Exception as e:
         logger.error(f"检索媒体错误: {e}")
         await update.message.reply_text("❌ 内部错误，请稍后再试")
@@ -128,12 +129,12 @@ async def done_media(update: Update, context: CallbackContext) -> int:
             "• 不需要请回复“无”或发送 /skip_optional\n"
             "• 需要请以 http:// 或 https:// 开头"
         )
-        return STATE['LINK']
+        return STATE.LINK
 
     await update.message.reply_text(f"✅ 媒体接收完成，请发送标签（必选，最多{allowed_tags}个，用逗号分隔，例如：明日方舟，原神）")
-    return STATE['TAG']
+    return STATE.TAG
 
-@validate_state(STATE['TAG'])
+@validate_state(STATE.TAG)
 async def handle_tag(update: Update, context: CallbackContext) -> int:
     """
     处理标签输入
@@ -156,7 +157,7 @@ async def handle_tag(update: Update, context: CallbackContext) -> int:
         success, processed_tags = process_tags(raw_tags, allowed_tags)
         if not success or not processed_tags:
             await update.message.reply_text(f"❌ 标签格式错误，请重新输入（最多{allowed_tags}个，用逗号分隔）")
-            return STATE['TAG']
+            return STATE.TAG
     try:
         async with get_db() as conn:
             c = await conn.cursor()
@@ -176,9 +177,9 @@ async def handle_tag(update: Update, context: CallbackContext) -> int:
         await update.message.reply_text(
             "✅ 标签已保存，请发送链接（可选，不需要请回复 “无” 或发送 /skip_optional 跳过后面的所有可选项 。需填写请以 http:// 或 https:// 开头）"
         )
-    return STATE['LINK']
+    return STATE.LINK
 
-@validate_state(STATE['LINK'])
+@validate_state(STATE.LINK)
 async def handle_link(update: Update, context: CallbackContext) -> int:
     """
     处理链接输入
@@ -197,7 +198,7 @@ async def handle_link(update: Update, context: CallbackContext) -> int:
         link = ""
     elif not link.startswith(('http://', 'https://')):
         await update.message.reply_text("⚠️ 链接格式不正确，请以 http:// 或 https:// 开头，或回复“无”跳过")
-        return STATE['LINK']
+        return STATE.LINK
     try:
         async with get_db() as conn:
             c = await conn.cursor()
@@ -209,9 +210,9 @@ async def handle_link(update: Update, context: CallbackContext) -> int:
         await update.message.reply_text("❌ 链接保存失败，请稍后再试")
         return ConversationHandler.END
     await update.message.reply_text("✅ 链接已保存，请发送标题（可选，不需要请回复 “无” 或发送 /skip_optional 跳过后面的所有可选项）")
-    return STATE['TITLE']
+    return STATE.TITLE
 
-@validate_state(STATE['TITLE'])
+@validate_state(STATE.TITLE)
 async def handle_title(update: Update, context: CallbackContext) -> int:
     """
     处理标题输入
@@ -238,9 +239,9 @@ async def handle_title(update: Update, context: CallbackContext) -> int:
         await update.message.reply_text("❌ 标题保存失败，请稍后再试")
         return ConversationHandler.END
     await update.message.reply_text("✅ 标题已保存，请发送简介（可选，不需要请回复 “无” 或发送 /skip_optional 跳过后面的所有可选项）")
-    return STATE['NOTE']
+    return STATE.NOTE
 
-@validate_state(STATE['NOTE'])
+@validate_state(STATE.NOTE)
 async def handle_note(update: Update, context: CallbackContext) -> int:
     """
     处理简介输入
@@ -267,9 +268,9 @@ async def handle_note(update: Update, context: CallbackContext) -> int:
         await update.message.reply_text("❌ 简介保存失败，请稍后再试")
         return ConversationHandler.END
     await update.message.reply_text("✅ 简介已保存，请问是否将所有媒体设为剧透（点击查看）？回复 “否” 或 “是”")
-    return STATE['SPOILER']
+    return STATE.SPOILER
 
-@validate_state(STATE['SPOILER'])
+@validate_state(STATE.SPOILER)
 async def handle_spoiler(update: Update, context: CallbackContext) -> int:
     """
     处理剧透设置
@@ -388,4 +389,4 @@ async def prompt_media(update: Update, context: CallbackContext) -> int:
         int: 当前会话状态
     """
     await update.message.reply_text("请发送支持的媒体文件，或发送 /done 完成上传")
-    return STATE['MEDIA']
+    return STATE.MEDIA
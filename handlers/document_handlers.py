@@ -10,14 +10,14 @@ from telegram.ext import ConversationHandler, CallbackContext
 
 from models.state import STATE
 from database.db_manager import get_db
-from utils.helper_functions import validate_state, safe_send, end_conversation_with_message, handle_conversation_error
+from utils.helper_functions import validate_state, safe_send, end_conversation_with_message, handle_conversation_error, make_media_item
 from utils.file_validator import create_file_validator
 from utils.submit_settings import get_snapshot
 from utils import runtime_settings
 
 logger = logging.getLogger(__name__)
 
-@validate_state(STATE['DOC'])
+@validate_state(STATE.DOC)
 async def handle_doc(update: Update, context: CallbackContext) -> int:
     """
     处理文档文件上传
@@ -49,7 +49,7 @@ async def handle_doc(update: Update, context: CallbackContext) -> int:
             f"• 选择文件或文档\n\n"
             f"✅ 允许的文件类型：\n{allowed_types_desc}"
         )
-        return STATE['DOC']
+        return STATE.DOC
     
     doc = update.message.document
     
@@ -58,12 +58,12 @@ async def handle_doc(update: Update, context: CallbackContext) -> int:
     if not is_valid:
         logger.warning(f"文件类型验证失败: user_id={user_id}, file={doc.file_name}, mime={doc.mime_type}")
         await safe_send(update.message.reply_text, error_msg)
-        return STATE['DOC']
+        return STATE.DOC
     
     logger.info(f"文件类型验证通过: user_id={user_id}, file={doc.file_name}, mime={doc.mime_type}")
-    # 存储格式：document:file_id:filename
+    # 存储格式：{"type": "document", "file_id": ..., "filename": ...}
     filename = doc.file_name or "未命名文件"
-    new_doc = f"document:{doc.file_id}:{filename}"
+    new_doc = make_media_item("document", doc.file_id, filename)
     
     try:
         async with get_db() as conn:
@@ -86,7 +86,7 @@ async def handle_doc(update: Update, context: CallbackContext) -> int:
             # 限制文档数量
             if len(doc_list) >= max_docs:
                 await safe_send(update.message.reply_text, f"⚠️ 已达到文档上传上限（{max_docs}个）")
-                return STATE['DOC']
+                return STATE.DOC
                 
             doc_list.append(new_doc)
             await c.execute("UPDATE submissions SET document_id=?, timestamp=? WHERE user_id=?",
@@ -117,9 +117,9 @@ async def handle_doc(update: Update, context: CallbackContext) -> int:
             
         return ConversationHandler.END
         
-    return STATE['DOC']
+    return STATE.DOC
 
-@validate_state(STATE['DOC'])
+@validate_state(STATE.DOC)
 async def done_doc(update: Update, context: CallbackContext) -> int:
     """
     完成文档上传，进入下一阶段
@@ -161,7 +161,7 @@ async def done_doc(update: Update, context: CallbackContext) -> int:
                     "• 选择文件或文档\n"
                     "• 支持ZIP、RAR等压缩包以及PDF、DOC等各种文档格式"
                 )
-                return STATE['DOC']
+                return STATE.DOC
                 
             # 判断模式，决定下一步流程
             mode = row["mode"] if "mode" in row.keys() else "mixed"
@@ -181,7 +181,7 @@ async def done_doc(update: Update, context: CallbackContext) -> int:
                 f"最多上传{max_media_default}个文件。\n"
                 "发送完毕后，请发送 /done_media，或发送 /skip_media 跳过媒体上传步骤。"
             )
-            return STATE['MEDIA']
+            return STATE.MEDIA
     except Exception as e:
         logger.error(f"检索文档错误: {e}")
         return await handle_conversation_error(update)
@@ -211,4 +211,4 @@ async def prompt_doc(update: Update, context: CallbackContext) -> int:
         f"• 选择文件或文档\n\n"
         f"✅ 允许的文件类型：\n{allowed_types_desc}"
     )
-    return STATE['DOC']
+    return STATE.DOC
@@ -11,7 +11,7 @@ from models.state import STATE
 from database.db_manager import get_db
 from utils.helper_functions import (
     validate_state, end_conversation_with_message, handle_conversation_error,
-    get_submission_mode, parse_json_list
+    get_submission_mode, parse_json_list, make_media_item
 )
 from utils.file_validator import create_file_validator
 from utils.submit_settings import get_snapshot
@@ -33,7 +33,7 @@ async def handle_photo(update: Update, context: CallbackContext) -> int:
     context.user_data["photos"] = photos
     if update.message:
         await update.message.reply_text("✅ 已接收图片")
-    return STATE['MEDIA']
+    return STATE.MEDIA
 
 
 async def handle_video(update: Update, context: CallbackContext) -> int:
@@ -44,7 +44,7 @@ async def handle_video(update: Update, context: CallbackContext) -> int:
         context.user_data["video"] = update.message.video.file_id
     if update.message:
         await update.message.reply_text("✅ 已接收视频")
-    return STATE['MEDIA']
+    return STATE.MEDIA
 
 
 def merge_media_caption_note(existing_note: str | None, caption: str | None) -> str:
@@ -64,7 +64,7 @@ def merge_media_caption_note(existing_note: str | None, caption: str | None) ->
     return f"{existing_note}\n{caption}"[:MAX_NOTE_LENGTH]
 
 
-@validate_state(STATE['MEDIA'])
+@validate_state(STATE.MEDIA)
 async def handle_media(update: Update, context: CallbackContext) -> int:
     """
     处理媒体文件上传
@@ -84,26 +84,26 @@ async def handle_media(update: Update, context: CallbackContext) -> int:
 
     if update.message.photo:
         file_id = update.message.photo[-1].file_id
-        new_media = f"photo:{file_id}"
+        new_media = make_media_item("photo", file_id)
     elif update.message.video:
         file_id = update.message.video.file_id
-        new_media = f"video:{file_id}"
+        new_media = make_media_item("video", file_id)
     elif update.message.animation:
         file_id = update.message.animation.file_id
-        new_media = f"animation:{file_id}"
+        new_media = make_media_item("animation", file_id)
     elif update.message.audio:
         file_id = update.message.audio.file_id
-        new_media = f"audio:{file_id}"
+        new_media = make_media_item("audio", file_id)
     elif update.message.document:
         mime = update.message.document.mime_type
         logger.info(f"收到文档，MIME类型: {mime}, 用户ID: {user_id}")
         
         if mime == "image/gif":
             file_id = update.message.document.file_id
-            new_media = f"animation:{file_id}"
+            new_media = make_media_item("animation", file_id)
         elif mime and mime.startswith("audio/"):
             file_id = update.message.document.file_id
-            new_media = f"audio:{file_id}"
+            new_media = make_media_item("audio", file_id)
         else:
             # 检查是否是媒体模式
             try:
@@ -130,7 +130,7 @@ async def handle_media(update: Update, context: CallbackContext) -> int:
                             "2️⃣ 或发送 /cancel 取消当前投稿，然后发送 /start 重新选择文档模式",
                             reply_markup=reply_markup
                         )
-                        return STATE['MEDIA']
+                        return STATE.MEDIA
             except Exception as e:
                 logger.error(f"检查模式错误: {e}", exc_info=True)
             
@@ -141,13 +141,13 @@ async def handle_media(update: Update, context: CallbackContext) -> int:
                 "• 从相册选择后直接发送\n"
                 "• 直接发送视频/GIF"
             )
-            return STATE['MEDIA']
+            return STATE.MEDIA
     else:
         await update.message.reply_text(
             "⚠️ 请发送支持的媒体文件\n\n"
             "📱 支持的媒体格式：图片、视频、GIF、音频"
         )
-        return STATE['MEDIA']
+        return STATE.MEDIA
 
     try:
         async with get_db() as conn:
@@ -170,7 +170,7 @@ async def handle_media(update: Update, context: CallbackContext) -> int:
             # 限制媒体数量
             if len(media_list) >= media_limit:
                 await update.message.reply_text(f"⚠️ 已达到媒体上传上限（{media_limit}个）")
-                return STATE['MEDIA']
+                return STATE.MEDIA
                 
             media_list.append(new_media)
             note = merge_media_caption_note(row["note"], media_caption)
@@ -197,9 +197,9 @@ async def handle_media(update: Update, context: CallbackContext) -> int:
         logger.error(f"媒体保存错误: {e}")
         return await handle_conversation_error(update, "❌ 媒体保存失败，请稍后再试")
         
-    return STATE['MEDIA']
+    return STATE.MEDIA
 
-@validate_state(STATE['MEDIA'])
+@validate_state(STATE.MEDIA)
 async def done_media(update: Update, context: CallbackContext) -> int:
     """
     完成媒体上传，进入下一阶段
@@ -232,7 +232,7 @@ async def done_media(update: Update, context: CallbackContext) -> int:
             require_one = bool(snapshot.get("media_mode_require_one", True))
             if mode == "media" and require_one and not media_list:
                 await update.message.reply_text("⚠️ 请至少发送一个媒体文件")
-                return STATE['MEDIA']
+                return STATE.MEDIA
                 
         allowed_tags = int(snapshot.get("allowed_tags", 30))
         if allowed_tags <= 0:
@@ -248,17 +248,17 @@ async def done_media(update: Update, context: CallbackContext) -> int:
                 "• 不需要请回复“无”或发送 /skip_optional\n"
                 "• 需要请以 http:// 或 https:// 开头"
             )
-            return STATE['LINK']
+            return STATE.LINK
 
         # 媒体验证通过，进入标签阶段
         await update.message.reply_text(f"✅ 媒体接收完成，请发送标签（必选，最多{allowed_tags}个，用逗号分隔，例如：明日方舟，原神）")
-        return STATE['TAG']
+        return STATE.TAG
         
     except Exception as e:
         logger.error(f"检索媒体错误: {e}")
         return await handle_conversation_error(update)
 
-@validate_state(STATE['MEDIA'])
+@validate_state(STATE.MEDIA)
 async def skip_media(update: Update, context: CallbackContext) -> int:
     """
     跳过媒体上传，进入下一阶段
@@ -291,7 +291,7 @@ async def skip_media(update: Update, context: CallbackContext) -> int:
             require_one = bool(snapshot.get("media_mode_require_one", True))
             if mode == "media" and require_one:
                 await update.message.reply_text("⚠️ 在媒体投稿模式下，媒体文件是必选项。请上传至少一个媒体文件。")
-                return STATE['MEDIA']
+                return STATE.MEDIA
                 
         snapshot = get_snapshot(context)
         allowed_tags = int(snapshot.get("allowed_tags", 30))
@@ -308,11 +308,11 @@ async def skip_media(update: Update, context: CallbackContext) -> int:
                 "• 不需要请回复“无”或发送 /skip_optional\n"
                 "• 需要请以 http:// 或 https:// 开头"
             )
-            return STATE['LINK']
+            return STATE.LINK
 
         # 非媒体模式可以跳过
         await update.message.reply_text(f"✅ 已跳过媒体上传，请发送标签（必选，最多{allowed_tags}个，用逗号分隔，例如：明日方舟，原神）")
-        return STATE['TAG']
+        return STATE.TAG
         
     except Exception as e:
         logger.error(f"检查模式错误: {e}")
@@ -361,7 +361,7 @@ async def prompt_media(update: Update, context: CallbackContext) -> int:
         # 默认提示
         await update.message.reply_text("请发送支持的媒体文件，或发送 /done_media 完成上传")
     
-    return STATE['MEDIA']
+    return STATE.MEDIA
 
 # 添加处理切换到文档模式的回调函数
 async def switch_to_doc_mode(update: Update, context: CallbackContext) -> int:
@@ -430,7 +430,7 @@ async def switch_to_doc_mode(update: Update, context: CallbackContext) -> int:
         
         # 强制结束当前函数处理
         from telegram.ext import ApplicationHandlerStop
-        raise ApplicationHandlerStop(STATE['DOC'])
+        raise ApplicationHandlerStop(STATE.DOC)
         
     except ApplicationHandlerStop as stop:
         # 传递ApplicationHandlerStop异常，包含正确的状态
@@ -447,4 +447,4 @@ async def switch_to_doc_mode(update: Update, context: CallbackContext) -> int:
             logger.error(f"发送错误消息失败: {send_error}", exc_info=True)
         
         # 保持在当前状态
-        return STATE['MEDIA']
+        return STATE.MEDIA
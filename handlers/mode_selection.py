@@ -82,7 +82,7 @@ async def submit(update: Update, context: CallbackContext) -> int:
                 await conn.commit()
                 await show_text_welcome(update, context)
                 logger.info(f"已发送纯文本欢迎信息，切换到TEXT_CONTENT状态，user_id: {user_id}")
-                return STATE['TEXT_CONTENT']
+                return STATE.TEXT_CONTENT
 
             elif bot_mode == MODE_MEDIA:
                 mode = "media"
@@ -92,7 +92,7 @@ async def submit(update: Update, context: CallbackContext) -> int:
                 await conn.commit()
                 await show_media_welcome(update, context)
                 logger.info(f"已发送媒体欢迎信息，切换到MEDIA状态，user_id: {user_id}")
-                return STATE['MEDIA']
+                return STATE.MEDIA
 
             elif bot_mode == MODE_DOCUMENT:
                 mode = "document"
@@ -102,7 +102,7 @@ async def submit(update: Update, context: CallbackContext) -> int:
                 await conn.commit()
                 await show_document_welcome(update, context)
                 logger.info(f"已发送文档欢迎信息，切换到DOC状态，user_id: {user_id}")
-                return STATE['DOC']
+                return STATE.DOC
 
             elif bot_mode == MODE_ALL:
                 # 全部模式：文本+媒体+文档
@@ -132,7 +132,7 @@ async def submit(update: Update, context: CallbackContext) -> int:
                     reply_markup=markup
                 )
                 logger.info(f"已发送全部模式选择提示，切换到START_MODE状态，user_id: {user_id}")
-                return STATE['START_MODE']
+                return STATE.START_MODE
 
             else:  # 混合模式 (MIXED)
                 # 先创建数据库记录
@@ -160,7 +160,7 @@ async def submit(update: Update, context: CallbackContext) -> int:
                     reply_markup=markup
                 )
                 logger.info(f"已发送模式选择提示，切换到START_MODE状态，user_id: {user_id}")
-                return STATE['START_MODE']
+                return STATE.START_MODE
     except Exception as e:
         logger.error(f"初始化数据错误: {e}", exc_info=True)
         await update.message.reply_text("❌ 初始化失败，请稍后再试")
@@ -267,7 +267,7 @@ async def select_mode(update: Update, context: CallbackContext) -> int:
                 await conn.commit()
                 await update.message.reply_text("✅ 已选择纯文本投稿模式", reply_markup=ReplyKeyboardRemove())
                 await show_text_welcome(update, context)
-                return STATE['TEXT_CONTENT']
+                return STATE.TEXT_CONTENT
 
             elif "媒体" in text or "📷" in text or "🖼" in text:
                 # 选择媒体投稿模式
@@ -277,7 +277,7 @@ async def select_mode(update: Update, context: CallbackContext) -> int:
                 await conn.commit()
                 await update.message.reply_text("✅ 已选择媒体投稿模式", reply_markup=ReplyKeyboardRemove())
                 await show_media_welcome(update, context)
-                return STATE['MEDIA']
+                return STATE.MEDIA
 
             elif "文档" in text or "📄" in text or "📁" in text:
                 # 选择文档投稿模式
@@ -287,7 +287,7 @@ async def select_mode(update: Update, context: CallbackContext) -> int:
                 await conn.commit()
                 await update.message.reply_text("✅ 已选择文档投稿模式", reply_markup=ReplyKeyboardRemove())
                 await show_document_welcome(update, context)
-                return STATE['DOC']
+                return STATE.DOC
 
             else:
                 # 无效选择，根据当前模式显示不同键盘
@@ -308,7 +308,7 @@ async def select_mode(update: Update, context: CallbackContext) -> int:
                     "⚠️ 请选择有效的投稿类型：",
                     reply_markup=markup
                 )
-                return STATE['START_MODE']
+                return STATE.START_MODE
     except Exception as e:
         logger.error(f"模式选择错误: {e}", exc_info=True)
         await update.message.reply_text("❌ 模式选择失败，请稍后再试", reply_markup=ReplyKeyboardRemove())
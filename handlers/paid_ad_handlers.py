@@ -1,7 +1,6 @@
 """
 付费广告（/ad）与购买回调处理
 """
-import io
 import html
 import logging
 import time
@@ -15,7 +14,7 @@ from telegram.ext import CallbackContext, ConversationHandler
 from utils import runtime_settings
 from handlers.mode_selection import submit
 from utils.blacklist import is_blacklisted
-from utils.qr_code import make_qr_png_bytes
+from utils.qr_code import make_qr_png_bytes_async
 from utils.paid_ad_service import (
     confirm_paid_by_trade_id,
     create_order_for_package,
@@ -26,8 +25,15 @@ from utils.paid_ad_service import (
 logger = logging.getLogger(__name__)
 
 
+# html.escape 会处理的字符；订单号/金额/ID 等常见值不含这些字符，可跳过转义
+_HTML_SPECIAL_CHARS = frozenset("<>&\"'")
+
+
 def _as_html_code(value: object) -> str:
-    return f"<code>{html.escape(str(value))}</code>"
+    text = value if isinstance(value, str) else str(value)
+    if _HTML_SPECIAL_CHARS.isdisjoint(text):
+        return f"<code>{text}</code>"
+    return f"<code>{html.escape(text)}</code>"
 
 
 def _get_selected_pay_type(context: CallbackContext) -> str:
@@ -139,7 +145,7 @@ async def handle_paid_ad_callback(update: Update, context: CallbackContext) -> O
         return None
 
     if data.startswith("paid_ad_set_type_"):
-        t = data.replace("paid_ad_set_type_", "", 1)
+        t = data.removeprefix("paid_ad_set_type_")
         if t not in (runtime_settings.upay_allowed_types() or []):
             await query.answer("❌ 无效币种", show_alert=True)
             return None
@@ -153,7 +159,7 @@ async def handle_paid_ad_callback(update: Update, context: CallbackContext) -> O
         return None
 
     if data.startswith("paid_ad_buy_"):
-        sku_id = data.replace("paid_ad_buy_", "", 1)
+        sku_id = data.removeprefix("paid_ad_buy_")
         try:
             order = await create_order_for_package(
                 user_id=user_id,
@@ -233,18 +239,16 @@ async def handle_paid_ad_callback(update: Update, context: CallbackContext) -> O
             caption = "\n".join([x for x in caption_lines if x])
 
             try:
-                qr_png = make_qr_png_bytes(pay_address)
-                f = io.BytesIO(qr_png)
-                f.name = "payment_qr.png"
+                qr_png = await make_qr_png_bytes_async(pay_address)
                 await context.bot.send_photo(
                     chat_id=chat_id,
-                    photo=InputFile(f),
+                    photo=InputFile(qr_png, filename="payment_qr.png"),
                     caption=caption,
                     parse_mode=ParseMode.HTML,
                     reply_markup=InlineKeyboardMarkup(rows),
                 )
             except Exception as e:
-                logger.warning(f"发送收款二维码失败，将降级为纯文字提示: {e}", exc_info=True)
+                logger.warning(f"发送收款二维码失败，将降级为纯文字提示: {e}")
                 await context.bot.send_message(
                     chat_id=chat_id,
                     text=caption,
@@ -255,7 +259,7 @@ async def handle_paid_ad_callback(update: Update, context: CallbackContext) -> O
         return None
 
     if data.startswith("paid_ad_check_"):
-        out_trade_no = data.replace("paid_ad_check_", "", 1)
+        out_trade_no = data.removeprefix("paid_ad_check_")
         try:
             ok = await confirm_paid_by_trade_id(out_trade_no)
         except Exception as e:
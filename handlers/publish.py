@@ -4,6 +4,8 @@
 import json
 import logging
 import asyncio
+import sqlite3
+from dataclasses import dataclass
 from datetime import datetime
 from telegram import (
     Update,
@@ -15,6 +17,7 @@ from telegram import (
     InlineKeyboardButton,
     InlineKeyboardMarkup,
 )
+from telegram.error import NetworkError, TelegramError, TimedOut
 from telegram.ext import ConversationHandler, CallbackContext
 
 from config.settings import (
@@ -22,17 +25,21 @@ from config.settings import (
     NET_TIMEOUT,
     OWNER_ID,
 )
-from database.db_manager import get_db, cleanup_old_data
-from utils.helper_functions import build_caption, safe_send
+from database.db_manager import get_db, get_db_tx, cleanup_old_data
+from utils.helper_functions import build_caption, safe_send, parse_media_items, spawn_background
 from utils.submit_settings import get_snapshot
 from utils.search_engine import get_search_engine, PostDocument
 from handlers.review_handlers import perform_review, save_fingerprint_after_publish
 from utils.rating_service import get_rating_service
 from utils.paid_ad_service import reserve_one_credit, refund_one_credit
 from utils import runtime_settings
+from utils.write_queue import collect_batch
 
 logger = logging.getLogger(__name__)
 
+# 需要休眠后再继续发送的网络类错误（TimedOut 是 NetworkError 的子类，这里显式列出便于阅读）
+_NETWORK_ERRORS = (TimedOut, NetworkError)
+
 
 async def publish_to_channel(context: CallbackContext, post_data: dict):
     """
@@ -51,6 +58,168 @@ async def publish_to_channel(context: CallbackContext, post_data: dict):
     return sent_message
 
 
+@dataclass(frozen=True)
+class SubmissionFields:
+    """投稿记录中发布、审核、指纹共用的文本字段"""
+    title: str
+    note: str
+    link: str
+    tags: str
+    username: str
+
+
+def extract_fields(data) -> SubmissionFields:
+    """
+    从投稿数据中提取公共字段（兼容 sqlite3.Row 与 dict）
+
+    Args:
+        data: 投稿数据
+
+    Returns:
+        SubmissionFields: 缺失或为空的字段统一为空字符串（tags 保留原值）
+    """
+    keys = data.keys()
+    return SubmissionFields(
+        title=(data['title'] or '') if 'title' in keys else '',
+        note=(data['note'] or '') if 'note' in keys else '',
+        link=(data['link'] or '') if 'link' in keys else '',
+        tags=data['tags'] if 'tags' in keys else '',
+        username=(data['username'] or '') if 'username' in keys else '',
+    )
+
+
+_INSERT_PUBLISHED_POST_COLUMNS = """
+    INSERT INTO published_posts
+    (message_id, user_id, username, title, tags, link, note,
+     content_type, file_ids, caption, filename, publish_time,
+     last_update, related_message_ids, text_content,
+     rating_subject_id, rating_avg, rating_votes)
+    VALUES """
+_PUBLISHED_POST_VALUES_GROUP = "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+_INSERT_PUBLISHED_POST_SQL = _INSERT_PUBLISHED_POST_COLUMNS + _PUBLISHED_POST_VALUES_GROUP
+
+# INSERT ... RETURNING 需要 SQLite >= 3.35
+_SUPPORTS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+
+class _PublishedPostWriter:
+    """
+    published_posts 批量写入器
+
+    在短时间窗口内（默认 200ms 或 32 行）到达的帖子合并到同一个事务写入，
+    一次提交摊薄 N 次插入的 fsync 开销；提交后用同一个索引写入器批量添加搜索文档。
+    """
+
+    def __init__(self, flush_interval: float = 0.2, max_batch: int = 32):
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._queue = None
+        self._task = None
+        self._loop = None
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._run())
+        return self._queue
+
+    async def submit(self, row: tuple, post_doc: PostDocument):
+        """
+        提交一行待写入数据，等待所在批次提交完成
+
+        Returns:
+            int: 插入行的 post_id
+        """
+        queue = self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        queue.put_nowait((row, post_doc, future))
+        return await future
+
+    async def _run(self):
+        while True:
+            batch = await collect_batch(self._queue, self.max_batch, self.flush_interval)
+            try:
+                await self._flush(batch)
+            except Exception as e:
+                logger.error(f"批量写入 published_posts 失败: {e}", exc_info=True)
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    async def _insert_returning(self, cursor, batch):
+        """
+        单条多行 INSERT ... RETURNING 写入整批，一次往返拿回所有 post_id
+
+        published_posts 以 message_id 作为 INTEGER PRIMARY KEY（即 rowid），
+        RETURNING 的行顺序不保证，因此按 message_id 回填而非按位置。
+
+        Returns:
+            list: [(post_doc, future), ...]；整批失败时抛出异常，由调用方逐行重试
+        """
+        sql = (
+            _INSERT_PUBLISHED_POST_COLUMNS
+            + ", ".join([_PUBLISHED_POST_VALUES_GROUP] * len(batch))
+            + " RETURNING message_id"
+        )
+        params = [value for row, _, _ in batch for value in row]
+        await cursor.execute(sql, params)
+        inserted = {int(r[0]) for r in await cursor.fetchall()}
+        results = []
+        for row, post_doc, future in batch:
+            if int(row[0]) in inserted:
+                post_doc.post_id = int(row[0])
+                results.append((post_doc, future))
+            elif not future.done():
+                future.set_exception(RuntimeError(f"帖子 {row[0]} 未写入 published_posts"))
+        return results
+
+    async def _insert_each(self, cursor, batch):
+        """逐行写入，单行失败（如 message_id 冲突）只影响该行，不回滚整批"""
+        results = []
+        for row, post_doc, future in batch:
+            try:
+                await cursor.execute(_INSERT_PUBLISHED_POST_SQL, row)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+                continue
+            post_doc.post_id = cursor.lastrowid
+            results.append((post_doc, future))
+        return results
+
+    async def _flush(self, batch):
+        results = None
+        # 本身已按窗口合并成批，直接开写事务即可，不再经过 submit_write 的第二层合并窗口
+        async with get_db_tx() as conn:
+            cursor = await conn.cursor()
+            if _SUPPORTS_RETURNING:
+                try:
+                    results = await self._insert_returning(cursor, batch)
+                except Exception as e:
+                    # 多行语句整体失败（如某行 message_id 冲突）时不会留下部分写入，逐行重试以隔离坏行
+                    logger.debug("批量 INSERT ... RETURNING 失败，改为逐行写入: %s", e)
+            if results is None:
+                results = await self._insert_each(cursor, batch)
+        if len(batch) > 1:
+            logger.info("批量写入 published_posts: %d/%d 行", len(results), len(batch))
+
+        # 添加到搜索索引（失败不影响发布流程）
+        try:
+            get_search_engine().add_posts([post_doc for post_doc, _ in results])
+            logger.info("已添加 %d 个帖子到搜索索引", len(results))
+        except Exception as e:
+            logger.error(f"添加到搜索索引失败: {e}", exc_info=True)
+
+        for post_doc, future in results:
+            if not future.done():
+                future.set_result(post_doc.post_id)
+
+
+_published_post_writer = _PublishedPostWriter()
+
+
 async def save_published_post(
     user_id,
     message_id,
@@ -63,6 +232,7 @@ async def save_published_post(
     rating_avg=None,
     rating_votes=None,
     show_submitter=None,
+    caption=None,
 ):
     """
     保存已发布的帖子信息到数据库和搜索索引
@@ -71,10 +241,11 @@ async def save_published_post(
         user_id: 用户ID
         message_id: 频道主消息ID
         data: 投稿数据（sqlite3.Row对象）
-        media_list: 媒体列表
-        doc_list: 文档列表
+        media_list: 媒体列表（结构化 dict 条目，见 parse_media_items）
+        doc_list: 文档列表（结构化 dict 条目）
         all_message_ids: 所有相关消息ID列表（用于多组媒体的热度统计）
         text_content: 纯文本投稿内容
+        caption: 调用方已构建的说明文本；为 None 时按 data 重新构建
     """
     try:
         # 确定内容类型
@@ -90,32 +261,21 @@ async def save_published_post(
         # 获取文件ID列表
         file_ids = json.dumps(media_list if media_list else (doc_list if doc_list else []))
         
-        # 提取标签（从tags字段）- 兼容 sqlite3.Row 对象
-        tags = data['tags'] if 'tags' in data.keys() else ''
-        
-        # 构建说明
-        caption = build_caption(data, show_submitter=show_submitter)
+        # 构建说明（发布流程已构建过则直接复用）
+        if caption is None:
+            caption = build_caption(data, show_submitter=show_submitter)
         
         # 提取信息 - 兼容 sqlite3.Row 对象
-        title = data['title'] if data['title'] else ''
-        note = data['note'] if data['note'] else ''
-        link = data['link'] if data['link'] else ''
-        username = data['username'] if 'username' in data.keys() and data['username'] else f'user{user_id}'
+        fields = extract_fields(data)
+        tags = fields.tags
+        title = fields.title
+        note = fields.note
+        link = fields.link
+        username = fields.username or f'user{user_id}'
         publish_time = datetime.now()
         
-        # 提取文件名（从文档列表中）
-        filename = ''
-        if doc_list:
-            filenames = []
-            for doc_item in doc_list:
-                # 新格式：document:file_id:filename
-                parts = doc_item.split(':', 2)
-                if len(parts) >= 3:
-                    filenames.append(parts[2])
-                elif len(parts) == 2:
-                    # 兼容旧格式 document:file_id
-                    filenames.append('未知文件')
-            filename = ' | '.join(filenames) if filenames else ''
+        # 提取文件名（从文档列表中，旧格式条目无文件名）
+        filename = ' | '.join(d.get('filename', '未知文件') for d in doc_list) if doc_list else ''
         
         # 处理相关消息ID（用于多组媒体热度统计）
         related_ids_json = None
@@ -124,79 +284,110 @@ async def save_published_post(
             related_ids = [mid for mid in all_message_ids if mid != message_id]
             if related_ids:
                 related_ids_json = json.dumps(related_ids)
-                logger.info(f"记录{len(related_ids)}个关联消息ID: {related_ids}")
+                logger.info("记录%d个关联消息ID: %s", len(related_ids), related_ids)
         
         # 评分快照（允许为空，避免破坏现有逻辑）
         rating_subject_id = rating_subject_id if rating_subject_id is not None else None
         rating_avg = float(rating_avg) if rating_avg is not None else 0.0
         rating_votes = int(rating_votes) if rating_votes is not None else 0
 
-        # 保存到数据库并获取 post_id
-        post_id = None
-        async with get_db() as conn:
-            cursor = await conn.cursor()
-            await cursor.execute("""
-                INSERT INTO published_posts
-                (message_id, user_id, username, title, tags, link, note,
-                 content_type, file_ids, caption, filename, publish_time,
-                 last_update, related_message_ids, text_content,
-                 rating_subject_id, rating_avg, rating_votes)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                message_id,
-                user_id,
-                username,
-                title,
-                tags,
-                link,
-                note,
-                content_type,
-                file_ids,
-                caption,
-                filename,
-                publish_time.timestamp(),
-                publish_time.timestamp(),
-                related_ids_json,
-                text_content,
-                rating_subject_id,
-                rating_avg,
-                rating_votes,
-            ))
-            post_id = cursor.lastrowid  # 获取插入的行ID
-            await conn.commit()
-            logger.info(f"已保存帖子 {message_id} (post_id: {post_id}) 到published_posts表（内容类型: {content_type}）")
-        
-        # 添加到搜索索引
+        # 构建搜索文档（将 note 作为 description），post_id 由批量写入器回填
+        post_doc = PostDocument(
+            message_id=message_id,
+            title=title,
+            description=note,
+            tags=tags,
+            filename=filename,
+            link=link,
+            user_id=user_id,
+            username=username,
+            publish_time=publish_time,
+            views=0,
+            heat_score=0
+        )
+
+        # 保存到数据库并添加到搜索索引（短时间窗口内的发布合并为一个事务）
+        post_id = await _published_post_writer.submit((
+            message_id,
+            user_id,
+            username,
+            title,
+            tags,
+            link,
+            note,
+            content_type,
+            file_ids,
+            caption,
+            filename,
+            publish_time.timestamp(),
+            publish_time.timestamp(),
+            related_ids_json,
+            text_content,
+            rating_subject_id,
+            rating_avg,
+            rating_votes,
+        ), post_doc)
+        logger.info("已保存帖子 %s (post_id: %s) 到published_posts表（内容类型: %s）", message_id, post_id, content_type)
+
+    except Exception as e:
+        logger.error(f"保存帖子信息到数据库失败: {e}")
+
+async def _notify_owner(context, update, username, submission_link):
+    """
+    向所有者发送新投稿通知
+
+    Args:
+        context: 回调上下文
+        update: Telegram 更新对象（用于获取投稿人信息及失败时提示用户）
+        username: 投稿记录中的用户名（投稿人无 Telegram 用户名时使用）
+        submission_link: 投稿链接
+    """
+    user = update.effective_user
+    user_id = user.id
+    # 获取用户名信息，优先使用真实用户名
+    real_username = user.username or username
+
+    # 构建纯文本通知消息（不使用任何Markdown，确保最大兼容性）
+    notification_text = (
+        f"📨 新投稿通知\n\n"
+        f"👤 投稿人信息:\n"
+        f"  • ID: {user_id}\n"
+        f"  • 用户名: {('@' + real_username) if user.username else real_username}\n"
+        f"  • 昵称: {user.first_name}{f' {user.last_name}' if user.last_name else ''}\n\n"
+
+        f"🔗 查看投稿: {submission_link}\n\n"
+
+        f"⚙️ 管理操作:\n"
+        f"封禁此用户: /blacklist_add {user_id} 违规内容\n"
+        f"查看黑名单: /blacklist_list"
+    )
+
+    try:
         try:
-            search_engine = get_search_engine()
-            
-            # 构建搜索文档
-            # 将 note 作为 description
-            post_doc = PostDocument(
-                message_id=message_id,
-                post_id=post_id,  # 传入数据库ID
-                title=title,
-                description=note,  # 使用note作为描述
-                tags=tags,
-                filename=filename,  # 文件名
-                link=link,
-                user_id=user_id,
-                username=username,
-                publish_time=publish_time,
-                views=0,
-                heat_score=0
+            message = await context.bot.send_message(
+                chat_id=OWNER_ID,
+                text=notification_text
             )
-            
-            # 添加到索引
-            search_engine.add_post(post_doc)
-            logger.info(f"已添加帖子 {message_id} (post_id: {post_id}) 到搜索索引（文件名: {filename}）")
-            
+            logger.info("通知发送成功！消息ID: %s", message.message_id)
         except Exception as e:
-            logger.error(f"添加到搜索索引失败: {e}", exc_info=True)
-            # 继续执行，不影响发布流程
-            
+            logger.error(f"发送通知失败: {e}")
+            # 尝试使用更简化的消息
+            try:
+                simple_msg = f"📨 新投稿通知 - 用户 {real_username} (ID: {user_id}) 发布了新投稿\n链接: {submission_link}\n\n封禁命令: /blacklist_add {user_id} 违规内容"
+                await context.bot.send_message(
+                    chat_id=OWNER_ID,
+                    text=simple_msg
+                )
+                logger.info("使用简化消息成功发送通知")
+            except Exception as e2:
+                logger.error(f"发送简化通知也失败: {e2}")
+                # 通知用户有问题
+                await update.message.reply_text(
+                    "⚠️ 投稿已发布，但无法通知管理员。请直接联系管理员。"
+                )
     except Exception as e:
-        logger.error(f"保存帖子信息到数据库失败: {e}")
+        logger.error(f"处理通知过程中发生错误: 错误类型: {type(e)}, 详细信息: {str(e)}", exc_info=True)
+
 
 async def publish_submission(update: Update, context: CallbackContext) -> int:
     """
@@ -238,20 +429,38 @@ async def publish_submission(update: Update, context: CallbackContext) -> int:
         
         try:
             if data["image_id"]:
-                media_list = json.loads(data["image_id"])
+                media_list = parse_media_items(json.loads(data["image_id"]))
         except (json.JSONDecodeError, TypeError):
             logger.warning(f"解析媒体数据失败，user_id: {user_id}")
             media_list = []
             
         try:
             if data["document_id"]:
-                doc_list = json.loads(data["document_id"])
+                doc_list = parse_media_items(json.loads(data["document_id"]))
         except (json.JSONDecodeError, TypeError):
             logger.warning(f"解析文档数据失败，user_id: {user_id}")
             doc_list = []
         
         # 获取纯文本内容
         text_content = data["text_content"] if "text_content" in data.keys() and data["text_content"] else None
+        fields = extract_fields(data)
+
+        # 审核与指纹共用的投稿数据（同时保存完整发布所需字段，供人工审核通过后发布）
+        submission_data = {
+            'text_content': text_content,
+            'title': fields.title,
+            'note': fields.note,
+            'tags': fields.tags,
+            'link': fields.link,
+            'image_id': data['image_id'] if 'image_id' in data.keys() else '[]',
+            'document_id': data['document_id'] if 'document_id' in data.keys() else '[]',
+            'spoiler': data['spoiler'] if 'spoiler' in data.keys() and data['spoiler'] else 'false',
+            'mode': data['mode'] if 'mode' in data.keys() else '',
+        }
+        # 用户 bio 仅在审核或指纹需要时获取一次
+        user_bio = None
+        # 审核阶段的用户信息（执行重复检测时带有已生成的指纹，发布后保存指纹时复用）
+        user_info = None
 
         if not media_list and not doc_list and not text_content:
             await update.message.reply_text("❌ 未检测到任何上传文件或文本内容，请重新发送 /start")
@@ -261,23 +470,6 @@ async def publish_submission(update: Update, context: CallbackContext) -> int:
 
         # === 审核流程：重复检测和 AI 审核 ===
         if runtime_settings.duplicate_check_enabled() or runtime_settings.ai_review_enabled():
-            # 构建投稿数据用于审核（同时保存完整发布所需字段，供人工审核通过后发布）
-            submission_data = {
-                'text_content': text_content,
-                'title': data['title'] if data['title'] else '',
-                'note': data['note'] if data['note'] else '',
-                'tags': data['tags'] if 'tags' in data.keys() else '',
-                'link': data['link'] if data['link'] else '',
-                'image_id': data['image_id'] if 'image_id' in data.keys() else '[]',
-                'document_id': data['document_id'] if 'document_id' in data.keys() else '[]',
-                'spoiler': data['spoiler'] if 'spoiler' in data.keys() and data['spoiler'] else 'false',
-                'mode': data['mode'] if 'mode' in data.keys() else '',
-            }
-
-            # 获取用户信息
-            user = update.effective_user
-            username = data['username'] if 'username' in data.keys() and data['username'] else ''
-
             # 尝试获取用户 bio（用于重复检测）
             user_bio = ''
             try:
@@ -288,7 +480,7 @@ async def publish_submission(update: Update, context: CallbackContext) -> int:
 
             user_info = {
                 'user_id': user_id,
-                'username': username or user.username or '',
+                'username': fields.username or update.effective_user.username or '',
                 'bio': user_bio
             }
 
@@ -426,6 +618,7 @@ async def publish_submission(update: Update, context: CallbackContext) -> int:
             rating_avg=rating_avg,
             rating_votes=rating_votes,
             show_submitter=show_submitter,
+            caption=caption,
         )
 
         # 为频道消息附加评分键盘
@@ -445,122 +638,37 @@ async def publish_submission(update: Update, context: CallbackContext) -> int:
         # 保存投稿指纹（用于重复检测）
         if runtime_settings.duplicate_check_enabled():
             try:
-                # 构建投稿数据
-                submission_data = {
-                    'text_content': text_content,
-                    'title': data['title'] if data['title'] else '',
-                    'note': data['note'] if data['note'] else '',
-                    'tags': data['tags'] if 'tags' in data.keys() else '',
-                    'link': data['link'] if data['link'] else ''
-                }
-
-                # 获取用户名
-                user = update.effective_user
-                username = data['username'] if 'username' in data.keys() and data['username'] else ''
-
-                # 尝试获取用户 bio
-                user_bio = ''
-                try:
-                    chat = await context.bot.get_chat(user_id)
-                    user_bio = chat.bio or ''
-                except Exception:
-                    pass
+                # 尝试获取用户 bio（审核阶段已获取则直接复用）
+                if user_bio is None:
+                    user_bio = ''
+                    try:
+                        chat = await context.bot.get_chat(user_id)
+                        user_bio = chat.bio or ''
+                    except Exception:
+                        pass
 
                 await save_fingerprint_after_publish(
                     user_id=user_id,
-                    username=username or user.username or '',
+                    username=fields.username or update.effective_user.username or '',
                     submission_data=submission_data,
                     user_bio=user_bio,
-                    submission_id=sent_message.message_id
+                    submission_id=sent_message.message_id,
+                    fingerprint=user_info.get('fingerprint') if user_info else None,
                 )
                 logger.info(f"已保存投稿指纹: user_id={user_id}, message_id={sent_message.message_id}")
             except Exception as e:
                 logger.error(f"保存投稿指纹失败: {e}")
 
-        # 向所有者发送投稿通知
+        # 向所有者发送投稿通知（后台发送，不阻塞发布流程；OWNER_ID 已在配置加载时校验为 int 或 None）
         if notify_owner and OWNER_ID:
-            # 记录详细的调试信息
-            logger.info(f"准备发送通知: notify_owner={notify_owner}, OWNER_ID={OWNER_ID}, 类型={type(OWNER_ID)}")
-            
-            # 获取用户名信息
-            username = None
-            try:
-                username = data["username"] if "username" in data else f"user{user_id}"
-            except (KeyError, TypeError):
-                username = f"user{user_id}"
-                
-            # 获取用户名信息，优先使用真实用户名
-            user = update.effective_user
-            real_username = user.username or username
-            
-            # 安全处理可能缺失的数据字段
-            try:
-                mode = data["mode"] if "mode" in data else "未知"
-                media_count = len(json.loads(data["image_id"])) if "image_id" in data and data["image_id"] else 0
-                doc_count = len(json.loads(data["document_id"])) if "document_id" in data and data["document_id"] else 0
-                tag_text = data["tag"] if "tag" in data else "无"
-                title_text = data["title"] if "title" in data else "无"
-                spoiler_text = "是" if "spoiler" in data and data["spoiler"] == "true" else "否"
-            except Exception as e:
-                logger.error(f"数据处理错误: {e}")
-                # 设置默认值
-                mode = "未知"
-                media_count = 0
-                doc_count = 0
-                tag_text = "无"
-                title_text = "无"
-                spoiler_text = "否"
-            
-            # 构建纯文本通知消息（不使用任何Markdown，确保最大兼容性）
-            notification_text = (
-                f"📨 新投稿通知\n\n"
-                f"👤 投稿人信息:\n"
-                f"  • ID: {user_id}\n"
-                f"  • 用户名: {('@' + real_username) if user.username else real_username}\n"
-                f"  • 昵称: {user.first_name}{f' {user.last_name}' if user.last_name else ''}\n\n"
-                
-                f"🔗 查看投稿: {submission_link}\n\n"
-                
-                f"⚙️ 管理操作:\n"
-                f"封禁此用户: /blacklist_add {user_id} 违规内容\n"
-                f"查看黑名单: /blacklist_list"
-            )
-            
-            try:
-                # OWNER_ID 已经在配置中转换为整数类型，直接使用
-                logger.info(f"准备发送通知到所有者: {OWNER_ID}")
-                
-                # 记录通知消息内容
-                logger.info(f"通知消息长度: {len(notification_text)}, 使用纯文本格式")
-                
-                # 简化尝试逻辑 - 直接使用纯文本，不尝试任何格式化
-                try:
-                    message = await context.bot.send_message(
-                        chat_id=OWNER_ID,
-                        text=notification_text
-                    )
-                    logger.info(f"通知发送成功！消息ID: {message.message_id}")
-                except Exception as e:
-                    logger.error(f"发送通知失败: {e}")
-                    # 尝试使用更简化的消息
-                    try:
-                        simple_msg = f"📨 新投稿通知 - 用户 {real_username} (ID: {user_id}) 发布了新投稿\n链接: {submission_link}\n\n封禁命令: /blacklist_add {user_id} 违规内容"
-                        await context.bot.send_message(
-                            chat_id=OWNER_ID,
-                            text=simple_msg
-                        )
-                        logger.info("使用简化消息成功发送通知")
-                    except Exception as e2:
-                        logger.error(f"发送简化通知也失败: {e2}")
-                        # 通知用户有问题
-                        await update.message.reply_text(
-                            "⚠️ 投稿已发布，但无法通知管理员。请直接联系管理员。"
-                        )
-            except Exception as e:
-                logger.error(f"处理通知过程中发生错误: 错误类型: {type(e)}, 详细信息: {str(e)}")
-                logger.error("异常追踪: ", exc_info=True)
+            spawn_background(_notify_owner(
+                context,
+                update,
+                fields.username or f"user{user_id}",
+                submission_link,
+            ))
         else:
-            logger.info(f"不发送通知: notify_owner={notify_owner}, OWNER_ID={OWNER_ID}")
+            logger.info("不发送通知: notify_owner=%s, OWNER_ID=%s", notify_owner, OWNER_ID)
         
     except Exception as e:
         logger.error(f"发布投稿失败: {e}")
@@ -586,7 +694,7 @@ async def handle_media_publish(context, media_list, caption, spoiler_flag):
     
     Args:
         context: 回调上下文
-        media_list: 媒体列表
+        media_list: 媒体列表（结构化 dict 条目）
         caption: 说明文本
         spoiler_flag: 是否剧透标志
         
@@ -600,7 +708,7 @@ async def handle_media_publish(context, media_list, caption, spoiler_flag):
     # 不管SHOW_SUBMITTER如何设置，当caption超过850字符时都单独发送
     # 使用较小的阈值（850而不是1000）来确保足够的安全边际
     if caption and len(caption) > 850:
-        logger.info(f"Caption过长 ({len(caption)} 字符)，单独发送caption")
+        logger.info("Caption过长 (%d 字符)，单独发送caption", len(caption))
         try:
             caption_message = await safe_send(
                 context.bot.send_message,
@@ -616,7 +724,7 @@ async def handle_media_publish(context, media_list, caption, spoiler_flag):
 
     # 单个媒体处理
     if len(media_list) == 1:
-        typ, file_id = media_list[0].split(":", 1)
+        typ, file_id = media_list[0]["type"], media_list[0]["file_id"]
         try:
             # 如果已经单独发送了caption，则不再添加到媒体
             media_caption = None if caption_message else caption
@@ -689,10 +797,10 @@ async def handle_media_publish(context, media_list, caption, spoiler_flag):
                 media_group = []
                 
                 group_number = chunk_index // 10 + 1
-                logger.info(f"处理第{group_number}组媒体，共{len(media_chunk)}个项目 (总共{total_groups}组)")
+                logger.info("处理第%d组媒体，共%d个项目 (总共%d组)", group_number, len(media_chunk), total_groups)
                 
                 for i, m in enumerate(media_chunk):
-                    typ, file_id = m.split(":", 1)
+                    typ, file_id = m["type"], m["file_id"]
                     # 只在第一组的第一个媒体添加说明（如果caption不为None且没有单独发送）
                     # 强制设置简短的caption，即使SHOW_SUBMITTER=True也能可靠发送
                     use_caption = caption if (chunk_index == 0 and i == 0 and caption is not None and not caption_message) else None
@@ -729,7 +837,7 @@ async def handle_media_publish(context, media_list, caption, spoiler_flag):
                 # 发送当前组，增加超时参数
                 extended_timeout = 60  # 更长的超时时间，避免误判为超时
                 if first_message is None:
-                    logger.info(f"发送第{group_number}组媒体（首组），{len(media_group)}个媒体项目")
+                    logger.info("发送第%d组媒体（首组），%d个媒体项目", group_number, len(media_group))
                     # 第一组直接发送
                     try:
                         sent_messages = await asyncio.wait_for(
@@ -743,23 +851,23 @@ async def handle_media_publish(context, media_list, caption, spoiler_flag):
                         if sent_messages and len(sent_messages) > 0:
                             all_sent_messages.extend(sent_messages)
                             first_message = sent_messages[0]  # 保存第一条消息，用于回复
-                            logger.info(f"第{group_number}组媒体发送成功，message_id={first_message.message_id}")
+                            logger.info("第%d组媒体发送成功，message_id=%s", group_number, first_message.message_id)
                             success_groups += 1
                         else:
                             logger.error(f"第{group_number}组媒体发送返回空结果")
                     except asyncio.TimeoutError:
-                        logger.warning(f"第{group_number}组媒体发送超时，但可能已成功发送")
+                        logger.warning("第%d组媒体发送超时，但可能已成功发送", group_number)
                         # 即使超时，尝试继续后续组的发送
                         # 等待3秒，让Telegram服务器有时间处理
                         await asyncio.sleep(3)
-                    except Exception as e:
+                    except TelegramError as e:
                         logger.error(f"第{group_number}组媒体发送失败: {e}")
                         
                         # 如果是网络相关错误，休眠更长时间后继续
-                        if any(keyword in str(e).lower() for keyword in ["network", "connection", "timeout"]):
+                        if isinstance(e, _NETWORK_ERRORS):
                             await asyncio.sleep(5)
                 else:
-                    logger.info(f"发送第{group_number}组媒体（回复组），{len(media_group)}个媒体项目，回复到message_id={first_message.message_id}")
+                    logger.info("发送第%d组媒体（回复组），%d个媒体项目，回复到message_id=%s", group_number, len(media_group), first_message.message_id)
                     # 后续组作为回复发送到第一条消息
                     try:
                         sent_messages = await asyncio.wait_for(
@@ -773,20 +881,20 @@ async def handle_media_publish(context, media_list, caption, spoiler_flag):
                         
                         if sent_messages and len(sent_messages) > 0:
                             all_sent_messages.extend(sent_messages)
-                            logger.info(f"第{group_number}组媒体发送成功，第一条message_id={sent_messages[0].message_id}")
+                            logger.info("第%d组媒体发送成功，第一条message_id=%s", group_number, sent_messages[0].message_id)
                             success_groups += 1
                         else:
                             logger.error(f"第{group_number}组媒体发送返回空结果")
                     except asyncio.TimeoutError:
-                        logger.warning(f"第{group_number}组媒体发送超时，但可能已成功发送")
+                        logger.warning("第%d组媒体发送超时，但可能已成功发送", group_number)
                         # 即使超时，尝试继续后续组的发送
                         # 等待3秒，让Telegram服务器有时间处理
                         await asyncio.sleep(3)
-                    except Exception as e:
+                    except TelegramError as e:
                         logger.error(f"第{group_number}组媒体发送失败: {e}")
                         
                         # 如果是网络相关错误，休眠更长时间后继续
-                        if any(keyword in str(e).lower() for keyword in ["network", "connection", "timeout"]):
+                        if isinstance(e, _NETWORK_ERRORS):
                             await asyncio.sleep(5)
                 
                 # 添加更长的延迟，避免API限制
@@ -796,18 +904,16 @@ async def handle_media_publish(context, media_list, caption, spoiler_flag):
             # 计算实际处理的媒体数量并记录结果
             total_media_estimate = success_groups * 10
             if success_groups < total_groups and len(all_sent_messages) == 0:
-                logger.warning(f"媒体发送部分超时，预计已发送约{total_media_estimate}个媒体项目（可能不准确）")
+                logger.warning("媒体发送部分超时，预计已发送约%d个媒体项目（可能不准确）", total_media_estimate)
             else:
-                logger.info(f"所有媒体发送完成，{success_groups}/{total_groups}组成功，共{len(all_sent_messages)}个媒体项目成功记录")
+                logger.info("所有媒体发送完成，%d/%d组成功，共%d个媒体项目成功记录", success_groups, total_groups, len(all_sent_messages))
             
             # 收集所有消息ID
-            all_message_ids = []
-            if caption_message:
-                all_message_ids.append(caption_message.message_id)
-            all_message_ids.extend([msg.message_id for msg in all_sent_messages])
+            sent_ids = (msg.message_id for msg in all_sent_messages)
+            all_message_ids = [caption_message.message_id, *sent_ids] if caption_message else list(sent_ids)
             
             # 返回主消息和所有消息ID
-            main_msg = first_message if first_message else (all_sent_messages[0] if all_sent_messages else None)
+            main_msg = first_message or (all_sent_messages[0] if all_sent_messages else None)
             return (main_msg, all_message_ids)
         except Exception as e:
             logger.error(f"发送媒体组失败: {e}")
@@ -852,7 +958,7 @@ async def handle_text_publish(context, text_content, caption, spoiler_flag, pref
             text=full_text,
             parse_mode='HTML'
         )
-        logger.info(f"纯文本投稿发送成功，message_id={sent_message.message_id}")
+        logger.info("纯文本投稿发送成功，message_id=%s", sent_message.message_id)
         return sent_message
     except Exception as e:
         logger.error(f"发送纯文本投稿失败: {e}")
@@ -865,7 +971,7 @@ async def handle_document_publish(context, doc_list, caption=None, reply_to_mess
     
     Args:
         context: 回调上下文
-        doc_list: 文档列表
+        doc_list: 文档列表（结构化 dict 条目）
         caption: 说明文本，如果为None则不添加说明
         reply_to_message_id: 回复的消息ID，如果为None则创建新消息
         
@@ -874,8 +980,7 @@ async def handle_document_publish(context, doc_list, caption=None, reply_to_mess
     """
     if len(doc_list) == 1 and caption is not None:
         # 单个文档处理
-        parts = doc_list[0].split(":", 2)
-        file_id = parts[1] if len(parts) >= 2 else parts[0]
+        file_id = doc_list[0]["file_id"]
         try:
             return await safe_send(
                 context.bot.send_document,
@@ -893,9 +998,7 @@ async def handle_document_publish(context, doc_list, caption=None, reply_to_mess
         try:
             doc_media_group = []
             for i, doc_item in enumerate(doc_list):
-                # 新格式：document:file_id:filename 或 旧格式：document:file_id
-                parts = doc_item.split(":", 2)
-                file_id = parts[1] if len(parts) >= 2 else parts[0]
+                file_id = doc_item["file_id"]
                 # 只在最后一个文档添加说明，且caption不为None
                 caption_to_use = caption if (i == len(doc_list) - 1 and caption is not None) else None
                 doc_media_group.append(InputMediaDocument(
@@ -6,16 +6,69 @@
 - 更新评分聚合数据
 - 刷新当前消息下方的评分按钮展示
 """
+import asyncio
 import logging
+import sqlite3
+import weakref
 from telegram import Update
 from telegram.ext import CallbackContext
 
-from database.db_manager import get_db
+from database.db_manager import get_db_tx
 from ui.keyboards import Keyboards
 from utils import runtime_settings
+from utils.cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# 评分路径上的 SQL 均为静态文本，只绑定参数，可直接命中 sqlite3 连接级语句缓存。
+# 投票时间戳使用毫秒精度，便于通过 created_at == updated_at 区分“新增”与“修改”
+_NOW_SQL = "((julianday('now') - 2440587.5) * 86400.0)"
+
+# 新增投票或（允许修改且星级变化时）更新投票；其余情况不写入
+_UPSERT_VOTE_SQL = f"""
+    INSERT INTO rating_votes (subject_id, user_id, score, created_at, updated_at)
+    VALUES (?, ?, ?, {_NOW_SQL}, {_NOW_SQL})
+    ON CONFLICT(subject_id, user_id) DO UPDATE
+    SET score = excluded.score, updated_at = {_NOW_SQL}
+    WHERE ? AND rating_votes.score != excluded.score
+"""
+# 同上，写入时直接返回是否为新增投票；未写入时不返回行
+_UPSERT_VOTE_RETURNING_SQL = _UPSERT_VOTE_SQL + "    RETURNING created_at = updated_at AS is_new\n"
+# 不支持 RETURNING 时，写入后单独读取是否为新增投票
+_SELECT_VOTE_IS_NEW_SQL = "SELECT created_at = updated_at AS is_new FROM rating_votes WHERE subject_id = ? AND user_id = ?"
+
+# UPSERT ... RETURNING 需要 SQLite >= 3.35
+_SUPPORTS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# 读取评分实体的最新聚合结果
+_SELECT_AGGREGATE_SQL = "SELECT avg_score, vote_count FROM rating_subjects WHERE id = ?"
+
+# 每条消息最近一次渲染的评分摘要（平均分保留一位小数、人数），展示不变时跳过键盘刷新
+_last_render = TTLCache(default_ttl=3600, max_size=2048)
+# 每条消息一把锁，串行化“比较 → 编辑 → 更新缓存”，保证缓存与消息上实际展示的内容一致；
+# 无人持有或等待时锁对象自动回收
+_render_locks = weakref.WeakValueDictionary()
+
+
+async def _upsert_vote(cursor, subject_id: int, user_id: int, score: int, allow_update: bool):
+    """
+    写入一票（需在写事务内调用），rating_subjects 聚合由触发器维护
+
+    Returns:
+        新增或更新了投票时返回 (is_new,) 行；已有投票且不允许修改 / 星级未变时返回 None
+    """
+    params = (subject_id, user_id, score, int(allow_update))
+    if _SUPPORTS_RETURNING:
+        await cursor.execute(_UPSERT_VOTE_RETURNING_SQL, params)
+        return await cursor.fetchone()
+
+    await cursor.execute(_UPSERT_VOTE_SQL, params)
+    # 影响行数只统计语句本身写入的行，不含触发器的修改
+    if cursor.rowcount < 1:
+        return None
+    await cursor.execute(_SELECT_VOTE_IS_NEW_SQL, (subject_id, user_id))
+    return await cursor.fetchone()
+
 
 async def handle_rating_callback(update: Update, context: CallbackContext):
     """
@@ -57,106 +110,61 @@ async def handle_rating_callback(update: Update, context: CallbackContext):
         return
 
     try:
-        async with get_db() as conn:
+        allow_update = runtime_settings.rating_allow_update()
+        # 投票写入与聚合读取在同一个 IMMEDIATE 事务内完成，每次点击只提交一次
+        async with get_db_tx() as conn:
             cursor = await conn.cursor()
 
-            # 查询该用户是否已经对该实体评分
-            await cursor.execute(
-                """
-                SELECT id, score FROM rating_votes
-                WHERE subject_id = ? AND user_id = ?
-                """,
-                (subject_id, user_id),
-            )
-            row = await cursor.fetchone()
-
-            if row is None:
-                # 首次评分：插入记录并更新聚合
-                await cursor.execute(
-                    """
-                    INSERT INTO rating_votes (subject_id, user_id, score, created_at, updated_at)
-                    VALUES (?, ?, ?, strftime('%s', 'now'), strftime('%s', 'now'))
-                    """,
-                    (subject_id, user_id, score),
-                )
+            # 一条 UPSERT 完成投票写入；已有投票且不允许修改 / 星级未变时不更新，也不返回行
+            vote_row = await _upsert_vote(cursor, subject_id, user_id, score, allow_update)
 
-                await cursor.execute(
-                    """
-                    UPDATE rating_subjects
-                    SET score_sum = score_sum + ?,
-                        vote_count = vote_count + 1,
-                        avg_score = CAST(score_sum + ? AS REAL) / (vote_count + 1),
-                        updated_at = strftime('%s', 'now')
-                    WHERE id = ?
-                    """,
-                    (score, score, subject_id),
-                )
+            # 读取最新聚合结果（RETURNING 中的子查询看不到 AFTER 触发器的修改，需单独读取）
+            await cursor.execute(_SELECT_AGGREGATE_SQL, (subject_id,))
+            subject_row = await cursor.fetchone()
 
-                await query.answer("感谢你的评分！")
+        # 事务提交、连接释放后再调用 Telegram 接口，避免网络往返期间占用写锁
+        if vote_row is None:
+            if not allow_update:
+                await query.answer("你已经给这条内容评分过了", show_alert=True)
             else:
-                old_score = int(row["score"])
-
-                if not runtime_settings.rating_allow_update():
-                    await query.answer("你已经给这条内容评分过了", show_alert=True)
-                else:
-                    if old_score == score:
-                        await query.answer("你的评分已是当前星级", show_alert=True)
-                    else:
-                        # 更新评分
-                        await cursor.execute(
-                            """
-                            UPDATE rating_votes
-                            SET score = ?, updated_at = strftime('%s', 'now')
-                            WHERE id = ?
-                            """,
-                            (score, row["id"]),
-                        )
-
-                        delta = score - old_score
-                        await cursor.execute(
-                            """
-                            UPDATE rating_subjects
-                            SET score_sum = score_sum + ?,
-                                avg_score = CASE
-                                    WHEN vote_count > 0 THEN CAST(score_sum + ? AS REAL) / vote_count
-                                    ELSE 0.0
-                                END,
-                                updated_at = strftime('%s', 'now')
-                            WHERE id = ?
-                            """,
-                            (delta, delta, subject_id),
-                        )
-
-                        await query.answer("已更新你的评分")
-
-            # 读取最新聚合结果
-            await cursor.execute(
-                """
-                SELECT avg_score, vote_count
-                FROM rating_subjects
-                WHERE id = ?
-                """,
-                (subject_id,),
-            )
-            subject_row = await cursor.fetchone()
-            if not subject_row:
-                # 数据异常时不尝试刷新按钮
-                return
+                await query.answer("你的评分已是当前星级", show_alert=True)
+        elif vote_row[0]:  # is_new：新增投票
+            await query.answer("感谢你的评分！")
+        else:
+            await query.answer("已更新你的评分")
+
+        if not subject_row:
+            # 数据异常时不尝试刷新按钮
+            return
 
-            avg_score = float(subject_row["avg_score"] or 0.0)
-            vote_count = int(subject_row["vote_count"] or 0)
+        avg_score, vote_count = subject_row
+        avg_score = float(avg_score or 0.0)
+        vote_count = int(vote_count or 0)
+
+        render_key = f"{query.message.chat_id}:{query.message.message_id}"
+        rendered = (f"{avg_score:.1f}", vote_count)
+        lock = _render_locks.get(render_key)
+        if lock is None:
+            lock = _render_locks[render_key] = asyncio.Lock()
+        async with lock:
+            # 展示内容与上次渲染一致时不再调用 Telegram 编辑接口
+            if _last_render.get(render_key) == rendered:
+                return
 
-        # 刷新当前消息下方的评分键盘
-        try:
-            keyboard = Keyboards.rating_keyboard(subject_id, avg_score, vote_count)
-            await context.bot.edit_message_reply_markup(
-                chat_id=query.message.chat_id,
-                message_id=query.message.message_id,
-                reply_markup=keyboard,
-            )
-        except Exception as e:
-            # UI 刷新失败不影响评分结果
-            logger.error(f"刷新评分键盘失败: {e}", exc_info=True)
+            # 刷新当前消息下方的评分键盘
+            try:
+                keyboard = Keyboards.rating_keyboard(subject_id, avg_score, vote_count)
+                await context.bot.edit_message_reply_markup(
+                    chat_id=query.message.chat_id,
+                    message_id=query.message.message_id,
+                    reply_markup=keyboard,
+                )
+            except Exception as e:
+                # UI 刷新失败不影响评分结果
+                logger.error(f"刷新评分键盘失败: {e}", exc_info=True)
+            else:
+                # 编辑成功后才记录，缓存始终对应消息上实际展示的内容
+                _last_render.set(render_key, rendered)
 
     except Exception as e:
         logger.error(f"处理评分回调时出错: {e}", exc_info=True)
@@ -2,11 +2,16 @@
 审核流程处理模块
 处理 AI 审核和重复检测的完整流程
 """
+import asyncio
 import json
 import logging
+import sqlite3
 import time
 from datetime import datetime
+from typing import Optional, Tuple
+import orjson
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import BadRequest, Forbidden, NetworkError, RetryAfter, TimedOut
 from telegram.ext import ConversationHandler, CallbackContext
 
 from config.settings import (
@@ -15,11 +20,12 @@ from config.settings import (
     OWNER_ID,
     ADMIN_IDS,
 )
-from database.db_manager import get_db
+from database.db_manager import get_db, get_db_tx
 from utils.ai_reviewer import get_ai_reviewer, ReviewResult
 from utils.duplicate_detector import get_duplicate_detector, DuplicateResult
-from utils.feature_extractor import get_feature_extractor
-from utils.paid_ad_service import get_balance
+from utils.feature_extractor import get_feature_extractor, SubmissionFingerprint
+from utils.ratelimit import get_rate_limiter
+from utils.helper_functions import spawn_background
 from utils.submit_policy import get_effective_policy
 from utils import runtime_settings
 
@@ -78,7 +84,8 @@ async def perform_review(
         update: Telegram 更新对象
         context: 回调上下文
         submission_data: 投稿数据
-        user_info: 用户信息 {user_id, username, bio}
+        user_info: 用户信息 {user_id, username, bio}；执行重复检测时，
+            生成的指纹会写入 user_info['fingerprint']，供发布后保存指纹复用
 
     Returns:
         tuple: (is_approved, should_continue, message)
@@ -96,7 +103,7 @@ async def perform_review(
 
     # 1. 重复检测
     if bool((policy.get("duplicate_check") or {}).get("enabled", False)):
-        dup_result = await _check_duplicate(user_id, username, content, user_bio)
+        dup_result, user_info['fingerprint'] = await _check_duplicate(user_id, username, content, user_bio)
         if dup_result.is_duplicate:
             should_block = (
                 dup_result.duplicate_type == "rate_limit"
@@ -151,7 +158,7 @@ async def perform_review(
         return (False, False, "您的投稿已提交，正在等待管理员审核。")
 
     if should_run_ai:
-        review_result = await _perform_ai_review(submission_data)
+        review_result = await _perform_ai_review(submission_data, user_id)
 
         reviewer = get_ai_reviewer()
 
@@ -184,8 +191,8 @@ async def _check_duplicate(
     username: str,
     content: str,
     user_bio: str
-) -> DuplicateResult:
-    """执行重复检测"""
+) -> Tuple[DuplicateResult, SubmissionFingerprint]:
+    """执行重复检测，同时返回生成的指纹"""
     detector = get_duplicate_detector()
     extractor = get_feature_extractor()
 
@@ -200,13 +207,142 @@ async def _check_duplicate(
     # 检测重复
     result = await detector.check(fingerprint)
 
-    return result
+    return result, fingerprint
+
+
+# 主题无关拒绝时附带的付费广告入口键盘（结构固定，模块加载时构建一次）
+_OFF_TOPIC_KEYBOARD = InlineKeyboardMarkup([
+    [
+        InlineKeyboardButton("购买广告次数", callback_data="paid_ad_buy_menu"),
+        InlineKeyboardButton("查看余额", callback_data="paid_ad_balance"),
+    ],
+    [
+        InlineKeyboardButton("广告发布 /ad", callback_data="paid_ad_howto"),
+    ],
+])
+
+# 管理员通知消息模板（数值字段在渲染前格式化好，通过 format_map 填充）
+_DUPLICATE_ADMIN_TMPL = (
+    "🔔 重复投稿检测通知\n\n"
+    "用户：@{username} (ID: {user_id})\n"
+    "类型：{duplicate_type}\n"
+    "已拦截：{blocked}\n"
+    "相似度：{similarity_pct}\n"
+    "详情：{detail}"
+)
+
+_REJECT_ADMIN_TMPL = (
+    "🔔 投稿自动拒绝通知\n\n"
+    "用户：@{username} (ID: {user_id})\n"
+    "分类：{category}\n"
+    "置信度：{confidence_pct}\n"
+    "原因：{reason}\n\n"
+    "内容预览：\n{preview}"
+)
+
+_MANUAL_REVIEW_ADMIN_TMPL = (
+    "🔔 新投稿待审核\n\n"
+    "投稿人：@{username} (ID: {user_id})\n"
+    "投稿时间：{submit_time}\n\n"
+    "内容：\n{preview}\n\n"
+    "标签：{tags}\n"
+    "链接：{link}\n\n"
+    "AI 审核结果：\n"
+    "• 置信度：{confidence_pct}\n"
+    "• 分类：{category}\n"
+    "• 原因：{reason}"
+)
+
+
+# 管理员通知并发上限，避免占满 PTB 连接池并控制在 Telegram 全局发送频率之内
+_ADMIN_NOTIFY_CONCURRENCY = 8
+
+# 按事件循环创建（信号量不能跨事件循环使用）
+_admin_notify_semaphore: Optional[asyncio.Semaphore] = None
+_admin_notify_semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _get_admin_notify_semaphore() -> asyncio.Semaphore:
+    """获取当前事件循环的管理员通知并发信号量"""
+    global _admin_notify_semaphore, _admin_notify_semaphore_loop
+    loop = asyncio.get_running_loop()
+    if _admin_notify_semaphore is None or _admin_notify_semaphore_loop is not loop:
+        _admin_notify_semaphore = asyncio.Semaphore(_ADMIN_NOTIFY_CONCURRENCY)
+        _admin_notify_semaphore_loop = loop
+    return _admin_notify_semaphore
+
+
+# 单个管理员通知的最大尝试次数
+_ADMIN_NOTIFY_ATTEMPTS = 3
+
+
+def _retry_after_seconds(error: RetryAfter) -> float:
+    """兼容 retry_after 为秒数或 timedelta 的情况"""
+    retry_after = error.retry_after
+    if hasattr(retry_after, "total_seconds"):
+        return retry_after.total_seconds()
+    return float(retry_after)
+
+
+async def _safe_send_admin(context: CallbackContext, admin_id: int, text: str, reply_markup=None):
+    """
+    向单个管理员发送通知，失败只记录日志
+
+    RetryAfter 时仅让该管理员等待冷却后重试，网络错误按指数退避重试，
+    不影响其他管理员的通知。
+    """
+    rate_limiter = get_rate_limiter()
+    for attempt in range(_ADMIN_NOTIFY_ATTEMPTS):
+        last_attempt = attempt == _ADMIN_NOTIFY_ATTEMPTS - 1
+        try:
+            async with rate_limiter.acquire(admin_id):
+                # 只在发送期间占用并发名额，冷却 / 退避等待时不占用，其他管理员的通知不受影响
+                async with _get_admin_notify_semaphore():
+                    await context.bot.send_message(chat_id=admin_id, text=text, reply_markup=reply_markup)
+            return
+        except Forbidden as e:
+            # 管理员未启动机器人或已屏蔽，重试无意义
+            logger.warning(f"无法通知管理员 {admin_id}: {e}")
+            return
+        except BadRequest as e:
+            # BadRequest 继承自 NetworkError，但属于请求本身的错误，重试无意义
+            logger.error(f"通知管理员 {admin_id} 失败: {e}")
+            return
+        except RetryAfter as e:
+            if last_attempt:
+                logger.error(f"通知管理员 {admin_id} 失败: {e}")
+                return
+            await asyncio.sleep(_retry_after_seconds(e))
+        except (TimedOut, NetworkError) as e:
+            if last_attempt:
+                logger.error(f"通知管理员 {admin_id} 失败: {e}")
+                return
+            await asyncio.sleep(2 ** attempt)
+        except Exception as e:
+            logger.error(f"通知管理员 {admin_id} 失败: {e}")
+            return
 
 
-async def _perform_ai_review(submission_data: dict) -> ReviewResult:
-    """执行 AI 审核"""
+async def _safe_notify_user(context: CallbackContext, user_id: int, text: str):
+    """通知投稿用户审核结果，失败只记录日志"""
+    try:
+        await context.bot.send_message(chat_id=user_id, text=text)
+    except Exception as e:
+        logger.error(f"通知用户 {user_id} 失败: {e}")
+
+
+async def _notify_admins(context: CallbackContext, text: str, reply_markup=None):
+    """并发通知所有管理员（每个管理员的发送与重试相互独立）"""
+    await asyncio.gather(
+        *(_safe_send_admin(context, admin_id, text, reply_markup) for admin_id in ADMIN_IDS),
+        return_exceptions=True,
+    )
+
+
+async def _perform_ai_review(submission_data: dict, user_id: int) -> ReviewResult:
+    """执行 AI 审核（带上 user_id，AI 审核只合并同一用户的投稿）"""
     reviewer = get_ai_reviewer()
-    return await reviewer.review(submission_data)
+    return await reviewer.review({**submission_data, 'user_id': user_id})
 
 
 async def _handle_duplicate_result(
@@ -246,19 +382,15 @@ async def _handle_duplicate_result(
     # 通知管理员
     if AI_REVIEW_NOTIFY_ADMIN_ON_DUPLICATE and ADMIN_IDS:
         blocked_text = "是" if blocked else "否"
-        admin_message = (
-            "🔔 重复投稿检测通知\n\n"
-            f"用户：@{username} (ID: {user_id})\n"
-            f"类型：{result.duplicate_type}\n"
-            f"已拦截：{blocked_text}\n"
-            f"相似度：{result.similarity_score:.0%}\n"
-            f"详情：{result.message}"
-        )
-        for admin_id in ADMIN_IDS:
-            try:
-                await context.bot.send_message(chat_id=admin_id, text=admin_message)
-            except Exception as e:
-                logger.error(f"通知管理员 {admin_id} 失败: {e}")
+        admin_message = _DUPLICATE_ADMIN_TMPL.format_map({
+            'username': username,
+            'user_id': user_id,
+            'duplicate_type': result.duplicate_type,
+            'blocked': blocked_text,
+            'similarity_pct': f"{result.similarity_score:.0%}",
+            'detail': result.message,
+        })
+        await _notify_admins(context, admin_message)
 
     if blocked:
         logger.info(f"重复投稿被拦截: user_id={user_id}, type={result.duplicate_type}")
@@ -281,24 +413,15 @@ async def _handle_rejection(
     if runtime_settings.ai_review_notify_user():
         reviewer = get_ai_reviewer()
         if runtime_settings.paid_ad_enabled() and reviewer.is_off_topic_category(result.category):
-            balance = await get_balance(user_id)
-            keyboard = [
-                [
-                    InlineKeyboardButton("购买广告次数", callback_data="paid_ad_buy_menu"),
-                    InlineKeyboardButton("查看余额", callback_data="paid_ad_balance"),
-                ],
-                [
-                    InlineKeyboardButton("广告发布 /ad", callback_data="paid_ad_howto"),
-                ],
-            ]
+            # 余额不再内联查询展示，用户可通过“查看余额”按钮按需获取
             message = (
                 "❌ 投稿未通过审核：主题无关\n\n"
                 f"原因：{result.reason}\n\n"
                 "若需发布广告，可购买广告发布次数（可批量购买，随时使用）。\n"
-                f"当前余额：{balance} 次\n\n"
+                "点击“查看余额”可查询当前剩余次数。\n\n"
                 "使用 /ad 发布广告（每次发布扣 1 次）。"
             )
-            await update.message.reply_text(message, reply_markup=InlineKeyboardMarkup(keyboard))
+            await update.message.reply_text(message, reply_markup=_OFF_TOPIC_KEYBOARD)
         else:
             message = (
                 "❌ 投稿未通过审核\n\n"
@@ -311,19 +434,15 @@ async def _handle_rejection(
     # 通知管理员
     if AI_REVIEW_NOTIFY_ADMIN_ON_REJECT and ADMIN_IDS:
         content_preview = _get_content_preview(submission_data)
-        admin_message = (
-            "🔔 投稿自动拒绝通知\n\n"
-            f"用户：@{username} (ID: {user_id})\n"
-            f"分类：{result.category}\n"
-            f"置信度：{result.confidence:.0%}\n"
-            f"原因：{result.reason}\n\n"
-            f"内容预览：\n{content_preview}"
-        )
-        for admin_id in ADMIN_IDS:
-            try:
-                await context.bot.send_message(chat_id=admin_id, text=admin_message)
-            except Exception as e:
-                logger.error(f"通知管理员 {admin_id} 失败: {e}")
+        admin_message = _REJECT_ADMIN_TMPL.format_map({
+            'username': username,
+            'user_id': user_id,
+            'category': result.category,
+            'confidence_pct': f"{result.confidence:.0%}",
+            'reason': result.reason,
+            'preview': content_preview,
+        })
+        await _notify_admins(context, admin_message)
 
     logger.info(f"投稿被自动拒绝: user_id={user_id}, category={result.category}")
 
@@ -363,28 +482,19 @@ async def _send_to_manual_review(
         ]
         markup = InlineKeyboardMarkup(keyboard)
 
-        admin_message = (
-            "🔔 新投稿待审核\n\n"
-            f"投稿人：@{username} (ID: {user_id})\n"
-            f"投稿时间：{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-            f"内容：\n{content_preview}\n\n"
-            f"标签：{submission_data.get('tags', '无')}\n"
-            f"链接：{submission_data.get('link', '无')}\n\n"
-            f"AI 审核结果：\n"
-            f"• 置信度：{result.confidence:.0%}\n"
-            f"• 分类：{result.category}\n"
-            f"• 原因：{result.reason}"
-        )
+        admin_message = _MANUAL_REVIEW_ADMIN_TMPL.format_map({
+            'username': username,
+            'user_id': user_id,
+            'submit_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'preview': content_preview,
+            'tags': submission_data.get('tags', '无'),
+            'link': submission_data.get('link', '无'),
+            'confidence_pct': f"{result.confidence:.0%}",
+            'category': result.category,
+            'reason': result.reason,
+        })
 
-        for admin_id in ADMIN_IDS:
-            try:
-                await context.bot.send_message(
-                    chat_id=admin_id,
-                    text=admin_message,
-                    reply_markup=markup
-                )
-            except Exception as e:
-                logger.error(f"通知管理员 {admin_id} 失败: {e}")
+        await _notify_admins(context, admin_message, reply_markup=markup)
 
     logger.info(f"投稿已发送到人工审核: user_id={user_id}, review_id={review_id}")
 
@@ -406,8 +516,8 @@ async def _save_pending_review(
             ''', (
                 user_id,
                 username,
-                json.dumps(submission_data, ensure_ascii=False),
-                json.dumps(review_result.to_dict(), ensure_ascii=False)
+                orjson.dumps(submission_data).decode(),
+                orjson.dumps(review_result.to_dict()).decode()
             ))
             await conn.commit()
             return cursor.lastrowid
@@ -416,6 +526,46 @@ async def _save_pending_review(
         return 0
 
 
+# 仅当记录仍处于待审核状态时才更新，并发点击时只有一个管理员能更新成功
+_CLAIM_REVIEW_SQL = """
+    UPDATE pending_reviews
+    SET status = ?, reviewed_at = ?, reviewed_by = ?, review_note = COALESCE(?, review_note)
+    WHERE id = ? AND status = 'pending'
+"""
+_CLAIM_REVIEW_RETURNING_SQL = _CLAIM_REVIEW_SQL + "    RETURNING user_id, username, submission_data\n"
+# 不支持 RETURNING 时，更新成功后在同一事务内读取投稿
+_SELECT_CLAIMED_REVIEW_SQL = "SELECT user_id, username, submission_data FROM pending_reviews WHERE id = ?"
+
+# UPDATE ... RETURNING 需要 SQLite >= 3.35
+_SUPPORTS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# 审核动作 -> (写入状态, 审核备注)
+_REVIEW_ACTIONS = {
+    'approve': ('approved', None),
+    'reject': ('rejected', None),
+    'ban': ('rejected', 'banned'),
+}
+
+
+async def _claim_review(cursor, review_id: int, status: str, admin_id: int, review_note: Optional[str]):
+    """
+    将待审核记录标记为已处理（需在写事务内调用）
+
+    Returns:
+        本次抢到处理权时返回 (user_id, username, submission_data)；已被处理或不存在时返回 None
+    """
+    params = (status, datetime.now().timestamp(), admin_id, review_note, review_id)
+    if _SUPPORTS_RETURNING:
+        await cursor.execute(_CLAIM_REVIEW_RETURNING_SQL, params)
+        return await cursor.fetchone()
+
+    await cursor.execute(_CLAIM_REVIEW_SQL, params)
+    if cursor.rowcount != 1:
+        return None
+    await cursor.execute(_SELECT_CLAIMED_REVIEW_SQL, (review_id,))
+    return await cursor.fetchone()
+
+
 async def handle_review_callback(update: Update, context: CallbackContext):
     """处理审核回调（管理员操作）"""
     query = update.callback_query
@@ -434,125 +584,91 @@ async def handle_review_callback(update: Update, context: CallbackContext):
         action = parts[1]  # approve/reject/ban
         review_id = int(parts[2])
 
-        # 获取待审核记录
-        async with get_db() as conn:
+        if action not in _REVIEW_ACTIONS:
+            return
+        status, review_note = _REVIEW_ACTIONS[action]
+
+        # 带状态条件的 UPDATE 完成检查与更新，避免 SELECT 后再 UPDATE 的竞态
+        async with get_db_tx() as conn:
             cursor = await conn.cursor()
-            await cursor.execute('''
-                SELECT * FROM pending_reviews WHERE id = ?
-            ''', (review_id,))
-            row = await cursor.fetchone()
+            row = await _claim_review(cursor, review_id, status, admin_id, review_note)
 
-            if not row:
-                await query.edit_message_text("❌ 审核记录不存在")
-                return
+        if not row:
+            await query.edit_message_text("❌ 该投稿已被处理或不存在")
+            return
 
-            if row['status'] != 'pending':
-                await query.edit_message_text("❌ 该投稿已被处理")
-                return
+        user_id, username, raw_submission_data = row
+        submission_data = orjson.loads(raw_submission_data)
+
+        if action == 'approve':
+            # 通知用户（后台发送，不阻塞管理员界面的响应）
+            spawn_background(_safe_notify_user(
+                context,
+                user_id,
+                "✅ 您的投稿已通过审核！\n内容即将发布到频道。"
+            ))
 
-            user_id = row['user_id']
-            username = row['username']
-            submission_data = json.loads(row['submission_data'])
-
-            if action == 'approve':
-                # 通过审核
-                await cursor.execute('''
-                    UPDATE pending_reviews
-                    SET status = 'approved', reviewed_at = ?, reviewed_by = ?
-                    WHERE id = ?
-                ''', (datetime.now().timestamp(), admin_id, review_id))
-                await conn.commit()
-
-                # 通知用户
-                try:
-                    await context.bot.send_message(
-                        chat_id=user_id,
-                        text="✅ 您的投稿已通过审核！\n内容即将发布到频道。"
-                    )
-                except Exception as e:
-                    logger.error(f"通知用户 {user_id} 失败: {e}")
-
-                # 执行发布流程
-                publish_ok = False
-                publish_error = ""
-                try:
-                    publish_ok, publish_error = await _publish_approved_submission(
-                        context, user_id, username, submission_data
-                    )
-                except Exception as e:
-                    logger.error(f"人工审核通过后发布失败: {e}", exc_info=True)
-                    publish_error = str(e)
-
-                if publish_ok:
-                    await query.edit_message_text(
-                        f"✅ 已通过审核并发布\n\n"
-                        f"投稿人：@{username}\n"
-                        f"审核人：{query.from_user.username or admin_id}"
-                    )
-                else:
-                    await query.edit_message_text(
-                        f"✅ 已通过审核，但发布失败\n\n"
-                        f"投稿人：@{username}\n"
-                        f"审核人：{query.from_user.username or admin_id}\n"
-                        f"错误：{publish_error[:200]}"
-                    )
-
-            elif action == 'reject':
-                # 拒绝
-                await cursor.execute('''
-                    UPDATE pending_reviews
-                    SET status = 'rejected', reviewed_at = ?, reviewed_by = ?
-                    WHERE id = ?
-                ''', (datetime.now().timestamp(), admin_id, review_id))
-                await conn.commit()
-
-                # 通知用户
-                try:
-                    await context.bot.send_message(
-                        chat_id=user_id,
-                        text="❌ 您的投稿未通过审核\n\n"
-                             f"本频道仅接受与「{runtime_settings.ai_review_channel_topic()}」相关的内容。\n"
-                             "如有疑问，请联系管理员。"
-                    )
-                except Exception as e:
-                    logger.error(f"通知用户 {user_id} 失败: {e}")
+            # 执行发布流程
+            publish_ok = False
+            publish_error = ""
+            try:
+                publish_ok, publish_error = await _publish_approved_submission(
+                    context, user_id, username, submission_data
+                )
+            except Exception as e:
+                logger.error(f"人工审核通过后发布失败: {e}", exc_info=True)
+                publish_error = str(e)
 
+            if publish_ok:
                 await query.edit_message_text(
-                    f"❌ 已拒绝\n\n"
+                    f"✅ 已通过审核并发布\n\n"
                     f"投稿人：@{username}\n"
                     f"审核人：{query.from_user.username or admin_id}"
                 )
-
-            elif action == 'ban':
-                # 拒绝并拉黑
-                await cursor.execute('''
-                    UPDATE pending_reviews
-                    SET status = 'rejected', reviewed_at = ?, reviewed_by = ?, review_note = 'banned'
-                    WHERE id = ?
-                ''', (datetime.now().timestamp(), admin_id, review_id))
-                await conn.commit()
-
-                # 添加到黑名单
-                from utils.blacklist import add_to_blacklist
-                add_to_blacklist(user_id, f"投稿审核拒绝并拉黑 by {admin_id}")
-
-                # 通知用户
-                try:
-                    await context.bot.send_message(
-                        chat_id=user_id,
-                        text="⚠️ 您已被加入黑名单\n\n"
-                             "由于您的投稿内容不符合频道要求，您已被禁止使用投稿功能。\n"
-                             "如有疑问，请联系管理员。"
-                    )
-                except Exception as e:
-                    logger.error(f"通知用户 {user_id} 失败: {e}")
-
+            else:
                 await query.edit_message_text(
-                    f"🚫 已拒绝并拉黑\n\n"
-                    f"投稿人：@{username} (ID: {user_id})\n"
-                    f"审核人：{query.from_user.username or admin_id}"
+                    f"✅ 已通过审核，但发布失败\n\n"
+                    f"投稿人：@{username}\n"
+                    f"审核人：{query.from_user.username or admin_id}\n"
+                    f"错误：{publish_error[:200]}"
                 )
 
+        elif action == 'reject':
+            # 通知用户（后台发送，不阻塞管理员界面的响应）
+            spawn_background(_safe_notify_user(
+                context,
+                user_id,
+                "❌ 您的投稿未通过审核\n\n"
+                f"本频道仅接受与「{runtime_settings.ai_review_channel_topic()}」相关的内容。\n"
+                "如有疑问，请联系管理员。"
+            ))
+
+            await query.edit_message_text(
+                f"❌ 已拒绝\n\n"
+                f"投稿人：@{username}\n"
+                f"审核人：{query.from_user.username or admin_id}"
+            )
+
+        elif action == 'ban':
+            # 添加到黑名单（审核状态事务已提交，不与其争用写锁）
+            from utils.blacklist import add_to_blacklist
+            await add_to_blacklist(user_id, f"投稿审核拒绝并拉黑 by {admin_id}")
+
+            # 通知用户（后台发送，不阻塞管理员界面的响应）
+            spawn_background(_safe_notify_user(
+                context,
+                user_id,
+                "⚠️ 您已被加入黑名单\n\n"
+                "由于您的投稿内容不符合频道要求，您已被禁止使用投稿功能。\n"
+                "如有疑问，请联系管理员。"
+            ))
+
+            await query.edit_message_text(
+                f"🚫 已拒绝并拉黑\n\n"
+                f"投稿人：@{username} (ID: {user_id})\n"
+                f"审核人：{query.from_user.username or admin_id}"
+            )
+
     except Exception as e:
         logger.error(f"处理审核回调失败: {e}", exc_info=True)
         await query.edit_message_text(f"❌ 处理失败: {str(e)}")
@@ -577,7 +693,7 @@ async def _publish_approved_submission(
         handle_document_publish,
         save_published_post,
     )
-    from utils.helper_functions import build_caption
+    from utils.helper_functions import build_caption, parse_media_items
 
     # 从 submission_data 还原发布所需的各字段
     text_content = submission_data.get('text_content') or None
@@ -601,6 +717,10 @@ async def _publish_approved_submission(
     except (json.JSONDecodeError, TypeError):
         doc_list = []
 
+    # 兼容旧格式 "type:file_id" 字符串条目
+    media_list = parse_media_items(media_list)
+    doc_list = parse_media_items(doc_list)
+
     if not media_list and not doc_list and not text_content:
         return (False, "投稿内容为空（无媒体、文档或文本）")
 
@@ -659,6 +779,7 @@ async def _publish_approved_submission(
             all_message_ids,
             text_content,
             show_submitter=show_submitter,
+            caption=caption,
         )
     except Exception as e:
         logger.error(f"人工审核发布后保存记录失败: {e}", exc_info=True)
@@ -725,23 +846,24 @@ async def save_fingerprint_after_publish(
     username: str,
     submission_data: dict,
     user_bio: str,
-    submission_id: int
+    submission_id: int,
+    fingerprint: Optional[SubmissionFingerprint] = None,
 ):
-    """发布成功后保存指纹"""
+    """发布成功后保存指纹（传入审核阶段已生成的指纹时直接复用）"""
     if not runtime_settings.duplicate_check_enabled():
         return
 
     try:
-        content = _build_content_for_review(submission_data)
-        extractor = get_feature_extractor()
         detector = get_duplicate_detector()
 
-        fingerprint = extractor.create_fingerprint(
-            user_id=user_id,
-            username=username,
-            content=content,
-            bio=user_bio
-        )
+        if fingerprint is None:
+            content = _build_content_for_review(submission_data)
+            fingerprint = get_feature_extractor().create_fingerprint(
+                user_id=user_id,
+                username=username,
+                content=content,
+                bio=user_bio
+            )
 
         await detector.save_fingerprint(
             fingerprint,
@@ -753,22 +875,15 @@ async def save_fingerprint_after_publish(
         logger.error(f"保存指纹失败: {e}")
 
 
+# 参与审核/指纹计算的字段（按拼接顺序）
+_REVIEW_CONTENT_KEYS = ('text_content', 'title', 'note', 'tags', 'link')
+
+
 def _build_content_for_review(submission_data: dict) -> str:
     """构建用于审核的内容字符串"""
-    parts = []
-
-    if submission_data.get('text_content'):
-        parts.append(submission_data['text_content'])
-    if submission_data.get('title'):
-        parts.append(submission_data['title'])
-    if submission_data.get('note'):
-        parts.append(submission_data['note'])
-    if submission_data.get('tags'):
-        parts.append(submission_data['tags'])
-    if submission_data.get('link'):
-        parts.append(submission_data['link'])
-
-    return '\n'.join(parts)
+    return '\n'.join(
+        value for value in (submission_data.get(key) for key in _REVIEW_CONTENT_KEYS) if value
+    )
 
 
 def _get_content_preview(submission_data: dict, max_length: int = 200) -> str:
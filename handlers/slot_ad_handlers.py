@@ -4,24 +4,22 @@
 
 from __future__ import annotations
 
-import io
+import asyncio
 import html
 import logging
+import re
 import time
+from dataclasses import dataclass
+from functools import lru_cache, wraps
 from typing import Optional
 
-import json
-
 from telegram import CopyTextButton, InputFile, Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.constants import ParseMode
 from telegram.ext import CallbackContext, ApplicationHandlerStop
 
-from config.settings import (
-    ADMIN_IDS,
-)
 from utils import runtime_settings
 from utils.ad_risk_reviewer import review_ad_risk
-from utils.qr_code import make_qr_png_bytes
+from utils.qr_code import make_qr_png_bytes_async
 from utils.scheduled_publish_service import (
     compute_next_run_at,
     get_config as get_sched_config,
@@ -29,7 +27,6 @@ from utils.scheduled_publish_service import (
     update_config_fields,
 )
 from utils.slot_ad_service import (
-    build_channel_keyboard,
     confirm_paid_by_trade_id,
     create_creative,
     create_slot_ad_payment_order,
@@ -39,9 +36,7 @@ from utils.slot_ad_service import (
     format_epoch,
     format_slot_blocked_message,
     get_slot_order_for_edit,
-    get_active_orders,
     get_plans,
-    get_slot_defaults,
     is_admin,
     refresh_last_scheduled_message_keyboard,
     set_slot_default,
@@ -59,6 +54,45 @@ logger = logging.getLogger(__name__)
 
 FLOW_KEY = "slot_ad_flow"
 
+
+@dataclass(slots=True)
+class SlotAdFlow:
+    """私聊购买/修改广告位流程的会话状态，存放在 context.user_data[FLOW_KEY]"""
+    stage: str
+    mode: str = "buy"
+    slot_id: int = 0
+    renew_start_at: Optional[float] = None
+    pay_type: str = ""
+    plan_days: int = 0
+    out_trade_no: str = ""
+    button_text: str = ""
+    button_url: str = ""
+    button_style: Optional[str] = None
+    icon_custom_emoji_id: Optional[str] = None
+
+
+def _get_flow(context: CallbackContext) -> Optional[SlotAdFlow]:
+    flow = context.user_data.get(FLOW_KEY)
+    return flow if isinstance(flow, SlotAdFlow) else None
+
+
+# 文案与回调数据固定的按钮，导入时构造一次（PTB 的 TelegramObject 不可变，可在多个键盘间共享）
+_CANCEL_BUTTON = InlineKeyboardButton("取消", callback_data="slot_cancel")
+
+# Telegram 图片说明（caption）的最大长度
+_CAPTION_MAX_LEN = 1024
+
+# 管理命令开关参数（/sched_pin、/sched_delete_prev 等）
+_ON_TOKENS = frozenset({"1", "on", "true", "yes", "y", "开启"})
+_OFF_TOKENS = frozenset({"0", "off", "false", "no", "n", "关闭"})
+
+# /sched_daily 的 HH:MM 参数（00:00~23:59）；只含数字与冒号，可直接拼入 JSON
+_HHMM_RE = re.compile(r"^([01]?\d|2[0-3]):[0-5]\d$")
+
+# /slot_set_default <slot_id> <text> <url>：一次匹配取出三段，url 段保留剩余全部内容
+_SLOT_DEFAULT_RE = re.compile(r"(\S+)\s+(\S+)\s+(.+)", re.DOTALL)
+
+
 async def _start_order_edit_flow(
     *,
     update: Update,
@@ -114,11 +148,7 @@ async def _start_order_edit_flow(
     limit = quota.get("limit")
     limit_text = "不限" if int(limit or 0) <= 0 else str(int(limit))
 
-    context.user_data[FLOW_KEY] = {
-        "stage": "edit_text",
-        "mode": "edit",
-        "out_trade_no": str(out_trade_no),
-    }
+    context.user_data[FLOW_KEY] = SlotAdFlow(stage="edit_text", mode="edit", out_trade_no=str(out_trade_no))
 
     current_text = str(order.get("button_text") or "").strip()
     current_url = str(order.get("button_url") or "").strip()
@@ -150,16 +180,32 @@ def _get_args_text(update: Update) -> str:
 
 
 def _require_admin(update: Update) -> bool:
-    user_id = update.effective_user.id if update.effective_user else None
-    if user_id is None:
-        return False
-    if int(user_id) not in set(ADMIN_IDS or []):
-        return False
-    return True
+    user = update.effective_user
+    return user is not None and is_admin(user.id)
+
+
+def _admin_only(func):
+    """
+    管理员命令装饰器：非管理员直接回复“无权限”，不进入命令处理逻辑
+    """
+    @wraps(func)
+    async def wrapper(update: Update, context: CallbackContext) -> None:
+        if not _require_admin(update):
+            await update.message.reply_text("⚠️ 无权限")
+            return
+        return await func(update, context)
+    return wrapper
+
+
+# html.escape 会处理的字符；订单号/金额/ID 等常见值不含这些字符，可跳过转义
+_HTML_SPECIAL_CHARS = frozenset("<>&\"'")
 
 
 def _as_html_code(value: object) -> str:
-    return f"<code>{html.escape(str(value))}</code>"
+    text = value if isinstance(value, str) else str(value)
+    if _HTML_SPECIAL_CHARS.isdisjoint(text):
+        return f"<code>{text}</code>"
+    return f"<code>{html.escape(text)}</code>"
 
 
 def _slot_adv_style_enabled() -> bool:
@@ -208,18 +254,21 @@ def _parse_optional_icon_input(raw: str) -> Optional[str]:
     return validate_icon_custom_emoji_id(s)
 
 
-def _build_slot_plan_keyboard(*, slot_id: int, current_type: str) -> InlineKeyboardMarkup:
+# 键盘只依赖运行时配置（套餐/币种），按配置快照版本缓存；InlineKeyboardMarkup 不可变，可直接复用
+@lru_cache(maxsize=256)
+def _slot_plan_keyboard_for(slot_id: int, current_type: str, settings_version: int) -> InlineKeyboardMarkup:
     plans = get_plans()
     rows = []
     for p in plans:
         rows.append([InlineKeyboardButton(f"{p.days} 天 - {p.amount}", callback_data=f"slot_plan_{slot_id}_{p.days}")])
     if runtime_settings.upay_allowed_types():
         rows.append([InlineKeyboardButton(f"币种：{current_type}", callback_data=f"slot_types_{slot_id}")])
-    rows.append([InlineKeyboardButton("取消", callback_data="slot_cancel")])
+    rows.append([_CANCEL_BUTTON])
     return InlineKeyboardMarkup(rows)
 
 
-def _build_slot_types_keyboard(*, slot_id: int, current_type: str) -> InlineKeyboardMarkup:
+@lru_cache(maxsize=256)
+def _slot_types_keyboard_for(slot_id: int, current_type: str, settings_version: int) -> InlineKeyboardMarkup:
     types = runtime_settings.upay_allowed_types() or []
     if not types:
         return InlineKeyboardMarkup([[InlineKeyboardButton("暂无可选币种", callback_data=f"slot_back_plans_{slot_id}")]])
@@ -230,58 +279,67 @@ def _build_slot_types_keyboard(*, slot_id: int, current_type: str) -> InlineKeyb
     rows.append([InlineKeyboardButton("🔙 返回租期", callback_data=f"slot_back_plans_{slot_id}")])
     return InlineKeyboardMarkup(rows)
 
+
+def _build_slot_plan_keyboard(*, slot_id: int, current_type: str) -> InlineKeyboardMarkup:
+    return _slot_plan_keyboard_for(int(slot_id), str(current_type), runtime_settings.version())
+
+
+def _build_slot_types_keyboard(*, slot_id: int, current_type: str) -> InlineKeyboardMarkup:
+    return _slot_types_keyboard_for(int(slot_id), str(current_type), runtime_settings.version())
+
+
 def _with_remind_toggle_button(markup: InlineKeyboardMarkup, *, enabled: bool, out_trade_no: str) -> InlineKeyboardMarkup:
     """
     将支付消息的“到期提醒”按钮替换为开/关状态。
-    只改按钮，不依赖外部状态，保证幂等。
+    只改按钮，不依赖外部状态，保证幂等；按钮已是目标状态时原样返回 markup。
     """
-    rows = [list(r) for r in (markup.inline_keyboard or [])]
-    if not rows:
+    keyboard = markup.inline_keyboard or ()
+    if not keyboard:
         return markup
 
-    on = InlineKeyboardButton("开启到期前1天提醒（可选）", callback_data=f"slot_remind_on_{out_trade_no}")
-    off = InlineKeyboardButton("✅ 已开启到期提醒（点我关闭）", callback_data=f"slot_remind_off_{out_trade_no}")
-    target = off if enabled else on
-
-    replaced = False
-    for i, row in enumerate(rows):
+    target_cd = f"slot_remind_off_{out_trade_no}" if enabled else f"slot_remind_on_{out_trade_no}"
+    index = None
+    # InlineKeyboardButton 始终定义 callback_data（URL 按钮为 None），直接读取属性即可
+    for i, row in enumerate(keyboard):
         if not row:
             continue
-        b = row[0]
-        cd = getattr(b, "callback_data", None)
+        cd = row[0].callback_data
         if isinstance(cd, str) and (cd.startswith("slot_remind_on_") or cd.startswith("slot_remind_off_")):
-            rows[i] = [target]
-            replaced = True
+            if cd == target_cd and len(row) == 1:
+                return markup
+            index = i
             break
 
-    if not replaced:
+    if enabled:
+        target = InlineKeyboardButton("✅ 已开启到期提醒（点我关闭）", callback_data=target_cd)
+    else:
+        target = InlineKeyboardButton("开启到期前1天提醒（可选）", callback_data=target_cd)
+    rows = [list(r) for r in keyboard]
+    if index is None:
         rows.append([target])
+    else:
+        rows[index] = [target]
     return InlineKeyboardMarkup(rows)
 
+
 def _without_check_button(markup: InlineKeyboardMarkup, *, out_trade_no: str) -> InlineKeyboardMarkup:
     """
     移除“查单确认”按钮（支付已确认后不再需要）。
-    只改按钮，不依赖外部状态，保证幂等。
+    只改按钮，不依赖外部状态，保证幂等；按钮已不存在时原样返回 markup。
     """
-    rows = [list(r) for r in (markup.inline_keyboard or [])]
-    if not rows:
+    keyboard = markup.inline_keyboard or ()
+    target_cd = f"slot_ad_check_{out_trade_no}"
+    if not any(b.callback_data == target_cd for row in keyboard for b in row):
         return markup
 
-    target_cd = f"slot_ad_check_{out_trade_no}"
     new_rows = []
-    for row in rows:
-        if not row:
-            continue
-        kept = []
-        for b in row:
-            cd = getattr(b, "callback_data", None)
-            if isinstance(cd, str) and cd == target_cd:
-                continue
-            kept.append(b)
+    for row in keyboard:
+        kept = [b for b in row if b.callback_data != target_cd]
         if kept:
             new_rows.append(kept)
     return InlineKeyboardMarkup(new_rows)
 
+
 async def _send_payment_qr_if_possible(
     *,
     context: CallbackContext,
@@ -296,18 +354,16 @@ async def _send_payment_qr_if_possible(
     if not pay_address:
         return
     try:
-        qr_png = make_qr_png_bytes(str(pay_address))
-        f = io.BytesIO(qr_png)
-        f.name = "payment_qr.png"
+        qr_png = await make_qr_png_bytes_async(str(pay_address))
         await context.bot.send_photo(
             chat_id=chat_id,
-            photo=InputFile(f),
+            photo=InputFile(qr_png, filename="payment_qr.png"),
             caption=caption,
             parse_mode=ParseMode.HTML,
             reply_markup=reply_markup,
         )
     except Exception as e:
-        logger.warning(f"发送收款二维码失败，将降级为纯文字提示: {e}", exc_info=True)
+        logger.warning(f"发送收款二维码失败，将降级为纯文字提示: {e}")
         await context.bot.send_message(
             chat_id=chat_id,
             text=caption,
@@ -334,7 +390,7 @@ async def try_handle_start_args(update: Update, context: CallbackContext) -> boo
         return False
 
     try:
-        slot_id = int(token.replace("buy_slot_", "", 1))
+        slot_id = int(token.removeprefix("buy_slot_"))
     except Exception:
         await update.message.reply_text("❌ 无效的广告位参数")
         return True
@@ -348,6 +404,11 @@ async def try_handle_start_args(update: Update, context: CallbackContext) -> boo
         await update.message.reply_text(f"❌ 该广告位（{int(slot_id)}）当前未启用（启用范围：1..{active_rows_count}）")
         return True
 
+    # 套餐来自内存中的运行时配置，先检查，未配置时无需再查询数据库
+    if not get_plans():
+        await update.message.reply_text("❌ 未配置可购买的租期套餐，请联系管理员")
+        return True
+
     user_id = update.effective_user.id
     gate = await ensure_can_purchase_or_renew(slot_id=slot_id, user_id=user_id)
     if gate.get("mode") == "blocked":
@@ -356,18 +417,13 @@ async def try_handle_start_args(update: Update, context: CallbackContext) -> boo
 
     mode = str(gate.get("mode") or "buy")
     renew_start_at = float(gate.get("renew_start_at")) if gate.get("renew_start_at") is not None else None
-    context.user_data[FLOW_KEY] = {
-        "slot_id": int(slot_id),
-        "mode": mode,
-        "stage": "choose_plan",
-        "renew_start_at": renew_start_at,
-        "pay_type": runtime_settings.upay_default_type(),
-    }
-
-    if not get_plans():
-        await update.message.reply_text("❌ 未配置可购买的租期套餐，请联系管理员")
-        context.user_data.pop(FLOW_KEY, None)
-        return True
+    context.user_data[FLOW_KEY] = SlotAdFlow(
+        stage="choose_plan",
+        mode=mode,
+        slot_id=int(slot_id),
+        renew_start_at=renew_start_at,
+        pay_type=runtime_settings.upay_default_type(),
+    )
 
     await update.message.reply_text(
         f"📌 购买广告位：{slot_id}\n\n请选择租期：",
@@ -390,159 +446,178 @@ async def slot_edit_cmd(update: Update, context: CallbackContext) -> None:
     await _start_order_edit_flow(update=update, context=context, out_trade_no=str(out_trade_no), via_query=None)
 
 
-async def handle_slot_callback(update: Update, context: CallbackContext) -> None:
-    """
-    slot_* 回调入口（由 handlers/callback_handlers.py 分发）
-    """
-    query = update.callback_query
-    data = str(query.data or "")
-    user_id = update.effective_user.id
+async def _slot_cb_edit(update: Update, context: CallbackContext, query, arg: str) -> None:
+    await _start_order_edit_flow(update=update, context=context, out_trade_no=str(arg), via_query=query)
 
-    flow = context.user_data.get(FLOW_KEY) or {}
 
-    if data == "slot_cancel":
-        context.user_data.pop(FLOW_KEY, None)
-        await query.edit_message_text("已取消")
-        return
+async def _slot_cb_buy(update: Update, context: CallbackContext, query, arg: str) -> None:
+    # 频道中 BOT_USERNAME 未配置时的降级入口：提示用户私聊 /start buy_slot_x
+    await query.answer("请私聊机器人完成购买（发送 /start），并确保已与机器人开启对话。", show_alert=True)
 
-    if data.startswith("slot_edit_"):
-        out_trade_no = data.replace("slot_edit_", "", 1)
-        await _start_order_edit_flow(update=update, context=context, out_trade_no=str(out_trade_no), via_query=query)
+
+async def _slot_cb_back_plans(update: Update, context: CallbackContext, query, arg: str) -> None:
+    try:
+        slot_id = int(arg)
+    except Exception:
+        await query.answer("❌ 无效操作", show_alert=True)
         return
+    flow = _get_flow(context)
+    current_type = (flow.pay_type if flow else "") or runtime_settings.upay_default_type()
+    await query.edit_message_text(
+        f"📌 购买广告位：{slot_id}\n\n请选择租期：",
+        reply_markup=_build_slot_plan_keyboard(slot_id=slot_id, current_type=current_type),
+    )
+
 
-    if data.startswith("slot_buy_"):
-        # 频道中 BOT_USERNAME 未配置时的降级入口：提示用户私聊 /start buy_slot_x
-        slot_id = data.replace("slot_buy_", "", 1)
-        await query.answer("请私聊机器人完成购买（发送 /start），并确保已与机器人开启对话。", show_alert=True)
+async def _slot_cb_types(update: Update, context: CallbackContext, query, arg: str) -> None:
+    try:
+        slot_id = int(arg)
+    except Exception:
+        await query.answer("❌ 无效操作", show_alert=True)
         return
+    flow = _get_flow(context)
+    current_type = (flow.pay_type if flow else "") or runtime_settings.upay_default_type()
+    await query.edit_message_text(
+        "请选择收款币种/网络：",
+        reply_markup=_build_slot_types_keyboard(slot_id=slot_id, current_type=current_type),
+    )
 
-    if data.startswith("slot_back_plans_"):
-        try:
-            slot_id = int(data.replace("slot_back_plans_", "", 1))
-        except Exception:
-            await query.answer("❌ 无效操作", show_alert=True)
-            return
-        flow = context.user_data.get(FLOW_KEY) or {}
-        current_type = str(flow.get("pay_type") or runtime_settings.upay_default_type())
-        await query.edit_message_text(
-            f"📌 购买广告位：{slot_id}\n\n请选择租期：",
-            reply_markup=_build_slot_plan_keyboard(slot_id=slot_id, current_type=current_type),
-        )
+
+async def _slot_cb_set_type(update: Update, context: CallbackContext, query, arg: str) -> None:
+    # 参数形如 {slot_id}_{pay_type}，一次 partition 拆出两段
+    slot_id_str, sep, t = arg.partition("_")
+    if not sep:
+        await query.answer("❌ 无效操作", show_alert=True)
+        return
+    try:
+        slot_id = int(slot_id_str)
+    except Exception:
+        await query.answer("❌ 无效操作", show_alert=True)
         return
+    if t not in (runtime_settings.upay_allowed_types() or []):
+        await query.answer("❌ 无效币种", show_alert=True)
+        return
+    flow = _get_flow(context)
+    if flow is None or flow.slot_id != slot_id:
+        await query.answer("⚠️ 会话已过期，请重新从购买入口开始。", show_alert=True)
+        return
+    flow.pay_type = t
+    await query.answer(f"✅ 已切换为 {t}", show_alert=False)
+    await query.edit_message_text(
+        f"📌 购买广告位：{slot_id}\n\n请选择租期：",
+        reply_markup=_build_slot_plan_keyboard(slot_id=slot_id, current_type=t),
+    )
 
-    if data.startswith("slot_types_"):
-        try:
-            slot_id = int(data.replace("slot_types_", "", 1))
-        except Exception:
-            await query.answer("❌ 无效操作", show_alert=True)
-            return
-        flow = context.user_data.get(FLOW_KEY) or {}
-        current_type = str(flow.get("pay_type") or runtime_settings.upay_default_type())
-        await query.edit_message_text(
-            "请选择收款币种/网络：",
-            reply_markup=_build_slot_types_keyboard(slot_id=slot_id, current_type=current_type),
-        )
+
+async def _slot_cb_plan(update: Update, context: CallbackContext, query, arg: str) -> None:
+    try:
+        slot_id_str, _, days_str = arg.partition("_")
+        slot_id = int(slot_id_str)
+        plan_days = int(days_str)
+    except Exception:
+        await query.answer("❌ 无效操作", show_alert=True)
         return
 
-    if data.startswith("slot_set_type_"):
-        rest = data.replace("slot_set_type_", "", 1)
-        if "_" not in rest:
-            await query.answer("❌ 无效操作", show_alert=True)
-            return
-        slot_id_str, t = rest.split("_", 1)
-        try:
-            slot_id = int(slot_id_str)
-        except Exception:
-            await query.answer("❌ 无效操作", show_alert=True)
-            return
-        if t not in (runtime_settings.upay_allowed_types() or []):
-            await query.answer("❌ 无效币种", show_alert=True)
-            return
-        flow = context.user_data.get(FLOW_KEY)
-        if not isinstance(flow, dict) or int(flow.get("slot_id", 0)) != int(slot_id):
-            await query.answer("⚠️ 会话已过期，请重新从购买入口开始。", show_alert=True)
-            return
-        flow["pay_type"] = t
-        context.user_data[FLOW_KEY] = flow
-        await query.answer(f"✅ 已切换为 {t}", show_alert=False)
-        await query.edit_message_text(
-            f"📌 购买广告位：{slot_id}\n\n请选择租期：",
-            reply_markup=_build_slot_plan_keyboard(slot_id=slot_id, current_type=t),
-        )
+    flow = _get_flow(context)
+    if flow is None or flow.stage != "choose_plan" or flow.slot_id != slot_id:
+        await query.answer("⚠️ 会话已过期，请重新从购买入口开始。", show_alert=True)
         return
 
-    if data.startswith("slot_plan_"):
-        try:
-            _, _, slot_id_str, days_str = data.split("_", 3)
-            slot_id = int(slot_id_str)
-            plan_days = int(days_str)
-        except Exception:
-            await query.answer("❌ 无效操作", show_alert=True)
-            return
+    flow.plan_days = int(plan_days)
+    flow.stage = "text"
 
-        if flow.get("stage") != "choose_plan" or int(flow.get("slot_id", 0)) != int(slot_id):
-            await query.answer("⚠️ 会话已过期，请重新从购买入口开始。", show_alert=True)
-            return
+    await query.edit_message_text("请发送按钮文案（不超过指定长度，不允许换行）：")
 
-        flow["plan_days"] = int(plan_days)
-        flow["stage"] = "text"
-        context.user_data[FLOW_KEY] = flow
 
-        await query.edit_message_text("请发送按钮文案（不超过指定长度，不允许换行）：")
+async def _slot_cb_ad_check(update: Update, context: CallbackContext, query, arg: str) -> None:
+    out_trade_no = arg
+    try:
+        ok = await confirm_paid_by_trade_id(out_trade_no)
+    except Exception as e:
+        logger.error(f"Slot Ads 查单确认失败: {e}", exc_info=True)
+        await query.answer(f"❌ 查单失败：{e}", show_alert=True)
         return
-
-    if data.startswith("slot_ad_check_"):
-        out_trade_no = data.replace("slot_ad_check_", "", 1)
-        try:
-            ok = await confirm_paid_by_trade_id(out_trade_no)
-        except Exception as e:
-            logger.error(f"Slot Ads 查单确认失败: {e}", exc_info=True)
-            await query.answer(f"❌ 查单失败：{e}", show_alert=True)
-            return
-        if ok:
-            await query.answer("✅ 支付确认成功，订单已激活（生效时间以规则为准）。", show_alert=True)
-            if query.message and query.message.reply_markup:
+    if ok:
+        await query.answer("✅ 支付确认成功，订单已激活（生效时间以规则为准）。", show_alert=True)
+        if query.message and query.message.reply_markup:
+            old_markup = query.message.reply_markup
+            new_markup = _without_check_button(old_markup, out_trade_no=str(out_trade_no))
+            # 按钮已移除时跳过编辑，避免 “message is not modified” 的无效请求
+            if new_markup is not old_markup:
                 try:
-                    await query.edit_message_reply_markup(
-                        reply_markup=_without_check_button(query.message.reply_markup, out_trade_no=str(out_trade_no))
-                    )
+                    await query.edit_message_reply_markup(reply_markup=new_markup)
                 except Exception:
                     pass
-        else:
-            await query.answer("⏳ 暂未确认到支付成功，请稍后再试。", show_alert=True)
-        return
+    else:
+        await query.answer("⏳ 暂未确认到支付成功，请稍后再试。", show_alert=True)
 
-    if data.startswith("slot_remind_on_"):
-        out_trade_no = data.replace("slot_remind_on_", "", 1)
-        ok = await enable_expiry_reminder(
-            out_trade_no=out_trade_no,
-            user_id=user_id,
-            advance_days=int(runtime_settings.slot_ad_reminder_advance_days()),
-        )
-        if ok:
-            await query.answer("✅ 已开启到期提醒", show_alert=False)
-        else:
-            await query.answer("❌ 开启失败（可能订单不存在或无权限）", show_alert=True)
-        if ok and query.message and query.message.reply_markup:
-            await query.edit_message_reply_markup(
-                reply_markup=_with_remind_toggle_button(query.message.reply_markup, enabled=True, out_trade_no=out_trade_no)
-            )
-        return
 
-    if data.startswith("slot_remind_off_"):
-        out_trade_no = data.replace("slot_remind_off_", "", 1)
-        ok = await disable_expiry_reminder(out_trade_no=out_trade_no, user_id=user_id)
-        if ok:
-            await query.answer("✅ 已关闭到期提醒", show_alert=False)
-        else:
-            await query.answer("❌ 关闭失败（可能订单不存在或无权限）", show_alert=True)
-        if ok and query.message and query.message.reply_markup:
-            await query.edit_message_reply_markup(
-                reply_markup=_with_remind_toggle_button(query.message.reply_markup, enabled=False, out_trade_no=out_trade_no)
-            )
+async def _slot_cb_remind_on(update: Update, context: CallbackContext, query, arg: str) -> None:
+    out_trade_no = arg
+    ok = await enable_expiry_reminder(
+        out_trade_no=out_trade_no,
+        user_id=update.effective_user.id,
+        advance_days=int(runtime_settings.slot_ad_reminder_advance_days()),
+    )
+    if ok:
+        await query.answer("✅ 已开启到期提醒", show_alert=False)
+    else:
+        await query.answer("❌ 开启失败（可能订单不存在或无权限）", show_alert=True)
+    if ok and query.message and query.message.reply_markup:
+        old_markup = query.message.reply_markup
+        new_markup = _with_remind_toggle_button(old_markup, enabled=True, out_trade_no=out_trade_no)
+        if new_markup is not old_markup:
+            await query.edit_message_reply_markup(reply_markup=new_markup)
+
+
+async def _slot_cb_remind_off(update: Update, context: CallbackContext, query, arg: str) -> None:
+    out_trade_no = arg
+    ok = await disable_expiry_reminder(out_trade_no=out_trade_no, user_id=update.effective_user.id)
+    if ok:
+        await query.answer("✅ 已关闭到期提醒", show_alert=False)
+    else:
+        await query.answer("❌ 关闭失败（可能订单不存在或无权限）", show_alert=True)
+    if ok and query.message and query.message.reply_markup:
+        old_markup = query.message.reply_markup
+        new_markup = _with_remind_toggle_button(old_markup, enabled=False, out_trade_no=out_trade_no)
+        if new_markup is not old_markup:
+            await query.edit_message_reply_markup(reply_markup=new_markup)
+
+
+# slot_* 回调前缀 -> 处理函数（前缀互不包含，匹配结果唯一）
+_SLOT_CALLBACK_ROUTES = {
+    "slot_edit_": _slot_cb_edit,
+    "slot_buy_": _slot_cb_buy,
+    "slot_back_plans_": _slot_cb_back_plans,
+    "slot_types_": _slot_cb_types,
+    "slot_set_type_": _slot_cb_set_type,
+    "slot_plan_": _slot_cb_plan,
+    "slot_ad_check_": _slot_cb_ad_check,
+    "slot_remind_on_": _slot_cb_remind_on,
+    "slot_remind_off_": _slot_cb_remind_off,
+}
+_SLOT_CALLBACK_RE = re.compile("^(" + "|".join(map(re.escape, _SLOT_CALLBACK_ROUTES)) + ")")
+
+
+async def handle_slot_callback(update: Update, context: CallbackContext) -> None:
+    """
+    slot_* 回调入口（由 handlers/callback_handlers.py 分发）
+    """
+    query = update.callback_query
+    data = str(query.data or "")
+
+    if data == "slot_cancel":
+        context.user_data.pop(FLOW_KEY, None)
+        await query.edit_message_text("已取消")
         return
 
-    await query.answer("❌ 未知操作", show_alert=True)
+    # 一次正则匹配定位前缀，再按字典分发；参数部分直接切片获取
+    match = _SLOT_CALLBACK_RE.match(data)
+    if match is None:
+        await query.answer("❌ 未知操作", show_alert=True)
+        return
+    prefix = match.group(1)
+    await _SLOT_CALLBACK_ROUTES[prefix](update, context, query, data[len(prefix):])
 
 
 async def handle_slot_text_input(update: Update, context: CallbackContext) -> None:
@@ -551,17 +626,17 @@ async def handle_slot_text_input(update: Update, context: CallbackContext) -> No
     """
     if not update.message or not update.message.text:
         return
-    flow = context.user_data.get(FLOW_KEY)
-    if not isinstance(flow, dict):
+    flow = _get_flow(context)
+    if flow is None:
         return
 
-    stage = str(flow.get("stage") or "")
+    stage = flow.stage
     text = update.message.text.strip()
     user_id = update.effective_user.id
 
-    async def _finish_edit(current_flow: dict) -> None:
-        out_trade_no = str(current_flow.get("out_trade_no") or "").strip()
-        if not out_trade_no or not current_flow.get("button_text") or not current_flow.get("button_url"):
+    async def _finish_edit(current_flow: SlotAdFlow) -> None:
+        out_trade_no = current_flow.out_trade_no.strip()
+        if not out_trade_no or not current_flow.button_text or not current_flow.button_url:
             await update.message.reply_text("❌ 会话状态异常，请重新从“修改广告内容”入口开始。")
             context.user_data.pop(FLOW_KEY, None)
             raise ApplicationHandlerStop()
@@ -570,10 +645,10 @@ async def handle_slot_text_input(update: Update, context: CallbackContext) -> No
             await update_slot_ad_order_creative_by_user(
                 out_trade_no=str(out_trade_no),
                 user_id=int(user_id),
-                button_text=str(current_flow["button_text"]),
-                button_url=str(current_flow["button_url"]),
-                button_style=(current_flow.get("button_style") or None),
-                icon_custom_emoji_id=(current_flow.get("icon_custom_emoji_id") or None),
+                button_text=current_flow.button_text,
+                button_url=current_flow.button_url,
+                button_style=current_flow.button_style or None,
+                icon_custom_emoji_id=current_flow.icon_custom_emoji_id or None,
             )
         except Exception as e:
             await update.message.reply_text(f"❌ 修改失败：{e}")
@@ -581,38 +656,57 @@ async def handle_slot_text_input(update: Update, context: CallbackContext) -> No
             raise ApplicationHandlerStop()
 
         context.user_data.pop(FLOW_KEY, None)
+        # 刷新定时消息键盘与回复用户并行进行：先回复，刷新成功后再更新回复内容
+        refresh_task = asyncio.create_task(refresh_last_scheduled_message_keyboard(bot=context.bot))
         refreshed = False
         try:
-            refreshed = await refresh_last_scheduled_message_keyboard(bot=context.bot)
-        except Exception as e:
-            logger.warning(f"修改素材后更新键盘失败（可忽略，后续定时消息会生效）: {e}", exc_info=True)
-            refreshed = False
-        await update.message.reply_text(
-            "✅ 已更新按钮广告内容。\n"
-            + ("✅ 已尝试刷新最近一次定时消息按钮。" if refreshed else "ℹ️ 将在下一次定时消息发送时生效。")
-        )
+            reply = await update.message.reply_text(
+                "✅ 已更新按钮广告内容。\nℹ️ 将在下一次定时消息发送时生效。"
+            )
+        finally:
+            # 回复失败时也等待刷新任务结束，避免任务脱离管理、异常无人读取
+            try:
+                refreshed = await refresh_task
+            except Exception as e:
+                logger.warning(f"修改素材后更新键盘失败（可忽略，后续定时消息会生效）: {e}", exc_info=True)
+        if refreshed:
+            try:
+                await reply.edit_text("✅ 已更新按钮广告内容。\n✅ 已尝试刷新最近一次定时消息按钮。")
+            except Exception as e:
+                logger.debug(f"更新修改素材回复失败: {e}")
         raise ApplicationHandlerStop()
 
-    async def _finish_create(current_flow: dict) -> None:
-        slot_id = int(current_flow["slot_id"])
-        plan_days = int(current_flow.get("plan_days") or 0)
+    async def _finish_create(current_flow: SlotAdFlow) -> None:
+        slot_id = current_flow.slot_id
+        plan_days = current_flow.plan_days
         if plan_days <= 0:
             await update.message.reply_text("❌ 租期未选择，请重新从购买入口开始。")
             context.user_data.pop(FLOW_KEY, None)
             raise ApplicationHandlerStop()
 
-        gate = await ensure_can_purchase_or_renew(slot_id=slot_id, user_id=user_id)
+        # 风控审核（可能是一次 AI 请求）与购买资格查询互不依赖，先启动审核再查询资格；
+        # 资格不满足时取消审核任务
+        review_task = asyncio.create_task(
+            review_ad_risk(button_text=current_flow.button_text, button_url=current_flow.button_url)
+        )
+        try:
+            gate = await ensure_can_purchase_or_renew(slot_id=slot_id, user_id=user_id)
+        except BaseException:
+            review_task.cancel()
+            raise
         if gate.get("mode") == "blocked":
+            review_task.cancel()
             await update.message.reply_text(format_slot_blocked_message(slot_id=slot_id, available_at=float(gate["available_at"])))
             context.user_data.pop(FLOW_KEY, None)
             raise ApplicationHandlerStop()
 
-        if current_flow.get("mode") == "renew" and gate.get("mode") != "renew":
+        if current_flow.mode == "renew" and gate.get("mode") != "renew":
+            review_task.cancel()
             await update.message.reply_text("⚠️ 当前不在续期窗口，请稍后再试。")
             context.user_data.pop(FLOW_KEY, None)
             raise ApplicationHandlerStop()
 
-        review = await review_ad_risk(button_text=str(current_flow["button_text"]), button_url=str(current_flow["button_url"]))
+        review = await review_task
         if not review.passed:
             await update.message.reply_text(f"❌ 风控拒绝：{review.category}\n原因：{review.reason}\n\n请重新从购买入口提交素材。")
             context.user_data.pop(FLOW_KEY, None)
@@ -620,17 +714,17 @@ async def handle_slot_text_input(update: Update, context: CallbackContext) -> No
 
         creative_id = await create_creative(
             user_id=user_id,
-            button_text=str(current_flow["button_text"]),
-            button_url=str(current_flow["button_url"]),
-            button_style=(current_flow.get("button_style") or None),
-            icon_custom_emoji_id=(current_flow.get("icon_custom_emoji_id") or None),
+            button_text=current_flow.button_text,
+            button_url=current_flow.button_url,
+            button_style=current_flow.button_style or None,
+            icon_custom_emoji_id=current_flow.icon_custom_emoji_id or None,
             ai_review=review.to_dict(),
         )
 
         now = time.time()
         planned_start_at: Optional[float] = None
-        if current_flow.get("mode") == "renew":
-            planned_start_at = float(current_flow.get("renew_start_at") or 0) or None
+        if current_flow.mode == "renew":
+            planned_start_at = current_flow.renew_start_at or None
         if planned_start_at is None:
             planned_start_at = await get_next_run_at_for_ads(now=now) or now
 
@@ -641,7 +735,7 @@ async def handle_slot_text_input(update: Update, context: CallbackContext) -> No
                 creative_id=creative_id,
                 plan_days=plan_days,
                 planned_start_at=float(planned_start_at),
-                pay_type=str(current_flow.get("pay_type") or runtime_settings.upay_default_type()),
+                pay_type=current_flow.pay_type or runtime_settings.upay_default_type(),
             )
         except Exception as e:
             logger.error(f"创建 Slot Ads 支付订单失败: {e}", exc_info=True)
@@ -680,24 +774,49 @@ async def handle_slot_text_input(update: Update, context: CallbackContext) -> No
             except Exception:
                 expires_line = None
 
-        await update.message.reply_text(
-            "🧾 广告位订单已创建\n\n"
-            f"广告位：{_as_html_code(slot_id)}\n"
-            f"租期：{_as_html_code(plan_days)} 天\n"
-            f"预计生效：{_as_html_code(start_text)}\n"
-            f"预计到期：{_as_html_code(end_text)}\n"
-            f"订单号：{_as_html_code(out_trade_no)}\n"
-            + (f"币种/网络：{_as_html_code(pay_type)}\n" if pay_type else "")
-            + (f"{pay_amount_line}\n" if pay_amount_line else "")
-            + (f"{pay_address_line}\n" if pay_address_line else "")
-            + (f"{expires_line}\n" if expires_line else "")
-            + "\n支付成功后系统会自动发送确认消息；如 1-3 分钟未收到，可点击“我已支付”进行查单确认（回调延迟/丢失时可用）。",
-            parse_mode=ParseMode.HTML,
-            disable_web_page_preview=True,
-            reply_markup=_with_remind_toggle_button(InlineKeyboardMarkup(rows), enabled=False, out_trade_no=str(out_trade_no)),
-        )
+        body_lines = [
+            "🧾 广告位订单已创建",
+            "",
+            f"广告位：{_as_html_code(slot_id)}",
+            f"租期：{_as_html_code(plan_days)} 天",
+            f"预计生效：{_as_html_code(start_text)}",
+            f"预计到期：{_as_html_code(end_text)}",
+            f"订单号：{_as_html_code(out_trade_no)}",
+            f"网关单号：{_as_html_code(trade_id)}" if trade_id else None,
+            f"币种/网络：{_as_html_code(pay_type)}" if pay_type else None,
+            pay_amount_line,
+            pay_address_line,
+            expires_line,
+            "",
+            "支付成功后系统会自动发送确认消息；如 1-3 分钟未收到，可点击“我已支付”进行查单确认（回调延迟/丢失时可用）。",
+        ]
+        summary = "\n".join(line for line in body_lines if line is not None)
+        # rows 已包含“开启到期提醒”按钮；两条消息共用同一个键盘对象（PTB 按请求序列化，可安全共享）
+        order_markup = InlineKeyboardMarkup(rows)
 
         chat_id = update.effective_chat.id if update.effective_chat else None
+        if chat_id and pay_address and pay_amount is not None and len(summary) <= _CAPTION_MAX_LEN:
+            # 摘要已包含收款地址与金额：直接作为二维码图片的说明发送，每单只发一条消息
+            await _send_payment_qr_if_possible(
+                context=context,
+                chat_id=int(chat_id),
+                caption=summary,
+                pay_address=str(pay_address),
+                reply_markup=order_markup,
+            )
+            context.user_data.pop(FLOW_KEY, None)
+            raise ApplicationHandlerStop()
+
+        # 订单摘要与收款二维码相互独立，并发发送
+        sends = [
+            update.message.reply_text(
+                summary,
+                parse_mode=ParseMode.HTML,
+                disable_web_page_preview=True,
+                reply_markup=order_markup,
+            )
+        ]
+
         if chat_id and pay_address and pay_amount is not None:
             expires_text = None
             if isinstance(expires_at, (int, float)) and float(expires_at) > 0:
@@ -724,60 +843,57 @@ async def handle_slot_text_input(update: Update, context: CallbackContext) -> No
                 "建议使用下方按钮一键复制地址/金额；如无法扫码，请点击“打开支付页”。",
             ]
             caption = "\n".join([x for x in caption_lines if x])
-            reply_markup = _with_remind_toggle_button(InlineKeyboardMarkup(rows), enabled=False, out_trade_no=str(out_trade_no))
-            await _send_payment_qr_if_possible(
+            sends.append(_send_payment_qr_if_possible(
                 context=context,
                 chat_id=int(chat_id),
                 caption=caption,
                 pay_address=str(pay_address),
-                reply_markup=reply_markup,
-            )
+                reply_markup=order_markup,
+            ))
 
+        await asyncio.gather(*sends)
         context.user_data.pop(FLOW_KEY, None)
         raise ApplicationHandlerStop()
 
     if stage == "edit_text":
         try:
-            flow["button_text"] = validate_button_text(text)
+            flow.button_text = validate_button_text(text)
         except Exception as e:
             await update.message.reply_text(f"❌ {e}\n\n请重新发送按钮文案：")
             raise ApplicationHandlerStop()
-        flow["stage"] = "edit_url"
-        context.user_data[FLOW_KEY] = flow
+        flow.stage = "edit_url"
         await update.message.reply_text("请发送新的按钮链接（仅允许 https://）：")
         raise ApplicationHandlerStop()
 
     if stage == "edit_url":
         try:
-            flow["button_url"] = validate_button_url(text)
+            flow.button_url = validate_button_url(text)
         except Exception as e:
             await update.message.reply_text(f"❌ {e}\n\n请重新发送链接：")
             raise ApplicationHandlerStop()
         if _slot_user_can_set_advanced():
             next_stage = _next_advanced_stage("edit")
             if next_stage:
-                flow["stage"] = next_stage
-                context.user_data[FLOW_KEY] = flow
+                flow.stage = next_stage
                 await update.message.reply_text(_advanced_style_prompt() if next_stage == "edit_style" else _advanced_icon_prompt())
                 raise ApplicationHandlerStop()
         await _finish_edit(flow)
 
     if stage == "edit_style":
         try:
-            flow["button_style"] = _parse_optional_style_input(text)
+            flow.button_style = _parse_optional_style_input(text)
         except Exception as e:
             await update.message.reply_text(f"❌ {e}\n\n请重新发送样式（primary/success/danger）或“无”：")
             raise ApplicationHandlerStop()
         if _slot_adv_icon_enabled():
-            flow["stage"] = "edit_icon"
-            context.user_data[FLOW_KEY] = flow
+            flow.stage = "edit_icon"
             await update.message.reply_text(_advanced_icon_prompt())
             raise ApplicationHandlerStop()
         await _finish_edit(flow)
 
     if stage == "edit_icon":
         try:
-            flow["icon_custom_emoji_id"] = _parse_optional_icon_input(text)
+            flow.icon_custom_emoji_id = _parse_optional_icon_input(text)
         except Exception as e:
             await update.message.reply_text(f"❌ {e}\n\n请重新发送会员表情 ID（数字）或“无”：")
             raise ApplicationHandlerStop()
@@ -785,61 +901,56 @@ async def handle_slot_text_input(update: Update, context: CallbackContext) -> No
 
     if stage == "text":
         try:
-            flow["button_text"] = validate_button_text(text)
+            flow.button_text = validate_button_text(text)
         except Exception as e:
             await update.message.reply_text(f"❌ {e}\n\n请重新发送按钮文案：")
             raise ApplicationHandlerStop()
-        flow["stage"] = "url"
-        context.user_data[FLOW_KEY] = flow
+        flow.stage = "url"
         await update.message.reply_text("请发送按钮链接（仅允许 https://）：")
         raise ApplicationHandlerStop()
 
     if stage == "url":
         try:
-            flow["button_url"] = validate_button_url(text)
+            flow.button_url = validate_button_url(text)
         except Exception as e:
             await update.message.reply_text(f"❌ {e}\n\n请重新发送链接：")
             raise ApplicationHandlerStop()
         if _slot_user_can_set_advanced():
             next_stage = "style" if _slot_adv_style_enabled() else "icon"
-            flow["stage"] = next_stage
-            context.user_data[FLOW_KEY] = flow
+            flow.stage = next_stage
             await update.message.reply_text(_advanced_style_prompt() if next_stage == "style" else _advanced_icon_prompt())
             raise ApplicationHandlerStop()
         await _finish_create(flow)
 
     if stage == "style":
         try:
-            flow["button_style"] = _parse_optional_style_input(text)
+            flow.button_style = _parse_optional_style_input(text)
         except Exception as e:
             await update.message.reply_text(f"❌ {e}\n\n请重新发送样式（primary/success/danger）或“无”：")
             raise ApplicationHandlerStop()
         if _slot_adv_icon_enabled():
-            flow["stage"] = "icon"
-            context.user_data[FLOW_KEY] = flow
+            flow.stage = "icon"
             await update.message.reply_text(_advanced_icon_prompt())
             raise ApplicationHandlerStop()
         await _finish_create(flow)
 
     if stage == "icon":
         try:
-            flow["icon_custom_emoji_id"] = _parse_optional_icon_input(text)
+            flow.icon_custom_emoji_id = _parse_optional_icon_input(text)
         except Exception as e:
             await update.message.reply_text(f"❌ {e}\n\n请重新发送会员表情 ID（数字）或“无”：")
             raise ApplicationHandlerStop()
         await _finish_create(flow)
 
 
+@_admin_only
 async def sched_status(update: Update, context: CallbackContext) -> None:
-    if not _require_admin(update):
-        await update.message.reply_text("⚠️ 无权限")
-        return
     cfg = await get_sched_config()
     await update.message.reply_text(
         "📌 定时发布状态\n\n"
         f"启用：{cfg.enabled}\n"
         f"类型：{cfg.schedule_type}\n"
-        f"参数：{html.escape(str(cfg.schedule_payload))}\n"
+        f"参数：{cfg.schedule_payload}\n"
         f"自动置顶：{getattr(cfg, 'auto_pin', False)}\n"
         f"删除上一条：{getattr(cfg, 'delete_prev', False)}\n"
         f"next_run_at：{format_epoch(cfg.next_run_at) if cfg.next_run_at else '未设置'}\n"
@@ -849,10 +960,8 @@ async def sched_status(update: Update, context: CallbackContext) -> None:
     )
 
 
+@_admin_only
 async def sched_on(update: Update, context: CallbackContext) -> None:
-    if not _require_admin(update):
-        await update.message.reply_text("⚠️ 无权限")
-        return
     cfg = await get_sched_config()
     now = time.time()
     next_run_at = compute_next_run_at(now=now, schedule_type=cfg.schedule_type, payload=cfg.schedule_payload, last_run_at=cfg.last_run_at)
@@ -860,50 +969,45 @@ async def sched_on(update: Update, context: CallbackContext) -> None:
     await update.message.reply_text(f"✅ 已开启定时发布\nnext_run_at：{format_epoch(next_run_at)}（服务器时间）")
 
 
+@_admin_only
 async def sched_off(update: Update, context: CallbackContext) -> None:
-    if not _require_admin(update):
-        await update.message.reply_text("⚠️ 无权限")
-        return
     await update_config_fields(enabled=0)
     await update.message.reply_text("✅ 已关闭定时发布")
 
 
+@_admin_only
 async def sched_set_text(update: Update, context: CallbackContext) -> None:
-    if not _require_admin(update):
-        await update.message.reply_text("⚠️ 无权限")
-        return
     text = _get_args_text(update)
     await update_config_fields(message_text=str(text))
     await update.message.reply_text(f"✅ 已更新定时消息正文（长度 {len(text)}）")
 
 
+@_admin_only
 async def sched_daily(update: Update, context: CallbackContext) -> None:
-    if not _require_admin(update):
-        await update.message.reply_text("⚠️ 无权限")
-        return
     arg = _get_args_text(update).strip()
     if not arg:
         await update.message.reply_text("用法：/sched_daily HH:MM")
         return
+    # 先用预编译正则校验格式与范围，不合法时不再计算下次执行时间
+    if not _HHMM_RE.match(arg):
+        await update.message.reply_text("❌ 时间格式应为 HH:MM（00:00~23:59）")
+        return
     now = time.time()
-    payload = {"time": arg}
     try:
-        next_run_at = compute_next_run_at(now=now, schedule_type="daily_at", payload=payload, last_run_at=None)
+        next_run_at = compute_next_run_at(now=now, schedule_type="daily_at", payload={"time": arg}, last_run_at=None)
     except Exception as e:
         await update.message.reply_text(f"❌ {e}")
         return
     await update_config_fields(
         schedule_type="daily_at",
-        schedule_payload=json.dumps(payload, ensure_ascii=False),
+        schedule_payload=f'{{"time": "{arg}"}}',
         next_run_at=float(next_run_at),
     )
     await update.message.reply_text(f"✅ 已设置 daily_at={arg}\nnext_run_at：{format_epoch(next_run_at)}（服务器时间）")
 
 
+@_admin_only
 async def sched_every_hours(update: Update, context: CallbackContext) -> None:
-    if not _require_admin(update):
-        await update.message.reply_text("⚠️ 无权限")
-        return
     arg = _get_args_text(update).strip()
     if not arg:
         await update.message.reply_text("用法：/sched_every_hours N")
@@ -921,25 +1025,23 @@ async def sched_every_hours(update: Update, context: CallbackContext) -> None:
     next_run_at = compute_next_run_at(now=now, schedule_type="every_n_hours", payload=payload, last_run_at=now)
     await update_config_fields(
         schedule_type="every_n_hours",
-        schedule_payload=json.dumps(payload, ensure_ascii=False),
+        schedule_payload=f'{{"hours": {hours}}}',
         next_run_at=float(next_run_at),
     )
     await update.message.reply_text(f"✅ 已设置 every_n_hours={hours}\nnext_run_at：{format_epoch(next_run_at)}")
 
 
 def _parse_on_off_arg(value: str) -> Optional[bool]:
-    s = (value or "").strip().lower()
-    if s in {"1", "on", "true", "yes", "y", "开启"}:
+    s = value.strip().lower() if value else ""
+    if s in _ON_TOKENS:
         return True
-    if s in {"0", "off", "false", "no", "n", "关闭"}:
+    if s in _OFF_TOKENS:
         return False
     return None
 
 
+@_admin_only
 async def sched_pin(update: Update, context: CallbackContext) -> None:
-    if not _require_admin(update):
-        await update.message.reply_text("⚠️ 无权限")
-        return
     arg = _get_args_text(update).strip()
     enabled = _parse_on_off_arg(arg)
     if enabled is None:
@@ -949,10 +1051,8 @@ async def sched_pin(update: Update, context: CallbackContext) -> None:
     await update.message.reply_text(f"✅ 已{'开启' if enabled else '关闭'}：发出后自动置顶")
 
 
+@_admin_only
 async def sched_delete_prev(update: Update, context: CallbackContext) -> None:
-    if not _require_admin(update):
-        await update.message.reply_text("⚠️ 无权限")
-        return
     arg = _get_args_text(update).strip()
     enabled = _parse_on_off_arg(arg)
     if enabled is None:
@@ -962,22 +1062,18 @@ async def sched_delete_prev(update: Update, context: CallbackContext) -> None:
     await update.message.reply_text(f"✅ 已{'开启' if enabled else '关闭'}：发出后删除上一条定时消息")
 
 
+@_admin_only
 async def slot_set_default_cmd(update: Update, context: CallbackContext) -> None:
-    if not _require_admin(update):
-        await update.message.reply_text("⚠️ 无权限")
-        return
-    arg = _get_args_text(update).strip()
-    parts = arg.split(maxsplit=2)
-    if len(parts) < 3:
+    m = _SLOT_DEFAULT_RE.fullmatch(_get_args_text(update).strip())
+    if not m:
         await update.message.reply_text("用法：/slot_set_default <slot_id> <text> <url>")
         return
+    slot_id_str, text, url = m.groups()
     try:
-        slot_id = int(parts[0])
+        slot_id = int(slot_id_str)
     except Exception:
         await update.message.reply_text("❌ slot_id 必须是整数")
         return
-    text = parts[1].strip()
-    url = parts[2].strip()
     try:
         text = validate_button_text(text)
         url = validate_button_url(url)
@@ -988,10 +1084,8 @@ async def slot_set_default_cmd(update: Update, context: CallbackContext) -> None
     await update.message.reply_text(f"✅ 已设置 slot {slot_id} 默认按钮")
 
 
+@_admin_only
 async def slot_clear_default_cmd(update: Update, context: CallbackContext) -> None:
-    if not _require_admin(update):
-        await update.message.reply_text("⚠️ 无权限")
-        return
     arg = _get_args_text(update).strip()
     if not arg:
         await update.message.reply_text("用法：/slot_clear_default <slot_id>")
@@ -1005,10 +1099,8 @@ async def slot_clear_default_cmd(update: Update, context: CallbackContext) -> No
     await update.message.reply_text(f"✅ 已清空 slot {slot_id} 默认按钮")
 
 
+@_admin_only
 async def slot_terminate_cmd(update: Update, context: CallbackContext) -> None:
-    if not _require_admin(update):
-        await update.message.reply_text("⚠️ 无权限")
-        return
     arg = _get_args_text(update).strip()
     if not arg:
         await update.message.reply_text("用法：/slot_terminate <slot_id> [reason]")
@@ -1026,19 +1118,10 @@ async def slot_terminate_cmd(update: Update, context: CallbackContext) -> None:
         await update.message.reply_text("ℹ️ 该广告位当前没有生效广告")
         return
 
-    # 立刻更新“最近一次定时消息”的键盘（不改正文）
-    sched = await get_sched_config()
-    if sched.last_message_chat_id and sched.last_message_id:
-        try:
-            slot_defaults = await get_slot_defaults()
-            active = await get_active_orders(now=time.time())
-            keyboard = build_channel_keyboard(slot_defaults=slot_defaults, active_orders=active)
-            await context.bot.edit_message_reply_markup(
-                chat_id=int(sched.last_message_chat_id),
-                message_id=int(sched.last_message_id),
-                reply_markup=keyboard,
-            )
-        except Exception as e:
-            logger.warning(f"终止后更新键盘失败（可忽略，后续定时消息会生效）: {e}", exc_info=True)
+    # 立刻更新“最近一次定时消息”的键盘（不改正文）；无定时消息或键盘未变化时不调用 Telegram
+    try:
+        await refresh_last_scheduled_message_keyboard(bot=context.bot)
+    except Exception as e:
+        logger.warning(f"终止后更新键盘失败（可忽略，后续定时消息会生效）: {e}", exc_info=True)
 
     await update.message.reply_text(f"✅ 已终止 slot {slot_id} 的当前广告（不退款）")
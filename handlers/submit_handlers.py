@@ -32,7 +32,7 @@ async def cancel_command(update: Update, context: CallbackContext) -> int:
     return await cancel(update, context)
 
 
-@validate_state(STATE['TAG'])
+@validate_state(STATE.TAG)
 async def handle_tag(update: Update, context: CallbackContext) -> int:
     """
     处理标签输入
@@ -55,7 +55,7 @@ async def handle_tag(update: Update, context: CallbackContext) -> int:
         success, processed_tags = process_tags(raw_tags, allowed_tags)
         if not success or not processed_tags:
             await update.message.reply_text(f"❌ 标签格式错误，请重新输入（最多{allowed_tags}个，用逗号分隔）")
-            return STATE['TAG']
+            return STATE.TAG
     try:
         async with get_db() as conn:
             c = await conn.cursor()
@@ -75,9 +75,9 @@ async def handle_tag(update: Update, context: CallbackContext) -> int:
         await update.message.reply_text(
             "✅ 标签已保存，请发送链接（可选，如无需请回复\"无\"，需填写请以 http:// 或 https:// 开头，或发送 /skip_optional 跳过后续所有可选项）"
         )
-    return STATE['LINK']
+    return STATE.LINK
 
-@validate_state(STATE['LINK'])
+@validate_state(STATE.LINK)
 async def handle_link(update: Update, context: CallbackContext) -> int:
     """
     处理链接输入
@@ -96,7 +96,7 @@ async def handle_link(update: Update, context: CallbackContext) -> int:
         link = ""
     elif not link.startswith(('http://', 'https://')):
         await update.message.reply_text("⚠️ 链接格式不正确，请以 http:// 或 https:// 开头，或回复\"无\"跳过")
-        return STATE['LINK']
+        return STATE.LINK
     try:
         async with get_db() as conn:
             c = await conn.cursor()
@@ -108,9 +108,9 @@ async def handle_link(update: Update, context: CallbackContext) -> int:
         await update.message.reply_text("❌ 链接保存失败，请稍后再试")
         return ConversationHandler.END
     await update.message.reply_text("✅ 链接已保存，请发送标题（可选，如无需请回复\"无\"，或发送 /skip_optional 跳过后续所有可选项）")
-    return STATE['TITLE']
+    return STATE.TITLE
 
-@validate_state(STATE['TITLE'])
+@validate_state(STATE.TITLE)
 async def handle_title(update: Update, context: CallbackContext) -> int:
     """
     处理标题输入
@@ -137,9 +137,9 @@ async def handle_title(update: Update, context: CallbackContext) -> int:
         await update.message.reply_text("❌ 标题保存失败，请稍后再试")
         return ConversationHandler.END
     await update.message.reply_text("✅ 标题已保存，请发送简介（可选，如无需请回复\"无\"，或发送 /skip_optional 跳过后续所有可选项）")
-    return STATE['NOTE']
+    return STATE.NOTE
 
-@validate_state(STATE['NOTE'])
+@validate_state(STATE.NOTE)
 async def handle_note(update: Update, context: CallbackContext) -> int:
     """
     处理简介输入
@@ -170,9 +170,9 @@ async def handle_note(update: Update, context: CallbackContext) -> int:
         await update.message.reply_text("❌ 简介保存失败，请稍后再试")
         return ConversationHandler.END
     await update.message.reply_text("✅ 简介已保存，请问是否将内容设为剧透（点击查看）？回复 \"否\" 或 \"是\"")
-    return STATE['SPOILER']
+    return STATE.SPOILER
 
-@validate_state(STATE['SPOILER'])
+@validate_state(STATE.SPOILER)
 async def handle_spoiler(update: Update, context: CallbackContext) -> int:
     """
     处理剧透设置
@@ -202,7 +202,7 @@ async def handle_spoiler(update: Update, context: CallbackContext) -> int:
     return await publish_submission(update, context)
 
 # 跳过可选项的处理函数
-@validate_state(STATE['LINK'])
+@validate_state(STATE.LINK)
 async def skip_optional_link(update: Update, context: CallbackContext) -> int:
     """
     跳过链接及后续所有可选项（包括剧透设置）
@@ -228,7 +228,7 @@ async def skip_optional_link(update: Update, context: CallbackContext) -> int:
     await update.message.reply_text("✅ 已跳过所有可选项，正在发布投稿……")
     return await publish_submission(update, context)
 
-@validate_state(STATE['TITLE'])
+@validate_state(STATE.TITLE)
 async def skip_optional_title(update: Update, context: CallbackContext) -> int:
     """
     跳过标题及后续所有可选项（包括剧透设置）
@@ -254,7 +254,7 @@ async def skip_optional_title(update: Update, context: CallbackContext) -> int:
     await update.message.reply_text("✅ 已跳过所有可选项，正在发布投稿……")
     return await publish_submission(update, context)
 
-@validate_state(STATE['NOTE'])
+@validate_state(STATE.NOTE)
 async def skip_optional_note(update: Update, context: CallbackContext) -> int:
     """
     跳过简介及剧透设置
@@ -628,12 +628,12 @@ def setup_application(application):
             ],
             states={
                 # 模式选择状态
-                STATE.get('START_MODE', 0): [
+                STATE.START_MODE: [
                     MessageHandler(filters.TEXT & ~filters.COMMAND, select_mode)
                 ],
                 
                 # 文档和媒体处理状态 - 优先处理skip_media命令
-                STATE.get('MEDIA', 2): [
+                STATE.MEDIA: [
                     CommandHandler('done_media', done_media),
                     CommandHandler('skip_media', skip_media),
                     MessageHandler(filters.PHOTO | filters.VIDEO | filters.ANIMATION | filters.AUDIO |
@@ -645,42 +645,42 @@ def setup_application(application):
                     CallbackQueryHandler(switch_to_doc_mode, pattern="^switch_to_doc$"),
                     MessageHandler(filters.TEXT & ~filters.COMMAND, prompt_media)
                 ],
-                STATE.get('DOC', 1): [
+                STATE.DOC: [
                     CommandHandler('done_doc', done_doc),
                     MessageHandler(filters.Document.ALL, handle_doc),
                     MessageHandler(filters.TEXT & ~filters.COMMAND, prompt_doc)
                 ],
                 
                 # 其他状态
-                STATE.get('TEXT', 10): [MessageHandler(filters.TEXT & ~filters.COMMAND, handle_text)],
-                STATE.get('IMAGE', 11): [
+                STATE.TEXT: [MessageHandler(filters.TEXT & ~filters.COMMAND, handle_text)],
+                STATE.IMAGE: [
                     MessageHandler(filters.PHOTO | filters.CAPTION, handle_image),
                     CommandHandler("done_img", done_image)
                 ],
-                STATE.get('EXTRA', 12): [MessageHandler(filters.TEXT & ~filters.COMMAND, collect_extra)],
-                STATE.get('PUBLISH', 13): [
+                STATE.EXTRA: [MessageHandler(filters.TEXT & ~filters.COMMAND, collect_extra)],
+                STATE.PUBLISH: [
                     CallbackQueryHandler(publish_submission, pattern="^publish$"),
                     CallbackQueryHandler(cancel, pattern="^cancel$")
                 ],
                 
                 # 投稿处理状态
-                STATE.get('TAG', 4): [MessageHandler(filters.TEXT & ~filters.COMMAND, handle_tag)],
-                STATE.get('LINK', 5): [
+                STATE.TAG: [MessageHandler(filters.TEXT & ~filters.COMMAND, handle_tag)],
+                STATE.LINK: [
                     CommandHandler('skip_optional', skip_optional_link),
                     MessageHandler(filters.TEXT & ~filters.COMMAND, handle_link)
                 ],
-                STATE.get('TITLE', 6): [
+                STATE.TITLE: [
                     CommandHandler('skip_optional', skip_optional_title),
                     MessageHandler(filters.TEXT & ~filters.COMMAND, handle_title)
                 ],
-                STATE.get('NOTE', 7): [
+                STATE.NOTE: [
                     CommandHandler('skip_optional', skip_optional_note),
                     MessageHandler(filters.TEXT & ~filters.COMMAND, handle_note)
                 ],
-                STATE.get('SPOILER', 8): [MessageHandler(filters.TEXT & ~filters.COMMAND, handle_spoiler)],
+                STATE.SPOILER: [MessageHandler(filters.TEXT & ~filters.COMMAND, handle_spoiler)],
 
                 # 纯文本投稿状态
-                STATE.get('TEXT_CONTENT', 14): [MessageHandler(filters.TEXT & ~filters.COMMAND, handle_text_content)]
+                STATE.TEXT_CONTENT: [MessageHandler(filters.TEXT & ~filters.COMMAND, handle_text_content)]
             },
             fallbacks=[CommandHandler("cancel", cancel)],
             name="submission_conversation",
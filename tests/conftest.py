@@ -3,10 +3,14 @@ pytest 配置和公共 fixtures
 """
 import os
 import sys
+import asyncio
+import sqlite3
 import pytest
 import tempfile
 import shutil
+from contextlib import asynccontextmanager
 from pathlib import Path
+from types import SimpleNamespace
 from unittest.mock import MagicMock, AsyncMock, patch
 
 # 设置测试环境变量（在导入任何项目模块之前）
@@ -115,3 +119,94 @@ def mock_config():
         'SHOW_SUBMITTER': True,
         'NET_TIMEOUT': 30
     }
+
+
+class _AsyncSqliteCursor:
+    """把同步 sqlite3 游标包装成 aiosqlite 风格的接口（可 await，也可 async with）"""
+
+    def __init__(self, cursor: sqlite3.Cursor):
+        self._cursor = cursor
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    async def execute(self, sql, parameters=()):
+        self._cursor.execute(sql, parameters)
+        return self
+
+    async def fetchone(self):
+        return self._cursor.fetchone()
+
+    async def fetchall(self):
+        return self._cursor.fetchall()
+
+    def __await__(self):
+        async def _self():
+            return self
+        return _self().__await__()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class _AsyncSqliteConn:
+    """同步 sqlite3 连接的 aiosqlite 风格包装（只覆盖 init_db 与测试用到的方法）"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def execute(self, sql, parameters=()):
+        return _AsyncSqliteCursor(self._conn.execute(sql, parameters))
+
+    async def executemany(self, sql, seq_of_parameters):
+        return _AsyncSqliteCursor(self._conn.executemany(sql, seq_of_parameters))
+
+    async def cursor(self):
+        return _AsyncSqliteCursor(self._conn.cursor())
+
+    async def commit(self):
+        self._conn.commit()
+
+    async def rollback(self):
+        self._conn.rollback()
+
+
+@pytest.fixture
+def memory_db():
+    """
+    按真实 init_db 建表的内存 SQLite 数据库（同步 sqlite3 包装为异步接口，不依赖 aiosqlite）
+
+    返回 conn（同步连接，用于准备数据与断言）与 get_db_tx（替换被测模块的写事务上下文）
+    """
+    from database import db_manager
+
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+
+    @asynccontextmanager
+    async def _get_db():
+        yield _AsyncSqliteConn(conn)
+        conn.commit()
+
+    @asynccontextmanager
+    async def _get_db_tx():
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield _AsyncSqliteConn(conn)
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+    with patch.object(db_manager, "get_db", _get_db):
+        asyncio.run(db_manager.init_db())
+    yield SimpleNamespace(conn=conn, get_db_tx=_get_db_tx)
+    conn.close()
@@ -0,0 +1,308 @@
+"""
+AI 审核批量合并测试
+"""
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from utils import ai_reviewer
+from utils.ai_reviewer import AIReviewer
+
+
+class _FakeCompletions:
+    """按调用记录 prompt，并按 prompt 中的投稿数量返回结果"""
+
+    def __init__(self, drop_index=None):
+        self.calls = []
+        self.drop_index = drop_index
+
+    async def create(self, *, model, messages, temperature, max_tokens, stream=False):
+        response = await self._complete(messages)
+        if not stream:
+            return response
+        return _FakeStream(response.choices[0].message.content)
+
+    async def _complete(self, messages):
+        prompt = messages[-1]["content"]
+        self.calls.append(prompt)
+        if "JSON 数组" in prompt:
+            count = prompt.count('"index":') - 1  # 减去格式示例中的一处
+            items = [
+                {"index": i, "approved": True, "confidence": 0.9, "reason": f"r{i}", "category": "相关", "requires_manual": False}
+                for i in range(1, count + 1)
+                if i != self.drop_index
+            ]
+            content = json.dumps(items, ensure_ascii=False)
+        else:
+            content = json.dumps({"approved": False, "confidence": 0.9, "reason": "single", "category": "无关内容", "requires_manual": False})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class _FakeStream:
+    """把完整输出按 3 个字符一块拆成流式 chunk，记录读取到的块数"""
+
+    def __init__(self, content, tail=""):
+        text = content + tail
+        self._chunks = [text[i:i + 3] for i in range(0, len(text), 3)]
+        self.consumed = 0
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.consumed >= len(self._chunks):
+            raise StopAsyncIteration
+        piece = self._chunks[self.consumed]
+        self.consumed += 1
+        return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def reviewer(monkeypatch):
+    monkeypatch.setattr(ai_reviewer, "AI_REVIEW_CACHE_ENABLED", False)
+    monkeypatch.setattr(ai_reviewer.runtime_settings, "ai_review_enabled", lambda: True)
+    r = AIReviewer()
+    r.api_key = "test-key"
+    return r
+
+
+def _attach(r: AIReviewer, completions: _FakeCompletions) -> None:
+    r._client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+
+@pytest.mark.unit
+class TestAIReviewerBatch:
+    """并发审核请求合并为一次 API 调用"""
+
+    def test_concurrent_reviews_share_one_call(self, reviewer):
+        completions = _FakeCompletions()
+        _attach(reviewer, completions)
+
+        async def _run():
+            subs = [{"text_content": f"内容{i}", "user_id": 1} for i in range(3)]
+            return await asyncio.gather(*(reviewer.review(s) for s in subs))
+
+        results = asyncio.run(_run())
+        assert len(completions.calls) == 1
+        assert [r.reason for r in results] == ["r1", "r2", "r3"]
+        assert all(r.approved for r in results)
+
+    def test_different_users_are_not_batched_together(self, reviewer):
+        completions = _FakeCompletions()
+        _attach(reviewer, completions)
+
+        async def _run():
+            subs = [{"text_content": f"内容{i}", "user_id": i} for i in range(3)]
+            subs.append({"text_content": "无用户"})
+            return await asyncio.gather(*(reviewer.review(s) for s in subs))
+
+        results = asyncio.run(_run())
+        assert len(completions.calls) == 4
+        assert all("JSON 数组" not in prompt for prompt in completions.calls)
+        assert all(r.reason == "single" for r in results)
+
+    def test_missing_batch_entry_falls_back_to_single_call(self, reviewer):
+        completions = _FakeCompletions(drop_index=2)
+        _attach(reviewer, completions)
+
+        async def _run():
+            subs = [{"text_content": f"内容{i}", "user_id": 1} for i in range(3)]
+            return await asyncio.gather(*(reviewer.review(s) for s in subs))
+
+        results = asyncio.run(_run())
+        assert len(completions.calls) == 2
+        assert [r.reason for r in results] == ["r1", "single", "r3"]
+
+    def test_parse_batch_response_ignores_out_of_range(self, reviewer):
+        content = "```json\n" + json.dumps([
+            {"index": 1, "approved": True, "confidence": 0.8},
+            {"index": 5, "approved": True, "confidence": 0.8},
+            "bad",
+        ]) + "\n```"
+        parsed = reviewer._parse_batch_response(content, 2)
+        assert list(parsed) == [0]
+        assert parsed[0].approved is True
+
+    def test_parse_response_tolerates_prose_and_open_fence(self, reviewer):
+        prose = '审核结果如下：{"approved": true, "confidence": 0.95, "reason": "相关"} 以上。'
+        assert reviewer._parse_response(prose).confidence == 0.95
+        unclosed = '```json\n{"approved": false, "confidence": 0.9}'
+        assert reviewer._parse_response(unclosed).approved is False
+        assert reviewer._parse_response("无法判断").requires_manual is True
+
+
+@pytest.mark.unit
+class TestAIReviewerMemoryCache:
+    """进程内审核结果缓存"""
+
+    def test_cached_result_served_without_db(self, reviewer, monkeypatch):
+        db_calls = []
+
+        def _no_db():
+            db_calls.append(1)
+            raise RuntimeError("db unavailable")
+
+        monkeypatch.setattr(ai_reviewer, "get_db", _no_db)
+        result = ai_reviewer.ReviewResult(approved=True, confidence=0.9, reason="ok")
+
+        async def _run():
+            await reviewer._cache_result("h1", result)
+            first = await reviewer._get_cached_result("h1")
+            first.cached = True
+            return first, await reviewer._get_cached_result("h1")
+
+        first, second = asyncio.run(_run())
+        assert db_calls == [1]  # 仅写入 SQLite 时尝试了一次
+        assert first.reason == second.reason == "ok"
+        assert second.cached is False
+
+
+@pytest.mark.unit
+class TestAIReviewerPrecheck:
+    """无文字内容的投稿不调用 AI"""
+
+    def test_empty_submission_goes_to_manual_without_api_call(self, reviewer):
+        completions = _FakeCompletions()
+        _attach(reviewer, completions)
+
+        result = asyncio.run(reviewer.review({"text_content": "  ", "tags": "", "link": None}))
+        assert completions.calls == []
+        assert result.requires_manual is True
+        assert reviewer.should_manual_review(result)
+
+
+@pytest.mark.unit
+class TestAIReviewerHedge:
+    """对冲请求：首个请求过慢时采用第二个请求的结果"""
+
+    def test_slow_first_call_is_hedged(self, reviewer, monkeypatch):
+        monkeypatch.setattr(ai_reviewer, "AI_REVIEW_HEDGE_DELAY", 0.01)
+        calls = []
+
+        async def _fake_call_api(submission, *, started=None):
+            calls.append(1)
+            if started is not None:
+                started.set()
+            if len(calls) == 1:
+                await asyncio.sleep(5)
+                return ai_reviewer.ReviewResult(reason="slow")
+            return ai_reviewer.ReviewResult(reason="fast")
+
+        monkeypatch.setattr(reviewer, "_call_api", _fake_call_api)
+
+        result = asyncio.run(reviewer._review_single({"text_content": "内容"}))
+        assert result.reason == "fast"
+        assert len(calls) == 2
+
+    def test_time_waiting_for_throttle_is_not_hedged(self, reviewer, monkeypatch):
+        monkeypatch.setattr(ai_reviewer, "AI_REVIEW_HEDGE_DELAY", 0.05)
+        calls = []
+
+        async def _fake_call_api(submission, *, started=None):
+            calls.append(1)
+            # 模拟排队等待限流配额：等待时间超过对冲延迟，拿到配额后很快返回
+            await asyncio.sleep(0.2)
+            started.set()
+            await asyncio.sleep(0.01)
+            return ai_reviewer.ReviewResult(reason="queued")
+
+        monkeypatch.setattr(reviewer, "_call_api", _fake_call_api)
+
+        result = asyncio.run(reviewer._review_single({"text_content": "内容"}))
+        assert result.reason == "queued"
+        assert len(calls) == 1
+
+
+@pytest.mark.unit
+class TestAIReviewerStreaming:
+    """流式输出在首个完整 JSON 对象后提前结束"""
+
+    def test_stream_stops_after_first_object(self, reviewer):
+        streams = []
+
+        async def _create(**kwargs):
+            assert kwargs.get("stream") is True
+            stream = _FakeStream('{"approved": true, "confidence": 0.9, "reason": "含 } 的理由"}', tail="\n以上是审核说明" * 20)
+            streams.append(stream)
+            return stream
+
+        _attach(reviewer, SimpleNamespace(create=_create))
+        result = asyncio.run(reviewer._call_api({"text_content": "内容"}))
+        assert result.approved is True
+        assert result.reason == "含 } 的理由"
+        assert streams[0].closed is True
+        assert streams[0].consumed < len(streams[0]._chunks)
+
+    def test_transient_stream_error_keeps_streaming(self, reviewer):
+        calls = []
+
+        async def _create(**kwargs):
+            calls.append(kwargs.get("stream", False))
+            raise TimeoutError("timed out")
+
+        _attach(reviewer, SimpleNamespace(create=_create))
+        with pytest.raises(TimeoutError):
+            asyncio.run(reviewer._call_api({"text_content": "内容"}))
+        assert calls == [True]
+        assert reviewer._stream_supported is True
+
+    def test_rejected_stream_param_falls_back_to_non_streaming(self, reviewer):
+        completions = _FakeCompletions()
+
+        async def _create(**kwargs):
+            if kwargs.get("stream"):
+                error = Exception("stream is not supported")
+                error.status_code = 400
+                raise error
+            return await completions.create(**kwargs)
+
+        _attach(reviewer, SimpleNamespace(create=_create))
+        result = asyncio.run(reviewer._call_api({"text_content": "内容"}))
+        assert result.reason == "single"
+        assert reviewer._stream_supported is False
+
+
+@pytest.mark.unit
+class TestAIReviewerPromptTemplate:
+    """单条审核 Prompt 使用按配置版本预编译的模板"""
+
+    def test_prompt_keeps_braces_in_settings_and_content(self, reviewer, monkeypatch):
+        monkeypatch.setattr(
+            ai_reviewer, "_review_context_for",
+            lambda version: ("主题{x}", "标准 {a} }", ""),
+        )
+        ai_reviewer._prompt_template_for.cache_clear()
+        try:
+            prompt = reviewer._build_prompt({"text_content": "内容 {b}", "tags": "#t", "link": None})
+        finally:
+            ai_reviewer._prompt_template_for.cache_clear()
+        assert "该频道主题是：主题{x}" in prompt
+        assert "标准 {a} }" in prompt
+        assert "投稿内容：\n内容 {b}\n" in prompt
+        assert "标签：#t\n链接：\n" in prompt
+        assert prompt.rstrip().endswith('"requires_manual": true或false\n}')
+
+
+@pytest.mark.unit
+class TestAIReviewerCoalescing:
+    """相同内容的并发审核只调用一次 API"""
+
+    def test_identical_concurrent_reviews_share_one_call(self, reviewer):
+        completions = _FakeCompletions()
+        _attach(reviewer, completions)
+
+        async def _run():
+            subs = [{"text_content": "同一条内容"} for _ in range(5)]
+            return await asyncio.gather(*(reviewer.review(s) for s in subs))
+
+        results = asyncio.run(_run())
+        assert len(completions.calls) == 1
+        assert all(r.reason == "single" for r in results)
+        assert len({id(r) for r in results}) == 5
+        assert reviewer._inflight == {}
@@ -484,6 +484,88 @@ class TestDatabaseMigration:
             assert 'id' in columns
             assert 'name' in columns
 
+    @staticmethod
+    def _create_old_rating_schema(db_path):
+        """旧版评分表：avg_score 为普通列，已有评分实体与投票"""
+        conn = sqlite3.connect(db_path)
+        conn.executescript('''
+            CREATE TABLE rating_subjects (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                subject_type TEXT NOT NULL,
+                subject_key TEXT NOT NULL,
+                display_name TEXT,
+                score_sum INTEGER DEFAULT 0,
+                vote_count INTEGER DEFAULT 0,
+                avg_score REAL DEFAULT 0.0,
+                created_at REAL DEFAULT (strftime('%s', 'now')),
+                updated_at REAL DEFAULT (strftime('%s', 'now'))
+            );
+            CREATE TABLE rating_votes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                subject_id INTEGER NOT NULL,
+                user_id INTEGER NOT NULL,
+                score INTEGER NOT NULL,
+                created_at REAL DEFAULT (strftime('%s', 'now')),
+                updated_at REAL DEFAULT (strftime('%s', 'now'))
+            );
+            INSERT INTO rating_subjects (id, subject_type, subject_key, display_name, score_sum, vote_count, avg_score)
+            VALUES (7, 'url', 'example.com', '示例', 9, 2, 4.5);
+            INSERT INTO rating_votes (subject_id, user_id, score) VALUES (7, 1, 5), (7, 2, 4);
+        ''')
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def _vote_and_read(db_path):
+        """通过触发器追加一票后读取聚合结果与 avg_score 列信息"""
+        conn = sqlite3.connect(db_path)
+        conn.execute("INSERT INTO rating_votes (subject_id, user_id, score) VALUES (7, 3, 3)")
+        conn.commit()
+        row = conn.execute("SELECT score_sum, vote_count, avg_score, display_name FROM rating_subjects WHERE id = 7").fetchone()
+        hidden = next(r[6] for r in conn.execute("PRAGMA table_xinfo(rating_subjects)") if r[1] == 'avg_score')
+        conn.close()
+        return row, hidden
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    def test_rating_avg_score_migrates_to_generated_column(self, temp_dir):
+        """旧库的 avg_score 普通列重建为生成列，已有数据保留，触发器继续维护聚合"""
+        db_path = os.path.join(temp_dir, 'rating_migration.db')
+        self._create_old_rating_schema(db_path)
+
+        from database import db_manager
+        with patch('database.db_manager.DB_PATH', db_path), \
+                patch('database.db_manager._SUPPORTS_GENERATED_COLUMNS', True):
+            asyncio.run(db_manager.init_db())
+            # 再次初始化不会重复迁移
+            asyncio.run(db_manager.init_db())
+
+        row, hidden = self._vote_and_read(db_path)
+        assert row == (12, 3, 4.0, '示例')
+        assert hidden != 0
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    def test_rating_avg_score_kept_as_plain_column_without_generated_columns(self, temp_dir):
+        """SQLite 不支持生成列时保留普通列，由触发器同时维护 avg_score"""
+        db_path = os.path.join(temp_dir, 'rating_plain.db')
+        self._create_old_rating_schema(db_path)
+
+        from database import db_manager
+        with patch('database.db_manager.DB_PATH', db_path), \
+                patch('database.db_manager._SUPPORTS_GENERATED_COLUMNS', False):
+            asyncio.run(db_manager.init_db())
+
+        row, hidden = self._vote_and_read(db_path)
+        assert row == (12, 3, 4.0, '示例')
+        assert hidden == 0
+
+        conn = sqlite3.connect(db_path)
+        conn.execute("UPDATE rating_votes SET score = 1 WHERE subject_id = 7 AND user_id = 3")
+        conn.commit()
+        assert conn.execute("SELECT avg_score FROM rating_subjects WHERE id = 7").fetchone()[0] == pytest.approx(10 / 3)
+        conn.close()
+
 
 class TestDatabasePerformance:
     """数据库性能测试"""
@@ -0,0 +1,43 @@
+"""
+重复投稿检测测试
+"""
+import sqlite3
+
+import pytest
+
+from utils import duplicate_detector
+
+
+@pytest.mark.unit
+class TestFuzzyCandidateQuery:
+    """模糊匹配候选查询走 SimHash 分段索引"""
+
+    def test_band_query_uses_band_indexes(self):
+        conn = sqlite3.connect(":memory:")
+        conn.executescript("""
+            CREATE TABLE submission_fingerprints (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                content_hash TEXT,
+                submit_time REAL NOT NULL,
+                status TEXT DEFAULT 'pending',
+                ch_b0 INTEGER, ch_b1 INTEGER, ch_b2 INTEGER, ch_b3 INTEGER
+            );
+            CREATE INDEX idx_fp_user_id ON submission_fingerprints(user_id);
+            CREATE INDEX idx_fp_submit_time ON submission_fingerprints(submit_time);
+            CREATE INDEX idx_fp_content_hash ON submission_fingerprints(content_hash);
+            CREATE INDEX idx_fp_status ON submission_fingerprints(status);
+            CREATE INDEX idx_fp_ch_b0 ON submission_fingerprints(ch_b0);
+            CREATE INDEX idx_fp_ch_b1 ON submission_fingerprints(ch_b1);
+            CREATE INDEX idx_fp_ch_b2 ON submission_fingerprints(ch_b2);
+            CREATE INDEX idx_fp_ch_b3 ON submission_fingerprints(ch_b3);
+        """)
+        plan = [row[3] for row in conn.execute(
+            "EXPLAIN QUERY PLAN " + duplicate_detector._FUZZY_BAND_CANDIDATES_SQL,
+            (0.0, 1, 2, 3, 4),
+        )]
+        conn.close()
+
+        searches = [detail for detail in plan if detail.startswith("SEARCH")]
+        assert len(searches) == 4
+        assert all("idx_fp_ch_b" in detail for detail in searches)
@@ -0,0 +1,41 @@
+"""
+特征提取测试
+"""
+import random
+
+import pytest
+
+from utils.feature_extractor import (
+    SIMHASH_BANDS,
+    get_feature_extractor,
+    parse_simhash,
+    simhash_bands,
+    simhash_distance,
+)
+
+
+@pytest.mark.unit
+class TestSimHashBands:
+    """SimHash 分段（模糊匹配候选索引）"""
+
+    def test_bands_split_low_64_bits(self):
+        assert simhash_bands("0123456789abcdef") == (0xcdef, 0x89ab, 0x4567, 0x0123)
+        assert simhash_bands("") == (None,) * SIMHASH_BANDS
+        assert simhash_bands("not-hex") == (None,) * SIMHASH_BANDS
+
+    def test_close_hashes_share_a_band(self):
+        extractor = get_feature_extractor()
+        rng = random.Random(0)
+        for _ in range(200):
+            value = rng.getrandbits(64)
+            flipped = value
+            for bit in rng.sample(range(64), SIMHASH_BANDS - 1):
+                flipped ^= 1 << bit
+            a, b = format(value, '016x'), format(flipped, '016x')
+            assert extractor.compute_simhash_distance(a, b) == SIMHASH_BANDS - 1
+            assert any(x == y for x, y in zip(simhash_bands(a), simhash_bands(b)))
+
+    def test_distance_of_unparsable_hash_is_max(self):
+        assert parse_simhash("zz") is None
+        assert simhash_distance(parse_simhash("ff"), None) == 64
+        assert simhash_distance(parse_simhash("ff"), parse_simhash("0f")) == 4
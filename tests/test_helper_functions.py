@@ -5,7 +5,10 @@ import pytest
 from utils.helper_functions import (
     process_tags,
     escape_markdown,
-    build_caption
+    build_caption,
+    make_media_item,
+    parse_media_item,
+    parse_media_items,
 )
 
 
@@ -172,3 +175,33 @@ class TestTagProcessingEdgeCases:
         assert success is True
         # 所有标签应该转换为小写
         assert "#python" in result.lower()
+
+
+class TestMediaItems:
+    """结构化媒体条目测试"""
+
+    @pytest.mark.unit
+    def test_make_media_item(self):
+        """测试构建媒体/文档条目"""
+        assert make_media_item("photo", "AAA") == {"type": "photo", "file_id": "AAA"}
+        assert make_media_item("document", "BBB", "a.zip") == {
+            "type": "document", "file_id": "BBB", "filename": "a.zip"
+        }
+
+    @pytest.mark.unit
+    def test_parse_legacy_strings(self):
+        """测试兼容旧格式字符串"""
+        assert parse_media_item("video:AAA") == {"type": "video", "file_id": "AAA"}
+        assert parse_media_item("document:BBB:a:b.txt") == {
+            "type": "document", "file_id": "BBB", "filename": "a:b.txt"
+        }
+        assert parse_media_item("document:BBB") == {"type": "document", "file_id": "BBB"}
+
+    @pytest.mark.unit
+    def test_parse_mixed_list(self):
+        """测试新旧格式混合列表"""
+        item = make_media_item("photo", "AAA")
+        result = parse_media_items([item, "audio:CCC"])
+        assert result[0] is item
+        assert result[1] == {"type": "audio", "file_id": "CCC"}
+        assert parse_media_items(None) == []
@@ -0,0 +1,65 @@
+"""
+发送限流模块测试
+"""
+import asyncio
+import time
+
+import pytest
+
+from utils.ratelimit import RateLimiter, TokenBucket
+
+
+@pytest.mark.unit
+class TestTokenBucket:
+    """令牌桶测试"""
+
+    def test_burst_within_capacity_is_immediate(self):
+        async def run():
+            bucket = TokenBucket(rate=100, capacity=5)
+            start = time.monotonic()
+            for _ in range(5):
+                await bucket.acquire()
+            return time.monotonic() - start
+
+        assert asyncio.run(run()) < 0.05
+
+    def test_waits_when_empty(self):
+        async def run():
+            bucket = TokenBucket(rate=20, capacity=1)
+            start = time.monotonic()
+            for _ in range(3):
+                await bucket.acquire()
+            return time.monotonic() - start
+
+        # 第 2、3 个令牌各需等待约 50ms
+        assert asyncio.run(run()) >= 0.09
+
+    def test_acquire_amount_larger_than_capacity_borrows(self):
+        async def run():
+            bucket = TokenBucket(rate=100, capacity=10)
+            start = time.monotonic()
+            await bucket.acquire(30)  # 桶满即可放行，余额变为 -20
+            first = time.monotonic() - start
+            await bucket.acquire(1)  # 需等待补足欠额，约 210ms
+            return first, time.monotonic() - start
+
+        first, total = asyncio.run(run())
+        assert first < 0.05
+        assert total >= 0.2
+
+
+@pytest.mark.unit
+class TestRateLimiter:
+    """限流器测试"""
+
+    def test_chats_are_limited_independently(self):
+        async def run():
+            limiter = RateLimiter(global_rate=100, per_chat_rate=1)
+            async with limiter.acquire(1):
+                pass
+            start = time.monotonic()
+            async with limiter.acquire(2):
+                pass
+            return time.monotonic() - start
+
+        assert asyncio.run(run()) < 0.05
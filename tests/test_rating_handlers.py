@@ -0,0 +1,72 @@
+"""
+评分投票写入测试（真实 init_db 建表语句与触发器）
+"""
+import asyncio
+
+import pytest
+
+from handlers import rating_handlers
+
+
+def _create_subject(conn) -> int:
+    cursor = conn.execute("INSERT INTO rating_subjects (subject_type, subject_key) VALUES ('url', 'example.com')")
+    conn.commit()
+    return cursor.lastrowid
+
+
+def _aggregate(conn, subject_id):
+    row = conn.execute(
+        "SELECT score_sum, vote_count, avg_score FROM rating_subjects WHERE id = ?", (subject_id,)
+    ).fetchone()
+    return tuple(row)
+
+
+def _vote(memory_db, subject_id, user_id, score, allow_update=True):
+    async def _run():
+        async with memory_db.get_db_tx() as conn:
+            cursor = await conn.cursor()
+            row = await rating_handlers._upsert_vote(cursor, subject_id, user_id, score, allow_update)
+        return None if row is None else bool(row[0])
+
+    return asyncio.run(_run())
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("supports_returning", [True, False])
+class TestUpsertVote:
+    """UPSERT 投票：RETURNING 与旧版 SQLite 回退路径结果一致"""
+
+    def test_new_vote(self, memory_db, monkeypatch, supports_returning):
+        monkeypatch.setattr(rating_handlers, "_SUPPORTS_RETURNING", supports_returning)
+        subject_id = _create_subject(memory_db.conn)
+
+        assert _vote(memory_db, subject_id, 1, 5) is True
+        assert _vote(memory_db, subject_id, 2, 2) is True
+        assert _aggregate(memory_db.conn, subject_id) == (7, 2, 3.5)
+
+    def test_changed_vote(self, memory_db, monkeypatch, supports_returning):
+        monkeypatch.setattr(rating_handlers, "_SUPPORTS_RETURNING", supports_returning)
+        subject_id = _create_subject(memory_db.conn)
+        assert _vote(memory_db, subject_id, 1, 5) is True
+        # 让已有投票的 created_at 早于本次修改，避免同一毫秒内被判为新增
+        memory_db.conn.execute("UPDATE rating_votes SET created_at = created_at - 10, updated_at = updated_at - 10")
+        memory_db.conn.commit()
+
+        assert _vote(memory_db, subject_id, 1, 3) is False
+        assert _aggregate(memory_db.conn, subject_id) == (3, 1, 3.0)
+
+    def test_same_score_returns_no_row(self, memory_db, monkeypatch, supports_returning):
+        monkeypatch.setattr(rating_handlers, "_SUPPORTS_RETURNING", supports_returning)
+        subject_id = _create_subject(memory_db.conn)
+        _vote(memory_db, subject_id, 1, 4)
+
+        assert _vote(memory_db, subject_id, 1, 4) is None
+        assert _aggregate(memory_db.conn, subject_id) == (4, 1, 4.0)
+
+    def test_update_not_allowed(self, memory_db, monkeypatch, supports_returning):
+        monkeypatch.setattr(rating_handlers, "_SUPPORTS_RETURNING", supports_returning)
+        subject_id = _create_subject(memory_db.conn)
+        _vote(memory_db, subject_id, 1, 4, allow_update=False)
+
+        assert _vote(memory_db, subject_id, 1, 1, allow_update=False) is None
+        assert _aggregate(memory_db.conn, subject_id) == (4, 1, 4.0)
@@ -0,0 +1,52 @@
+"""
+人工审核认领测试（真实 init_db 建表语句）
+"""
+import asyncio
+
+import pytest
+
+from handlers import review_handlers
+
+
+def _create_pending_review(conn) -> int:
+    cursor = conn.execute(
+        "INSERT INTO pending_reviews (user_id, username, submission_data) VALUES (?, ?, ?)",
+        (42, "alice", '{"text_content": "内容"}'),
+    )
+    conn.commit()
+    return cursor.lastrowid
+
+
+async def _claim(memory_db, review_id, admin_id, status="approved", review_note=None):
+    async with memory_db.get_db_tx() as conn:
+        cursor = await conn.cursor()
+        return await review_handlers._claim_review(cursor, review_id, status, admin_id, review_note)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("supports_returning", [True, False])
+class TestClaimReview:
+    """认领待审核投稿：RETURNING 与旧版 SQLite 回退路径结果一致"""
+
+    def test_double_claim_only_one_wins(self, memory_db, monkeypatch, supports_returning):
+        monkeypatch.setattr(review_handlers, "_SUPPORTS_RETURNING", supports_returning)
+        review_id = _create_pending_review(memory_db.conn)
+
+        async def _run():
+            return await asyncio.gather(
+                _claim(memory_db, review_id, 1001, "approved"),
+                _claim(memory_db, review_id, 1002, "rejected", "banned"),
+            )
+
+        first, second = asyncio.run(_run())
+        assert tuple(first) == (42, "alice", '{"text_content": "内容"}')
+        assert second is None
+        row = memory_db.conn.execute(
+            "SELECT status, reviewed_by, review_note FROM pending_reviews WHERE id = ?", (review_id,)
+        ).fetchone()
+        assert tuple(row) == ("approved", 1001, None)
+
+    def test_missing_review_returns_none(self, memory_db, monkeypatch, supports_returning):
+        monkeypatch.setattr(review_handlers, "_SUPPORTS_RETURNING", supports_returning)
+
+        assert asyncio.run(_claim(memory_db, 999, 1001)) is None
@@ -48,6 +48,7 @@ class _AsyncConn:
 
 @pytest.mark.asyncio
 async def test_slot_ads_edit_limit_and_admin_force(temp_dir):
+    # 通过替换 slot_ad_service.get_db/get_db_tx 使用同步 sqlite3 连接，避免依赖 aiosqlite（部分环境下 aiosqlite 可能卡死）
     from utils import slot_ad_service, runtime_settings
 
     now = 1_700_000_000.0
@@ -58,7 +59,7 @@ async def test_slot_ads_edit_limit_and_admin_force(temp_dir):
     conn = sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
 
-    conn.execute(
+    conn.executescript(
         """
         CREATE TABLE slot_ad_creatives (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -70,11 +71,7 @@ async def test_slot_ads_edit_limit_and_admin_force(temp_dir):
             ai_review_result TEXT,
             ai_review_passed INTEGER,
             created_at REAL NOT NULL
-        )
-        """
-    )
-    conn.execute(
-        """
+        );
         CREATE TABLE slot_ad_orders (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             out_trade_no TEXT UNIQUE,
@@ -98,11 +95,7 @@ async def test_slot_ads_edit_limit_and_admin_force(temp_dir):
             remind_at REAL,
             remind_sent INTEGER NOT NULL DEFAULT 0,
             remind_sent_at REAL
-        )
-        """
-    )
-    conn.execute(
-        """
+        );
         CREATE TABLE slot_ad_order_edits (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             out_trade_no TEXT NOT NULL,
@@ -113,10 +106,10 @@ async def test_slot_ads_edit_limit_and_admin_force(temp_dir):
             new_creative_id INTEGER NOT NULL,
             note TEXT,
             created_at REAL NOT NULL
-        )
+        );
+        CREATE INDEX idx_slot_ad_order_edits_order_day ON slot_ad_order_edits(out_trade_no, day_key);
         """
     )
-    conn.execute("CREATE INDEX idx_slot_ad_order_edits_order_day ON slot_ad_order_edits(out_trade_no, day_key)")
 
     conn.execute(
         """
@@ -160,7 +153,9 @@ async def test_slot_ads_edit_limit_and_admin_force(temp_dir):
             raise
 
     orig_get_db = slot_ad_service.get_db
+    orig_get_db_tx = slot_ad_service.get_db_tx
     slot_ad_service.get_db = _fake_get_db  # type: ignore[assignment]
+    slot_ad_service.get_db_tx = _fake_get_db  # type: ignore[assignment]
 
     orig_snapshot = dict(getattr(runtime_settings, "_snapshot", {}) or {})
     try:
@@ -226,4 +221,5 @@ async def test_slot_ads_edit_limit_and_admin_force(temp_dir):
     finally:
         runtime_settings._snapshot = orig_snapshot  # type: ignore[attr-defined]
         slot_ad_service.get_db = orig_get_db  # type: ignore[assignment]
+        slot_ad_service.get_db_tx = orig_get_db_tx  # type: ignore[assignment]
         conn.close()
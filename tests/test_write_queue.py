@@ -0,0 +1,99 @@
+"""
+批量写入队列测试
+"""
+import asyncio
+import sqlite3
+from contextlib import asynccontextmanager
+
+import pytest
+
+from utils import write_queue
+from utils.write_queue import WriteQueue
+
+
+class _AsyncCursor:
+    def __init__(self, cursor: sqlite3.Cursor):
+        self._cursor = cursor
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    async def execute(self, sql: str, parameters=()):
+        self._cursor.execute(sql, parameters)
+        return self
+
+
+class _AsyncConn:
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    async def cursor(self):
+        return _AsyncCursor(self._conn.cursor())
+
+
+@pytest.fixture
+def fake_tx(monkeypatch):
+    """以内存 SQLite 替换 get_db_tx，并记录事务次数"""
+    conn = sqlite3.connect(":memory:", isolation_level=None)
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, v TEXT NOT NULL)")
+    stats = {"transactions": 0}
+
+    @asynccontextmanager
+    async def _fake_get_db_tx():
+        stats["transactions"] += 1
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield _AsyncConn(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    monkeypatch.setattr(write_queue, "get_db_tx", _fake_get_db_tx)
+    yield conn, stats
+    conn.close()
+
+
+@pytest.mark.unit
+class TestWriteQueue:
+    """写入队列测试"""
+
+    def test_concurrent_writes_share_one_transaction(self, fake_tx):
+        conn, stats = fake_tx
+
+        async def run():
+            queue = WriteQueue(batch_size=32, batch_delay=0.05)
+            return await asyncio.gather(*(
+                queue.submit(lambda c, i=i: c.execute("INSERT INTO t (v) VALUES (?)", (f"v{i}",)))
+                for i in range(10)
+            ))
+
+        asyncio.run(run())
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 10
+        assert stats["transactions"] == 1
+
+    def test_failed_op_only_rolls_back_itself(self, fake_tx):
+        conn, _ = fake_tx
+
+        async def insert_then_fail(cursor):
+            await cursor.execute("INSERT INTO t (v) VALUES (?)", ("bad",))
+            raise ValueError("boom")
+
+        async def count_rows(cursor):
+            await cursor.execute("UPDATE t SET v = v")
+            return cursor.rowcount
+
+        async def run():
+            queue = WriteQueue(batch_size=32, batch_delay=0.05)
+            return await asyncio.gather(
+                queue.submit(lambda c: c.execute("INSERT INTO t (v) VALUES (?)", ("ok",))),
+                queue.submit(insert_then_fail),
+                queue.submit(count_rows),
+                return_exceptions=True,
+            )
+
+        _, failed, rowcount = asyncio.run(run())
+        assert isinstance(failed, ValueError)
+        assert rowcount == 1
+        assert [r[0] for r in conn.execute("SELECT v FROM t")] == ["ok"]
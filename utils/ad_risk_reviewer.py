@@ -8,23 +8,27 @@
 
 from __future__ import annotations
 
-import json
 import logging
 import os
+import re
 from dataclasses import dataclass
 from typing import Any, Dict, Optional
 
+import orjson
+
 from config.settings import (
-    AI_REVIEW_API_BASE,
     AI_REVIEW_API_KEY,
     AI_REVIEW_ENABLED,
     AI_REVIEW_MODEL,
-    AI_REVIEW_TIMEOUT,
 )
 from utils import runtime_settings
+from utils.ai_reviewer import get_ai_reviewer
 
 logger = logging.getLogger(__name__)
 
+# 测试环境标记（测试在导入项目模块前设置 TESTING，进程内不会变化）
+_TESTING_MODE = str(os.getenv("TESTING") or "").strip().lower() in ("1", "true", "yes")
+
 
 @dataclass(frozen=True)
 class AdRiskReviewResult:
@@ -42,17 +46,28 @@ class AdRiskReviewResult:
         }
 
 
+_CHILD_KEYWORDS = (
+    "未成年", "儿童", "幼女", "萝莉", "小学生", "初中生", "高中生", "未成年人",
+)
+_HORROR_KEYWORDS = (
+    "恐怖", "血腥", "虐杀", "尸体", "自杀", "斩首", "爆炸", "枪杀",
+)
+
+
+def _compile_keywords(keywords) -> re.Pattern:
+    """将一组关键词编译为单个正则，一次扫描即可判断是否命中任一关键词"""
+    return re.compile("|".join(re.escape(k.lower()) for k in keywords))
+
+
+_CHILD_RE = _compile_keywords(_CHILD_KEYWORDS)
+_HORROR_RE = _compile_keywords(_HORROR_KEYWORDS)
+
+
 def _keyword_fallback(text: str) -> AdRiskReviewResult:
     s = (text or "").lower()
-    child_keywords = [
-        "未成年", "儿童", "幼女", "萝莉", "小学生", "初中生", "高中生", "未成年人",
-    ]
-    horror_keywords = [
-        "恐怖", "血腥", "虐杀", "尸体", "自杀", "斩首", "爆炸", "枪杀",
-    ]
-    if any(k.lower() in s for k in child_keywords):
+    if _CHILD_RE.search(s):
         return AdRiskReviewResult(passed=False, category="儿童/未成年人", reason="命中儿童/未成年人高风险关键词")
-    if any(k.lower() in s for k in horror_keywords):
+    if _HORROR_RE.search(s):
         return AdRiskReviewResult(passed=False, category="恐怖/血腥", reason="命中恐怖/血腥高风险关键词")
     return AdRiskReviewResult(passed=True, category="正常", reason="未命中高风险关键词")
 
@@ -63,33 +78,26 @@ async def review_ad_risk(*, button_text: str, button_url: str) -> AdRiskReviewRe
     """
     merged = f"{button_text}\n{button_url}".strip()
     # 测试环境：避免任何外部网络调用，强制走本地启发式降级
-    if str(os.getenv("TESTING") or "").strip().lower() in ("1", "true", "yes"):
+    if _TESTING_MODE:
         return _keyword_fallback(merged)
     if not AI_REVIEW_ENABLED or not AI_REVIEW_API_KEY:
         return _keyword_fallback(merged)
 
     try:
-        from openai import AsyncOpenAI
-
-        client = AsyncOpenAI(
-            api_key=AI_REVIEW_API_KEY,
-            base_url=(AI_REVIEW_API_BASE or "").rstrip("/"),
-            timeout=int(AI_REVIEW_TIMEOUT),
-        )
-
         prompt = runtime_settings.render_ad_risk_prompt(button_text=button_text, button_url=button_url)
 
-        resp = await client.chat.completions.create(
-            model=AI_REVIEW_MODEL,
-            messages=[
+        # 与投稿审核共用同一个 AsyncOpenAI 客户端及其并发 / RPM / TPM 限额（同一 API Key）
+        content = await get_ai_reviewer().create_completion({
+            "model": AI_REVIEW_MODEL,
+            "messages": [
                 {"role": "system", "content": runtime_settings.ad_risk_system_prompt()},
                 {"role": "user", "content": prompt},
             ],
-            temperature=0.1,
-            max_tokens=200,
-        )
-        content = (resp.choices[0].message.content or "").strip()
-        data = json.loads(content)
+            "temperature": 0.1,
+            "max_tokens": 200,
+        })
+        content = content.strip()
+        data = orjson.loads(content)
         passed = bool(data.get("passed", False))
         category = str(data.get("category", "") or "").strip() or ("正常" if passed else "待定")
         reason = str(data.get("reason", "") or "").strip() or ("通过" if passed else "拒绝")
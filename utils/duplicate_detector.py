@@ -13,12 +13,33 @@ from database.db_manager import get_db
 from utils.feature_extractor import (
     SubmissionFingerprint,
     get_feature_extractor,
-    FINGERPRINT_VERSION
+    parse_simhash,
+    simhash_bands,
+    simhash_distance,
+    FINGERPRINT_VERSION,
+    SIMHASH_BANDS,
 )
 from utils.submit_policy import get_effective_policy
 
 logger = logging.getLogger(__name__)
 
+# 模糊匹配候选：时间窗口内已通过、且至少一段 SimHash 分段与当前投稿相同的指纹。
+# submit_time / status 前加一元 +，避免（未执行 ANALYZE 时）规划器改用 idx_fp_status
+# 扫描全部已通过记录，确保按四个分段索引查找（MULTI-INDEX OR）
+_FUZZY_BAND_CANDIDATES_SQL = '''
+    SELECT id, content_hash, submit_time, user_id
+    FROM submission_fingerprints
+    WHERE +submit_time > ? AND +status = 'approved'
+    AND (ch_b0 = ? OR ch_b1 = ? OR ch_b2 = ? OR ch_b3 = ?)
+'''
+
+# 阈值允许的距离不小于分段数时分段无法保证召回，退回扫描窗口内全部哈希
+_FUZZY_ALL_CANDIDATES_SQL = '''
+    SELECT id, content_hash, submit_time, user_id
+    FROM submission_fingerprints
+    WHERE submit_time > ? AND status = 'approved' AND content_hash IS NOT NULL
+'''
+
 
 @dataclass
 class DuplicateResult:
@@ -149,56 +170,49 @@ class DuplicateDetector:
         - 电话号码
         - 邮箱地址
         """
-        matched_features = []
         dup_cfg = policy.get("duplicate_check") or {}
 
+        # 按配置收集当前投稿需要比对的特征
+        probes: List[Tuple[str, str]] = []
+        if bool(dup_cfg.get("check_urls", True)):
+            probes.extend(('url', url) for url in fingerprint.urls)
+        if bool(dup_cfg.get("check_tg_links", True)):
+            probes.extend(('tg_link', tg_link) for tg_link in fingerprint.tg_links)
+            probes.extend(('tg_username', tg_user) for tg_user in fingerprint.tg_usernames)
+        if bool(dup_cfg.get("check_contacts", True)):
+            probes.extend(('phone', phone) for phone in fingerprint.phone_numbers)
+            probes.extend(('email', email) for email in fingerprint.emails)
+
+        if not probes:
+            return DuplicateResult(is_duplicate=False)
+
         try:
             async with get_db() as conn:
                 cursor = await conn.cursor()
 
-                # 获取时间窗口内的所有特征
-                await cursor.execute('''
+                # 只查询与当前投稿特征相同的记录（走 fingerprint_features 的特征覆盖索引），
+                # 不再把时间窗口内的全部特征读入内存
+                # 逐对写成 OR 条件：SQLite 对每一对使用索引查找（MULTI-INDEX OR），
+                # 而 (a, b) IN (VALUES ...) 不会走该索引
+                match_sql = ' OR '.join('(ff.feature_type = ? AND ff.feature_value = ?)' for _ in probes)
+                params = [item for probe in probes for item in probe]
+                await cursor.execute(f'''
                     SELECT ff.feature_type, ff.feature_value, sf.id, sf.submit_time
                     FROM fingerprint_features ff
                     JOIN submission_fingerprints sf ON ff.fingerprint_id = sf.id
-                    WHERE sf.submit_time > ? AND sf.status = 'approved'
-                ''', (cutoff_time,))
+                    WHERE ({match_sql})
+                    AND sf.submit_time > ? AND sf.status = 'approved'
+                ''', (*params, cutoff_time))
 
+                # 每个特征保留最近一次出现的投稿
                 existing_features = {}
                 async for row in cursor:
                     key = (row['feature_type'], row['feature_value'])
-                    existing_features[key] = (row['id'], row['submit_time'])
-
-                # 检查 URL 匹配
-                if bool(dup_cfg.get("check_urls", True)):
-                    for url in fingerprint.urls:
-                        key = ('url', url)
-                        if key in existing_features:
-                            matched_features.append(key)
-
-                # 检查 Telegram 链接匹配
-                if bool(dup_cfg.get("check_tg_links", True)):
-                    for tg_link in fingerprint.tg_links:
-                        key = ('tg_link', tg_link)
-                        if key in existing_features:
-                            matched_features.append(key)
-
-                    for tg_user in fingerprint.tg_usernames:
-                        key = ('tg_username', tg_user)
-                        if key in existing_features:
-                            matched_features.append(key)
-
-                # 检查联系方式匹配
-                if bool(dup_cfg.get("check_contacts", True)):
-                    for phone in fingerprint.phone_numbers:
-                        key = ('phone', phone)
-                        if key in existing_features:
-                            matched_features.append(key)
-
-                    for email in fingerprint.emails:
-                        key = ('email', email)
-                        if key in existing_features:
-                            matched_features.append(key)
+                    record = (row['id'], row['submit_time'])
+                    if key not in existing_features or record[1] > existing_features[key][1]:
+                        existing_features[key] = record
+
+                matched_features = [key for key in probes if key in existing_features]
 
                 if matched_features:
                     # 获取原始投稿信息
@@ -238,32 +252,32 @@ class DuplicateDetector:
         if not fingerprint.content_hash:
             return DuplicateResult(is_duplicate=False)
 
+        threshold = self._threshold(policy)
+        # similarity = 1 - distance / 64 >= threshold 时允许的最大汉明距离
+        max_distance = int(64 * (1 - threshold) + 1e-9)
+        bands = simhash_bands(fingerprint.content_hash)
+        # 当前投稿的哈希只解析一次，逐行只需解析候选哈希并做一次异或 + popcount
+        probe = parse_simhash(fingerprint.content_hash)
+
         try:
             async with get_db() as conn:
                 cursor = await conn.cursor()
 
-                # 获取时间窗口内的所有内容哈希
-                await cursor.execute('''
-                    SELECT id, content_hash, submit_time, user_id
-                    FROM submission_fingerprints
-                    WHERE submit_time > ? AND status = 'approved' AND content_hash IS NOT NULL
-                ''', (cutoff_time,))
+                if max_distance < SIMHASH_BANDS and bands[0] is not None:
+                    # 只取至少一段 SimHash 完全相同的候选（走分段索引）
+                    await cursor.execute(_FUZZY_BAND_CANDIDATES_SQL, (cutoff_time, *bands))
+                else:
+                    # 获取时间窗口内的所有内容哈希
+                    await cursor.execute(_FUZZY_ALL_CANDIDATES_SQL, (cutoff_time,))
 
                 async for row in cursor:
                     if not row['content_hash']:
                         continue
 
-                    # 计算汉明距离
-                    distance = self.extractor.compute_simhash_distance(
-                        fingerprint.content_hash,
-                        row['content_hash']
-                    )
-
-                    # 距离越小越相似，64位哈希最大距离为64
-                    # 距离 <= 3 通常认为是相似内容
-                    similarity = 1 - (distance / 64)
-
-                    if similarity >= self._threshold(policy):
+                    # 计算汉明距离（距离越小越相似，64位哈希最大距离为64）
+                    distance = simhash_distance(probe, parse_simhash(row['content_hash']))
+                    if distance <= max_distance:
+                        similarity = 1 - (distance / 64)
                         logger.info(f"检测到模糊匹配: user_id={fingerprint.user_id}, "
                                   f"similarity={similarity:.2f}, distance={distance}")
 
@@ -406,8 +420,9 @@ class DuplicateDetector:
                     INSERT INTO submission_fingerprints
                     (user_id, username, urls, tg_usernames, tg_links,
                      phone_numbers, emails, bio_features, content_hash,
-                     content_length, submit_time, submission_id, status, fingerprint_version)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                     content_length, submit_time, submission_id, status, fingerprint_version,
+                     ch_b0, ch_b1, ch_b2, ch_b3)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 ''', (
                     fingerprint.user_id,
                     fingerprint.username,
@@ -426,7 +441,8 @@ class DuplicateDetector:
                     fingerprint.submit_time,
                     submission_id,
                     status,
-                    fingerprint.fingerprint_version
+                    fingerprint.fingerprint_version,
+                    *simhash_bands(fingerprint.content_hash),
                 ))
 
                 fingerprint_id = cursor.lastrowid
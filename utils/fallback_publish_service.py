@@ -267,8 +267,8 @@ async def _ensure_platform_subject_id(
             await cursor.execute(
                 """
                 INSERT INTO rating_subjects
-                (subject_type, subject_key, display_name, score_sum, vote_count, avg_score, created_at, updated_at)
-                VALUES (?, ?, ?, 0, 0, 0.0, ?, ?)
+                (subject_type, subject_key, display_name, score_sum, vote_count, created_at, updated_at)
+                VALUES (?, ?, ?, 0, 0, ?, ?)
                 """,
                 (subject_type, subject_key, dn, now_ts, now_ts),
             )
@@ -6,7 +6,7 @@ import re
 import hashlib
 import logging
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -14,6 +14,41 @@ logger = logging.getLogger(__name__)
 # 特征版本号，用于后续升级兼容
 FINGERPRINT_VERSION = 1
 
+# SimHash 低 64 位拆成 SIMHASH_BANDS 段、每段 SIMHASH_BAND_BITS 位，分别建索引；
+# 汉明距离小于段数时（鸽巢原理）两个哈希至少有一段完全相同
+SIMHASH_BANDS = 4
+SIMHASH_BAND_BITS = 16
+
+
+def parse_simhash(content_hash: str) -> Optional[int]:
+    """十六进制内容哈希转整数；为空或非法时返回 None"""
+    if not content_hash:
+        return None
+    try:
+        return int(content_hash, 16)
+    except ValueError:
+        return None
+
+
+# int.bit_count 需要 Python 3.10+，旧版本退回 bin().count
+_popcount = getattr(int, "bit_count", None) or (lambda n: bin(n).count('1'))
+
+
+def simhash_distance(value1: Optional[int], value2: Optional[int]) -> int:
+    """两个已解析 SimHash 的汉明距离；任一为 None 时返回 64"""
+    if value1 is None or value2 is None:
+        return 64
+    return _popcount(value1 ^ value2)
+
+
+def simhash_bands(content_hash: str) -> Tuple[Optional[int], ...]:
+    """将内容哈希拆为 SIMHASH_BANDS 个分段整数；哈希为空或非法时各段均为 None"""
+    value = parse_simhash(content_hash)
+    if value is None:
+        return (None,) * SIMHASH_BANDS
+    mask = (1 << SIMHASH_BAND_BITS) - 1
+    return tuple((value >> (i * SIMHASH_BAND_BITS)) & mask for i in range(SIMHASH_BANDS))
+
 
 @dataclass
 class SubmissionFingerprint:
@@ -282,16 +317,7 @@ class FeatureExtractor:
         Returns:
             int: 汉明距离（0-64）
         """
-        if not hash1 or not hash2:
-            return 64
-
-        try:
-            n1 = int(hash1, 16)
-            n2 = int(hash2, 16)
-            xor = n1 ^ n2
-            return bin(xor).count('1')
-        except ValueError:
-            return 64
+        return simhash_distance(parse_simhash(hash1), parse_simhash(hash2))
 
     def create_fingerprint(
         self,
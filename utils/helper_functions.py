@@ -337,6 +337,71 @@ def parse_json_list(raw_data: str) -> list:
         return []
 
 
+def make_media_item(typ: str, file_id: str, filename: Optional[str] = None) -> dict:
+    """
+    构建结构化的媒体/文档条目（存入 submissions.image_id / document_id）
+
+    Args:
+        typ: 类型（photo / video / animation / audio / document）
+        file_id: Telegram 文件 ID
+        filename: 文件名（仅文档）
+
+    Returns:
+        dict: {"type": ..., "file_id": ...[, "filename": ...]}
+    """
+    item = {"type": typ, "file_id": file_id}
+    if filename is not None:
+        item["filename"] = filename
+    return item
+
+
+def parse_media_item(item) -> dict:
+    """
+    将媒体/文档条目统一为结构化 dict
+
+    兼容旧格式字符串 "type:file_id" 与 "document:file_id:filename"。
+
+    Args:
+        item: dict 或旧格式字符串
+
+    Returns:
+        dict: {"type": ..., "file_id": ...[, "filename": ...]}
+    """
+    if isinstance(item, dict):
+        return item
+    parts = str(item).split(":", 2)
+    if len(parts) == 1:
+        return {"type": "", "file_id": parts[0]}
+    if len(parts) == 3:
+        return {"type": parts[0], "file_id": parts[1], "filename": parts[2]}
+    return {"type": parts[0], "file_id": parts[1]}
+
+
+def parse_media_items(items) -> list:
+    """
+    将媒体/文档列表统一为结构化 dict 列表（读取时做一次，后续不再逐项 split）
+
+    Args:
+        items: 条目列表（dict 或旧格式字符串混合）
+
+    Returns:
+        list: 结构化条目列表
+    """
+    return [parse_media_item(item) for item in items or []]
+
+
+# 后台任务的强引用，避免任务在完成前被垃圾回收
+_background_tasks = set()
+
+
+def spawn_background(coro):
+    """在后台运行协程，并持有引用直到完成"""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
 async def safe_send(send_func, *args, **kwargs):
     """
     安全发送函数，包含重试逻辑
@@ -71,6 +71,11 @@ def setup_logging():
     # 清理过期日志
     cleanup_old_logs(log_dir)
     
+    # 单进程机器人，格式中也不使用线程/进程字段，关闭采集以减少每条日志的开销
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+
     # 创建日志格式
     formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     
@@ -8,14 +8,23 @@
 
 from __future__ import annotations
 
+import asyncio
 import io
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Optional
 
+# 二维码编码为 CPU 密集操作，使用独立线程池执行，避免阻塞事件循环或占满默认执行器
+_qr_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="qr")
 
+
+@lru_cache(maxsize=512)
 def make_qr_png_bytes(text: str, *, scale: int = 8, border: int = 2) -> bytes:
     """
     生成二维码 PNG（二进制）。
 
+    结果按参数缓存：收款地址通常在多笔订单间复用，PNG bytes 不可变，可安全共享。
+
     设计取舍（KISS）：
     - 不强行拼接链上 URI（不同链规则不同），默认仅编码 text（通常为收款地址）。
     - 缺少依赖时抛出异常，由调用方决定降级策略（例如仅发文字 + 支付页按钮）。
@@ -34,6 +43,17 @@ def make_qr_png_bytes(text: str, *, scale: int = 8, border: int = 2) -> bytes:
     return buf.getvalue()
 
 
+async def make_qr_png_bytes_async(text: str, *, scale: int = 8, border: int = 2) -> bytes:
+    """
+    在线程池中生成二维码 PNG，供异步处理器调用。
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _qr_executor,
+        lambda: make_qr_png_bytes(text, scale=scale, border=border),
+    )
+
+
 def _try_import_segno() -> Optional[object]:
     try:
         import segno  # type: ignore
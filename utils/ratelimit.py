@@ -0,0 +1,81 @@
+"""
+发送限流模块 - 基于令牌桶的 Telegram 消息发送限流
+
+Telegram 对机器人发送频率有限制（全局约 30 条/秒，单个会话约 1 条/秒），
+超限会返回 RetryAfter 并进入冷却。批量通知前先经过限流器排队，
+避免突发流量触发 429。
+"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+# 全局发送速率（条/秒）
+GLOBAL_RATE = 30.0
+# 单个会话发送速率（条/秒）
+PER_CHAT_RATE = 1.0
+
+
+class TokenBucket:
+    """异步令牌桶：按固定速率补充令牌，令牌不足时等待"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self, amount: float = 1) -> None:
+        """
+        取走 amount 个令牌，必要时等待补充
+
+        amount 超过桶容量时，等到桶满后仍会扣除全部数量（余额为负），后续请求顺延等待
+        """
+        async with self._lock:
+            self._refill()
+            if self._tokens < amount:
+                await asyncio.sleep((min(amount, self.capacity) - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= amount
+
+
+class RateLimiter:
+    """全局令牌桶 + 按 chat_id 的令牌桶"""
+
+    def __init__(self, global_rate: float = GLOBAL_RATE, per_chat_rate: float = PER_CHAT_RATE):
+        self.per_chat_rate = per_chat_rate
+        self._global = TokenBucket(global_rate)
+        self._chats: Dict[int, TokenBucket] = {}
+
+    @asynccontextmanager
+    async def acquire(self, chat_id: int):
+        """
+        等待发送许可
+
+        Args:
+            chat_id: 目标会话 ID
+        """
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            bucket = self._chats[chat_id] = TokenBucket(self.per_chat_rate)
+        await bucket.acquire()
+        await self._global.acquire()
+        yield
+
+
+# 全局限流器实例（单例模式）
+_rate_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """获取全局限流器实例"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = RateLimiter()
+    return _rate_limiter
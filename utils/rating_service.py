@@ -282,8 +282,8 @@ class RatingService:
                     """
                     INSERT INTO rating_subjects
                     (subject_type, subject_key, display_name,
-                     score_sum, vote_count, avg_score, created_at, updated_at)
-                    VALUES (?, ?, ?, 0, 0, 0.0, ?, ?)
+                     score_sum, vote_count, created_at, updated_at)
+                    VALUES (?, ?, ?, 0, 0, ?, ?)
                     """,
                     (subject_type, subject_key, subject_key, now_ts, now_ts),
                 )
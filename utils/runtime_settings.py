@@ -18,6 +18,7 @@ import logging
 import time
 from dataclasses import dataclass
 from decimal import Decimal, InvalidOperation
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Tuple
 
 from database.db_manager import get_db
@@ -148,6 +149,8 @@ class SlotAdPlan:
 
 _snapshot: Dict[str, str] = {}
 _snapshot_loaded_at: float = 0.0
+# 快照版本号：每次 refresh() 递增，用于派生值的缓存失效
+_snapshot_version: int = 0
 
 
 def _bool_from_str(value: Optional[str], fallback: bool) -> bool:
@@ -176,6 +179,11 @@ def _str_from_str(value: Optional[str], fallback: str) -> str:
     return v if v else str(fallback)
 
 
+def version() -> int:
+    """当前快照版本号（每次刷新快照后递增）"""
+    return _snapshot_version
+
+
 def get_raw(key: str) -> Optional[str]:
     return _snapshot.get(key)
 
@@ -281,14 +289,24 @@ def paid_ad_packages() -> List[PaidAdPackage]:
     return out
 
 
-def upay_default_type() -> str:
+@lru_cache(maxsize=4)
+def _upay_default_type_for(snapshot_version: int) -> str:
     return get_str(KEY_UPAY_DEFAULT_TYPE, static.UPAY_DEFAULT_TYPE)
 
 
-def upay_allowed_types() -> List[str]:
+@lru_cache(maxsize=4)
+def _upay_allowed_types_for(snapshot_version: int) -> Tuple[str, ...]:
     raw = get_str(KEY_UPAY_ALLOWED_TYPES, ",".join(static.UPAY_ALLOWED_TYPES or []))
-    types = [t.strip() for t in (raw or "").split(",") if t.strip()]
-    return types
+    return tuple(t.strip() for t in (raw or "").split(",") if t.strip())
+
+
+def upay_default_type() -> str:
+    # 按快照版本缓存，回调热路径中的重复调用不再重复读取/解析配置
+    return _upay_default_type_for(_snapshot_version)
+
+
+def upay_allowed_types() -> List[str]:
+    return list(_upay_allowed_types_for(_snapshot_version))
 
 
 def pay_expire_minutes() -> int:
@@ -443,6 +461,11 @@ def ad_risk_system_prompt() -> str:
 
 
 def ad_risk_prompt_template() -> str:
+    return _ad_risk_prompt_template_for(_snapshot_version)
+
+
+@lru_cache(maxsize=4)
+def _ad_risk_prompt_template_for(snapshot_version: int) -> str:
     v = get_raw(KEY_AD_RISK_PROMPT_TEMPLATE)
     fallback = DEFAULT_AD_RISK_PROMPT_TEMPLATE
     return (v if v is not None else fallback).strip() or fallback
@@ -465,7 +488,13 @@ def render_ad_risk_prompt(*, button_text: str, button_url: str) -> str:
 def ai_review_settings_fingerprint() -> str:
     """
     用于缓存隔离：当“审核策略/提示词”变化时，不复用旧缓存。
+    按快照版本缓存，每条投稿计算缓存键时不再重复读取各项配置。
     """
+    return _ai_review_settings_fingerprint_for(_snapshot_version)
+
+
+@lru_cache(maxsize=4)
+def _ai_review_settings_fingerprint_for(snapshot_version: int) -> str:
     parts = [
         "v1",
         str(ai_review_enabled()),
@@ -640,7 +669,7 @@ async def refresh() -> None:
     """
     从 DB 载入运行时配置快照。
     """
-    global _snapshot, _snapshot_loaded_at
+    global _snapshot, _snapshot_loaded_at, _snapshot_version
     try:
         async with get_db() as conn:
             cursor = await conn.cursor()
@@ -653,6 +682,7 @@ async def refresh() -> None:
         logger.warning(f"加载运行时配置失败（将回退为静态配置）: {e}", exc_info=True)
         _snapshot = {}
         _snapshot_loaded_at = time.time()
+    _snapshot_version += 1
 
 
 async def set_many(*, values: Dict[str, str]) -> None:
@@ -21,9 +21,7 @@ from config.settings import CHANNEL_ID
 from database.db_manager import get_db
 from utils import runtime_settings
 from utils.slot_ad_service import (
-    build_channel_keyboard,
-    get_active_orders,
-    get_slot_defaults,
+    load_channel_keyboard,
     markup_has_custom_emoji,
     strip_custom_emoji_from_markup,
 )
@@ -196,9 +194,7 @@ async def scheduled_publish_tick(context) -> None:
 
     # 构造键盘（按发布瞬间快照）
     try:
-        slot_defaults = await get_slot_defaults()
-        active = await get_active_orders(now=now)
-        keyboard = build_channel_keyboard(slot_defaults=slot_defaults, active_orders=active)
+        keyboard = await load_channel_keyboard(now=now)
     except Exception as e:
         logger.error(f"构造广告位键盘失败，将降级为无键盘: {e}", exc_info=True)
         keyboard = None
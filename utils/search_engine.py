@@ -303,6 +303,19 @@ class PostSearchEngine:
                 writer.add_document(**post.as_dict())
         logger.debug(f"添加帖子到索引: {post.message_id}")
 
+    def add_posts(self, posts: List[PostDocument]):
+        """
+        批量添加帖子到索引（共用一个写入器，只提交一次）
+
+        Args:
+            posts: 帖子文档列表
+        """
+        if not posts:
+            return
+        with self.ix.writer() as writer:
+            for post in posts:
+                self.add_post(post, writer=writer)
+
     def add_document(self, post: PostDocument):
         """
         向后兼容旧 SearchEngine API。
@@ -9,6 +9,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import html
 import json
 import logging
@@ -31,11 +32,12 @@ from config.settings import (
     UPAY_REDIRECT_PATH,
     UPAY_SECRET_KEY,
 )
-from database.db_manager import get_db
+from database.db_manager import get_db, get_db_tx
 from utils import runtime_settings
 from utils.upay_pro_client import check_status as upay_check_status
 from utils.upay_pro_client import create_order as upay_create_order
 from utils.upay_pro_client import normalize_amount
+from utils.write_queue import submit_write
 
 logger = logging.getLogger(__name__)
 ALLOWED_BUTTON_STYLES = ("primary", "success", "danger")
@@ -55,8 +57,32 @@ def get_plans() -> List[SlotAdPlan]:
     return plans
 
 
+# 管理员 ID 集合（配置在启动时加载，不会在运行期变化）
+_ADMIN_ID_SET = frozenset(int(x) for x in (ADMIN_IDS or []))
+
+
 def is_admin(user_id: int) -> bool:
-    return int(user_id) in set(ADMIN_IDS or [])
+    return int(user_id) in _ADMIN_ID_SET
+
+
+# 素材写入/换绑路径上的 SQL 均为静态文本，只绑定参数，
+# 同一连接上重复执行时可命中 sqlite3 连接级语句缓存
+_INSERT_CREATIVE_SQL = """
+    INSERT INTO slot_ad_creatives(
+        user_id, button_text, button_url, button_style, icon_custom_emoji_id,
+        ai_review_result, ai_review_passed, created_at
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_UPDATE_ORDER_CREATIVE_SQL = "UPDATE slot_ad_orders SET creative_id = ? WHERE out_trade_no = ?"
+
+_INSERT_ORDER_EDIT_SQL = """
+    INSERT INTO slot_ad_order_edits(
+        out_trade_no, day_key, editor_type, editor_user_id, old_creative_id, new_creative_id, note, created_at
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
 
 
 def _build_urls() -> Tuple[str, str]:
@@ -279,12 +305,10 @@ async def set_slot_default(slot_id: int, default_text: Optional[str], default_ur
     if default_text and default_url:
         default_buttons_json = json.dumps([{"text": str(default_text), "url": str(default_url)}], ensure_ascii=False)
     now = time.time()
-    async with get_db() as conn:
-        cursor = await conn.cursor()
-        await cursor.execute(
-            "UPDATE ad_slots SET default_text = ?, default_url = ?, default_buttons_json = ?, updated_at = ? WHERE slot_id = ?",
-            (default_text, default_url, default_buttons_json, now, int(slot_id)),
-        )
+    await submit_write(lambda cursor: cursor.execute(
+        "UPDATE ad_slots SET default_text = ?, default_url = ?, default_buttons_json = ?, updated_at = ? WHERE slot_id = ?",
+        (default_text, default_url, default_buttons_json, now, int(slot_id)),
+    ))
 
 
 async def set_slot_default_buttons(slot_id: int, default_buttons: List[Dict[str, Any]]) -> None:
@@ -295,12 +319,10 @@ async def set_slot_default_buttons(slot_id: int, default_buttons: List[Dict[str,
     default_buttons_json = json.dumps(buttons, ensure_ascii=False) if buttons else None
 
     now = time.time()
-    async with get_db() as conn:
-        cursor = await conn.cursor()
-        await cursor.execute(
-            "UPDATE ad_slots SET default_text = ?, default_url = ?, default_buttons_json = ?, updated_at = ? WHERE slot_id = ?",
-            (default_text, default_url, default_buttons_json, now, int(slot_id)),
-        )
+    await submit_write(lambda cursor: cursor.execute(
+        "UPDATE ad_slots SET default_text = ?, default_url = ?, default_buttons_json = ?, updated_at = ? WHERE slot_id = ?",
+        (default_text, default_url, default_buttons_json, now, int(slot_id)),
+    ))
 
 
 async def set_slot_sell_enabled(slot_id: int, enabled: bool) -> None:
@@ -595,6 +617,15 @@ def build_channel_keyboard(
     return InlineKeyboardMarkup(rows)
 
 
+async def load_channel_keyboard(now: Optional[float] = None) -> InlineKeyboardMarkup:
+    """
+    读取广告位默认按钮与生效订单并构造频道键盘；两次读取互不依赖，使用各自的连接并发执行
+    """
+    t = float(now if now is not None else time.time())
+    slot_defaults, active = await asyncio.gather(get_slot_defaults(), get_active_orders(now=t))
+    return build_channel_keyboard(slot_defaults=slot_defaults, active_orders=active)
+
+
 async def create_creative(
     *,
     user_id: int,
@@ -617,13 +648,7 @@ async def create_creative(
     async with get_db() as conn:
         cursor = await conn.cursor()
         await cursor.execute(
-            """
-            INSERT INTO slot_ad_creatives(
-                user_id, button_text, button_url, button_style, icon_custom_emoji_id,
-                ai_review_result, ai_review_passed, created_at
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """,
+            _INSERT_CREATIVE_SQL,
             (int(user_id), button_text, button_url, style, icon_custom_emoji_id, ai_review_json, ai_passed, now),
         )
         return int(cursor.lastrowid)
@@ -988,13 +1013,7 @@ async def _create_creative_in_tx(
     if ai_review and "passed" in ai_review:
         ai_passed = 1 if bool(ai_review.get("passed")) else 0
     await cursor.execute(
-        """
-        INSERT INTO slot_ad_creatives(
-            user_id, button_text, button_url, button_style, icon_custom_emoji_id,
-            ai_review_result, ai_review_passed, created_at
-        )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """,
+        _INSERT_CREATIVE_SQL,
         (
             int(user_id),
             str(button_text),
@@ -1020,15 +1039,9 @@ async def _update_order_creative_with_audit_in_tx(
     note: str,
     now: float,
 ) -> None:
+    await cursor.execute(_UPDATE_ORDER_CREATIVE_SQL, (int(new_creative_id), str(out_trade_no)))
     await cursor.execute(
-        "UPDATE slot_ad_orders SET creative_id = ? WHERE out_trade_no = ?",
-        (int(new_creative_id), str(out_trade_no)),
-    )
-    await cursor.execute(
-        """
-        INSERT INTO slot_ad_order_edits(out_trade_no, day_key, editor_type, editor_user_id, old_creative_id, new_creative_id, note, created_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """,
+        _INSERT_ORDER_EDIT_SQL,
         (
             str(out_trade_no),
             _day_key(float(now)),
@@ -1074,7 +1087,8 @@ async def update_slot_ad_order_creative_by_user(
     limit = int(runtime_settings.slot_ad_edit_limit_per_order_per_day())
     day = _day_key(t)
 
-    async with get_db() as conn:
+    # 读-校验-写在同一个 IMMEDIATE 事务中完成，每日限额计数不会被并发修改绕过
+    async with get_db_tx() as conn:
         cursor = await conn.cursor()
         await cursor.execute("SELECT * FROM slot_ad_orders WHERE out_trade_no = ? LIMIT 1", (str(out_trade_no),))
         order = await cursor.fetchone()
@@ -1165,7 +1179,8 @@ async def update_slot_ad_order_creative_by_admin(
     limit = int(runtime_settings.slot_ad_edit_limit_per_order_per_day())
     day = _day_key(t)
 
-    async with get_db() as conn:
+    # 读-校验-写在同一个 IMMEDIATE 事务中完成，每日限额计数不会被并发修改绕过
+    async with get_db_tx() as conn:
         cursor = await conn.cursor()
         await cursor.execute("SELECT * FROM slot_ad_orders WHERE out_trade_no = ? LIMIT 1", (str(out_trade_no),))
         order = await cursor.fetchone()
@@ -1219,20 +1234,28 @@ async def update_slot_ad_order_creative_by_admin(
         }
 
 
+# 最近一次通过 refresh_last_scheduled_message_keyboard 推送的键盘：(chat_id, message_id, 键盘 JSON)
+_last_pushed_keyboard: Optional[Tuple[int, int, str]] = None
+
+
 async def refresh_last_scheduled_message_keyboard(*, bot, now: Optional[float] = None) -> bool:
     """
     立即刷新“最近一次定时消息”的按钮键盘（仅改 reply_markup，不改正文）。
     返回 True 表示已尝试刷新（且具备 last_message_id）；False 表示无可刷新目标。
+    键盘与上次推送到同一条消息的内容一致时跳过 Telegram 调用。
     """
+    global _last_pushed_keyboard
     from utils.scheduled_publish_service import get_config as get_sched_config
 
-    sched = await get_sched_config()
+    # 定时配置与键盘所需的两次读取互不依赖，WAL 下三个读连接并发执行；
+    # 无可刷新目标时键盘结果直接丢弃（仅多两次轻量读取）
+    sched, keyboard = await asyncio.gather(get_sched_config(), load_channel_keyboard(now=now))
     if not sched.last_message_chat_id or not sched.last_message_id:
         return False
-    t = float(now if now is not None else time.time())
-    slot_defaults = await get_slot_defaults()
-    active = await get_active_orders(now=t)
-    keyboard = build_channel_keyboard(slot_defaults=slot_defaults, active_orders=active)
+    target = (int(sched.last_message_chat_id), int(sched.last_message_id))
+    keyboard_json = keyboard.to_json()
+    if _last_pushed_keyboard == (*target, keyboard_json):
+        return True
     try:
         await bot.edit_message_reply_markup(
             chat_id=int(sched.last_message_chat_id),
@@ -1249,6 +1272,7 @@ async def refresh_last_scheduled_message_keyboard(*, bot, now: Optional[float] =
             )
         else:
             raise
+    _last_pushed_keyboard = (*target, keyboard_json)
     return True
 
 
@@ -1280,8 +1304,8 @@ async def confirm_paid_by_trade_id(out_trade_no: str) -> bool:
 
 async def terminate_active_order(*, slot_id: int, reason: str, now: Optional[float] = None) -> bool:
     t = float(now if now is not None else time.time())
-    async with get_db() as conn:
-        cursor = await conn.cursor()
+
+    async def _terminate(cursor) -> bool:
         await cursor.execute(
             """
             UPDATE slot_ad_orders
@@ -1292,6 +1316,8 @@ async def terminate_active_order(*, slot_id: int, reason: str, now: Optional[flo
         )
         return cursor.rowcount > 0
 
+    return await submit_write(_terminate)
+
 
 def format_epoch(ts: float) -> str:
     try:
@@ -8,12 +8,28 @@
 from __future__ import annotations
 
 import time
-from typing import Any, Dict, Optional
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional
 
 from utils import runtime_settings
 from utils.submit_policy import get_effective_policy
 
 SNAPSHOT_KEY = "submit_settings_snapshot"
+TEXT_SETTINGS_KEY = "submit_text_settings"
+
+# 会话尚无快照时共用的只读空快照，避免每次调用都新建字典
+_EMPTY_SNAPSHOT: Mapping[str, Any] = MappingProxyType({})
+
+
+@dataclass(frozen=True, slots=True)
+class TextSettings:
+    """纯文本投稿用到的字数/标签限制（由会话快照派生）"""
+    min_len: int
+    max_len: int
+    allowed_tags: int
+    # 来源快照的 loaded_at，快照重建后据此失效
+    loaded_at: Optional[float] = None
 
 
 def _snapshot_from_policy(policy: Dict[str, Any]) -> Dict[str, Any]:
@@ -95,9 +111,34 @@ def ensure_snapshot(context: Any, *, user_id: Optional[int] = None) -> Dict[str,
     return snap
 
 
-def get_snapshot(context: Any) -> Dict[str, Any]:
+def get_snapshot(context: Any) -> Mapping[str, Any]:
+    """
+    读取当前会话快照（直接返回 user_data 中的字典，不复制）；不存在时返回共享的只读空快照
+    """
     user_data = getattr(context, "user_data", None)
     if not isinstance(user_data, dict):
-        return {}
+        return _EMPTY_SNAPSHOT
     snap = user_data.get(SNAPSHOT_KEY)
-    return snap if isinstance(snap, dict) else {}
+    return snap if isinstance(snap, dict) else _EMPTY_SNAPSHOT
+
+
+def get_text_settings(context: Any) -> TextSettings:
+    """
+    获取纯文本投稿限制；按快照 loaded_at 缓存在 user_data 中，同一快照只解析一次
+    """
+    snap = get_snapshot(context)
+    loaded_at = snap.get("loaded_at")
+    user_data = getattr(context, "user_data", None)
+    if isinstance(user_data, dict):
+        cached = user_data.get(TEXT_SETTINGS_KEY)
+        if isinstance(cached, TextSettings) and cached.loaded_at == loaded_at:
+            return cached
+    settings = TextSettings(
+        min_len=int(snap.get("min_text_length", 10)),
+        max_len=int(snap.get("max_text_length", 4000)),
+        allowed_tags=int(snap.get("allowed_tags", 30)),
+        loaded_at=loaded_at,
+    )
+    if isinstance(user_data, dict):
+        user_data[TEXT_SETTINGS_KEY] = settings
+    return settings
@@ -2,6 +2,7 @@
 UPAY_PRO 客户端（最小封装）
 """
 import hashlib
+import hmac
 import logging
 from decimal import Decimal
 from typing import Any, Dict, Optional, Tuple
@@ -15,21 +16,16 @@ def _md5_hex(s: str) -> str:
     return hashlib.md5(s.encode("utf-8")).hexdigest()
 
 
-def build_signature(params: Dict[str, Any], secret_key: str, *, append_ampersand_before_key: bool = False) -> str:
-    """
-    按 UPAY_PRO 规则生成签名：
-    - 仅参与非空字段
-    - key 按字母序排序
-    - 使用 & 拼接为 key=value
-    - 末尾拼接 secret_key（部分实现会额外拼接一个 &，提供兼容开关）
-    """
-    def _value_to_string(v: Any) -> str:
-        if isinstance(v, Decimal):
-            return format(v.normalize(), "f")
-        if isinstance(v, (int, float)):
-            return format(Decimal(str(v)).normalize(), "f")
-        return str(v)
+def _value_to_string(v: Any) -> str:
+    if isinstance(v, Decimal):
+        return format(v.normalize(), "f")
+    if isinstance(v, (int, float)):
+        return format(Decimal(str(v)).normalize(), "f")
+    return str(v)
+
 
+def _canonical_param_str(params: Dict[str, Any]) -> str:
+    """非空字段按 key 字母序排序后以 & 拼接为 key=value（不含 secret_key）"""
     pairs = []
     for k, v in params.items():
         if v is None:
@@ -39,7 +35,18 @@ def build_signature(params: Dict[str, Any], secret_key: str, *, append_ampersand
             continue
         pairs.append((str(k), v_str))
     pairs.sort(key=lambda x: x[0])
-    param_str = "&".join([f"{k}={v}" for k, v in pairs])
+    return "&".join([f"{k}={v}" for k, v in pairs])
+
+
+def build_signature(params: Dict[str, Any], secret_key: str, *, append_ampersand_before_key: bool = False) -> str:
+    """
+    按 UPAY_PRO 规则生成签名：
+    - 仅参与非空字段
+    - key 按字母序排序
+    - 使用 & 拼接为 key=value
+    - 末尾拼接 secret_key（部分实现会额外拼接一个 &，提供兼容开关）
+    """
+    param_str = _canonical_param_str(params)
     if append_ampersand_before_key and param_str:
         param_str = f"{param_str}&{secret_key}"
     else:
@@ -48,15 +55,25 @@ def build_signature(params: Dict[str, Any], secret_key: str, *, append_ampersand
 
 
 def verify_signature(payload: Dict[str, Any], secret_key: str) -> bool:
+    """
+    校验回调签名，兼容两种拼接方式（secret_key 前是否有 &）。
+    参数串只构造、哈希一次，两种方式共用其 MD5 中间状态；比较使用常量时间比较
+    """
     signature = str(payload.get("signature", "") or "").strip().lower()
     if not signature:
         return False
-    params = {k: v for k, v in payload.items() if k != "signature"}
-    sig1 = build_signature(params, secret_key, append_ampersand_before_key=False).lower()
-    if signature == sig1:
+    param_str = _canonical_param_str({k: v for k, v in payload.items() if k != "signature"})
+    base = hashlib.md5(param_str.encode("utf-8"))
+
+    plain = base.copy()
+    plain.update(secret_key.encode("utf-8"))
+    if hmac.compare_digest(signature.encode("utf-8"), plain.hexdigest().encode("utf-8")):
         return True
-    sig2 = build_signature(params, secret_key, append_ampersand_before_key=True).lower()
-    return signature == sig2
+    if not param_str:
+        return False
+    with_ampersand = base.copy()
+    with_ampersand.update(f"&{secret_key}".encode("utf-8"))
+    return hmac.compare_digest(signature.encode("utf-8"), with_ampersand.hexdigest().encode("utf-8"))
 
 
 def normalize_amount(amount: Any, *, decimals: int = 2) -> Decimal:
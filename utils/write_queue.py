@@ -0,0 +1,136 @@
+"""
+数据库写入队列 - 将零散的小写操作合并到同一个写事务中提交
+
+单个消费者从队列中取出写操作，每批最多 WRITE_BATCH_SIZE 个、最多等待 WRITE_BATCH_DELAY 秒，
+在一个 BEGIN IMMEDIATE 事务内依次执行，整批只提交（fsync）一次。
+每个操作包在独立的 SAVEPOINT 中，单个操作失败只回滚自身，不影响同批其他操作；
+整批提交成功后才把结果返回给调用方。
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+from database.db_manager import get_db_tx
+
+logger = logging.getLogger(__name__)
+
+# 每批最多合并的写操作数
+WRITE_BATCH_SIZE = 32
+# 收到第一个写操作后最多等待的合并窗口（秒）
+WRITE_BATCH_DELAY = 0.02
+# 队列上限，写入堆积时调用方在 put 处等待（背压）
+WRITE_QUEUE_MAXSIZE = 1024
+
+# 写操作：接收事务内的游标，返回值原样交给调用方；操作内不要再调用 get_db_tx()
+WriteOp = Callable[[Any], Awaitable[Any]]
+
+
+async def collect_batch(queue: asyncio.Queue, max_size: int, delay: float) -> List[Any]:
+    """
+    从队列取出一批条目：先阻塞等待第一个，再在 delay 秒的合并窗口内继续收集，最多 max_size 个
+
+    写入队列、published_posts 批量写入与 AI 批量审核共用
+    """
+    batch = [await queue.get()]
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + delay
+    while len(batch) < max_size:
+        timeout = deadline - loop.time()
+        if timeout <= 0:
+            break
+        try:
+            batch.append(await asyncio.wait_for(queue.get(), timeout))
+        except asyncio.TimeoutError:
+            break
+    return batch
+
+
+class WriteQueue:
+    """单消费者批量写入队列"""
+
+    def __init__(
+        self,
+        batch_size: int = WRITE_BATCH_SIZE,
+        batch_delay: float = WRITE_BATCH_DELAY,
+        maxsize: int = WRITE_QUEUE_MAXSIZE,
+    ):
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._worker: Optional[asyncio.Task] = None
+
+    async def submit(self, op: WriteOp) -> Any:
+        """
+        提交一个写操作并等待其所在批次提交完成
+
+        Args:
+            op: 接收游标的异步函数
+
+        Returns:
+            op 的返回值；op 抛出的异常或批次提交失败的异常会在此处重新抛出
+        """
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((op, future))
+        return await future
+
+    async def _run(self) -> None:
+        while True:
+            batch = await collect_batch(self._queue, self.batch_size, self.batch_delay)
+            await self._execute(batch)
+
+    async def _execute(self, batch: List[Tuple[WriteOp, asyncio.Future]]) -> None:
+        outcomes: List[Tuple[bool, Any]] = []
+        try:
+            async with get_db_tx() as conn:
+                cursor = await conn.cursor()
+                for op, future in batch:
+                    if future.done():
+                        # 调用方已取消，跳过该操作
+                        outcomes.append((True, None))
+                        continue
+                    await cursor.execute("SAVEPOINT write_queue_op")
+                    try:
+                        value = await op(cursor)
+                    except Exception as e:
+                        await cursor.execute("ROLLBACK TO write_queue_op")
+                        await cursor.execute("RELEASE write_queue_op")
+                        outcomes.append((False, e))
+                    else:
+                        await cursor.execute("RELEASE write_queue_op")
+                        outcomes.append((True, value))
+        except Exception as e:
+            logger.error(f"批量写入事务失败（{len(batch)} 个操作）: {e}", exc_info=True)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), (ok, value) in zip(batch, outcomes):
+            if future.done():
+                continue
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+
+# 全局写入队列实例（单例模式，按事件循环创建）
+_write_queue: Optional[WriteQueue] = None
+_write_queue_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_write_queue() -> WriteQueue:
+    """获取当前事件循环的全局写入队列实例"""
+    global _write_queue, _write_queue_loop
+    loop = asyncio.get_running_loop()
+    if _write_queue is None or _write_queue_loop is not loop:
+        _write_queue = WriteQueue()
+        _write_queue_loop = loop
+    return _write_queue
+
+
+async def submit_write(op: WriteOp) -> Any:
+    """将写操作提交到全局写入队列，等待所在批次提交后返回 op 的结果"""
+    return await get_write_queue().submit(op)